@@ -0,0 +1,143 @@
+"""Capture product rows from the platforms' own JSON API responses.
+
+The storefronts render their catalogue grids from listing/search API calls.
+Listening on ``page.on("response")`` lets a scraper read those payloads as
+the page pages through results, instead of walking every product card with
+``query_selector``/``inner_text`` round trips. Each platform adapter supplies
+the URL fragments worth decoding and an ``item -> Product`` function
+producing the same record its DOM extractor does. The DOM extractor still
+reads every visible card the captured rows do not cover: the server-rendered
+first page, and everything when nothing is captured (API shape changed,
+request blocked, or interception disabled).
+"""
+import asyncio
+import os
+
+# Set SCRAPER_INTERCEPT=0 to force the DOM parsers.
+INTERCEPT_ENABLED = os.environ.get("SCRAPER_INTERCEPT", "1") != "0"
+
+
+def price_value(value, divisor=1):
+    """Normalise an API price (int, float or string) to the CSV's digit string or NA."""
+    if value is None or value == "" or isinstance(value, bool):
+        return "NA"
+    if isinstance(value, str):
+        digits = "".join(ch for ch in value if ch.isdigit() or ch == ".")
+        if not digits:
+            return "NA"
+        try:
+            value = float(digits)
+        except ValueError:
+            return "NA"
+    try:
+        return str(int(round(float(value) / divisor)))
+    except (TypeError, ValueError):
+        return "NA"
+
+
+def text_of(value):
+    """API text fields are either plain strings or ``{"text": ...}`` snippets."""
+    if isinstance(value, dict):
+        value = value.get("text") or value.get("title")
+    return value.strip() if isinstance(value, str) else value
+
+
+def first(item, *keys, default=None):
+    """Return the first non-empty value among ``keys``; dotted keys walk nested dicts."""
+    for key in keys:
+        value = item
+        for part in key.split("."):
+            if isinstance(value, dict):
+                value = value.get(part)
+            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                value = None
+                break
+        if value not in (None, "", [], {}):
+            return value
+    return default
+
+
+def iter_dicts(payload):
+    """Yield every dict nested anywhere in a decoded JSON payload (iteratively)."""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+class ResponseCapture:
+    """Collect rows from matching JSON responses of one page.
+
+    ``url_fragments`` selects which responses are decoded, ``parse_item`` turns
+    a candidate dict into a ``Product`` (or ``None``), and ``keep`` filters
+    rows, e.g. to the brand being scraped. Rows are keyed by name like
+    ``collected``.
+    """
+
+    def __init__(self, page, url_fragments, parse_item, keep=None):
+        self.url_fragments = tuple(url_fragments)
+        self.parse_item = parse_item
+        self.keep = keep
+        self.rows = {}
+        self.responses = 0
+        self._pending = set()
+        # Set whenever new rows arrive, so scroll loops can wait on it.
+        self.changed = asyncio.Event()
+        self.enabled = INTERCEPT_ENABLED
+        if self.enabled:
+            page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if not any(fragment in response.url for fragment in self.url_fragments):
+            return
+        task = asyncio.ensure_future(self._consume(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _consume(self, response):
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        self.responses += 1
+        self.add_payload(payload)
+
+    def add_payload(self, payload):
+        """Merge every product found in ``payload``; returns how many were new."""
+        added = 0
+        for item in iter_dicts(payload):
+            row = self.parse_item(item)
+            if row is None or not row.name or row.name == "NA":
+                continue
+            if self.keep and not self.keep(row):
+                continue
+            if row.name not in self.rows:
+                added += 1
+            self.rows[row.name] = row
+        if added:
+            self.changed.set()
+        return added
+
+    def reset(self):
+        """Forget captured rows before the page is reloaded for another run."""
+        self.rows = {}
+        self.responses = 0
+        self.changed.clear()
+
+    async def drain(self):
+        """Wait for in-flight response bodies so no payload is lost at the end."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def __len__(self):
+        return len(self.rows)
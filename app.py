@@ -1,40 +1,65 @@
-from flask import Flask, render_template, request, redirect, url_for, send_file, jsonify
-import glob
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify, stream_with_context
 import os
 import csv
-import json
-from datetime import datetime
-import subprocess
+from datetime import datetime, timezone
 import time
 import hmac
 import hashlib
 
+from comparison import EXPORT_FIELDS, SORT_KEYS, STATUS_FILTERS, Comparison
+from export_stream import ENCODERS, FORMATS
+from file_cache import FileCache, LatestMatchCache, file_signature
+from product_matching import match_platforms
+import benchmark_store
+import job_specs
+import jobs
+import price_store
+import scrape_metrics
+import snapshot_store
+
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Where the default job's latest CSVs are looked up (the scrapers write them to APP_DIR).
+CSV_DIR = os.environ.get("SNAPSHOT_CSV_DIR", APP_DIR)
 PLATFORMS = {
     'blinkit': {
-        'pattern': os.path.join(APP_DIR, "blinkit_pepe_*.csv"),
+        'pattern': os.path.join(CSV_DIR, "blinkit_*.csv"),
         'display_name': 'Blinkit'
     },
     'instamart': {
-        'pattern': os.path.join(APP_DIR, "*instamart*.csv"),
+        'pattern': os.path.join(CSV_DIR, "*instamart*.csv"),
         'display_name': 'Instamart'
     },
     'zepto': {
-        'pattern': os.path.join(APP_DIR, "zepto_pepe_*.csv"),
+        'pattern': os.path.join(CSV_DIR, "zepto_*.csv"),
         'display_name': 'Zepto'
     }
 }
-BENCHMARKS_PATH = os.path.join(APP_DIR, "benchmarks.json")
+# A compacted snapshot stamped this close to the CSV's mtime is the same run.
+SNAPSHOT_SLACK_SECONDS = 60
 ADMIN_KEY = os.environ.get("ADMIN_KEY", "pepe-secret")
 
 
-def find_latest_csv(platform='blinkit'):
+_latest_csv = LatestMatchCache()
+
+
+def find_latest_csv(platform='blinkit', location=None):
     if platform not in PLATFORMS:
         platform = 'blinkit'  # default fallback
-    pattern = PLATFORMS[platform]['pattern']
-    files = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
-    return files[0] if files else None
+    if location and location != job_specs.DEFAULT_LOCATION:
+        brand, pincode = job_specs.parse_location(location)
+        path = job_specs.output_path(platform, brand, pincode)
+        return path if os.path.exists(path) else None
+    return _latest_csv.latest(PLATFORMS[platform]['pattern'])
+
+
+def request_location(args=None):
+    """``?location=brand@pincode`` if well-formed and not the default job, else None."""
+    args = request.args if args is None else args
+    location = args.get('location', '').strip().lower()
+    if location == job_specs.DEFAULT_LOCATION or not job_specs.parse_location(location):
+        return None
+    return location
 
 
 def load_products(csv_path):
@@ -49,53 +74,99 @@ def load_products(csv_path):
                 "current_price": row.get("current_price", ""),
                 "original_price": row.get("original_price", ""),
                 "discount": row.get("discount", ""),
-                "sizes": row.get("sizes", ""),
+                "sizes": row.get("sizes") or row.get("unit", ""),
             })
     return products
 
 
+# Parsed files stay in memory per worker until their mtime/size changes.
+# Cached values are shared between requests: copy before mutating them.
+_products_cache = FileCache(load_products)
+_benchmarks = benchmark_store.BenchmarkCache()
+_view_model_cache = {}
+_metrics_cache = FileCache(scrape_metrics.latest_runs)
+_partition_cache = FileCache(snapshot_store.latest_by_location)
+
+
+def load_cached_products(csv_path):
+    return _products_cache.get(csv_path) if csv_path else []
+
+
+def latest_partition(platform):
+    return _latest_csv.latest(snapshot_store.partition_pattern(platform))
+
+
+def load_snapshot(platform, csv_path, location=None):
+    """Latest products for a platform/location.
+
+    Read from the newest compacted Arrow partition when it holds a snapshot
+    at least as recent as the CSV, else parsed from the CSV.
+    """
+    partition = latest_partition(platform)
+    if partition:
+        snapshot = _partition_cache.get(partition).get(location or job_specs.DEFAULT_LOCATION)
+        if snapshot:
+            scraped_at = snapshot["scraped_at"].replace(tzinfo=timezone.utc).timestamp()
+            if csv_path is None or scraped_at >= os.path.getmtime(csv_path) - SNAPSHOT_SLACK_SECONDS:
+                return snapshot["products"]
+    return load_cached_products(csv_path)
+
+
 def load_benchmarks():
-    if not os.path.exists(BENCHMARKS_PATH):
-        return {}
-    try:
-        with open(BENCHMARKS_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    return _benchmarks.get()
 
 
-def save_benchmarks(data):
-    with open(BENCHMARKS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_benchmarks(changes):
+    """Write only the benchmarks that differ from the store; returns ``(version, changed)``."""
+    return _benchmarks.update(changes)
 
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET", "change-this-secret")
 
 
-def build_view_model(platform='blinkit'):
-    csv_path = find_latest_csv(platform)
-    products = load_products(csv_path)
-    benchmarks = load_benchmarks()
-    for p in products:
-        key = p["name"]
-        p["benchmark_price"] = benchmarks.get(key, "")
-        status = ""
-        diff = ""
-        cur = p.get("current_price")
-        bench = p.get("benchmark_price")
-        try:
-            cur_val = float(cur)
-            bench_val = float(bench)
-            diff_val = cur_val - bench_val
-            status = "above" if diff_val > 0 else ("below" if diff_val < 0 else "equal")
-            diff = f"{diff_val:.2f}"
-        except Exception:
-            pass
-        p["status"] = status
-        p["diff"] = diff
-    updated_at = datetime.fromtimestamp(os.path.getmtime(csv_path)).strftime("%Y-%m-%d %H:%M:%S") if csv_path else ""
-    return products, updated_at, os.path.basename(csv_path) if csv_path else None, platform
+def snapshot_version(platform='blinkit', location=None):
+    """``(csv_path, key)`` where key changes whenever any file behind the comparison does."""
+    csv_path = find_latest_csv(platform, location)
+    partition = latest_partition(platform)
+    load_benchmarks()  # refreshes _benchmarks.version
+    return csv_path, (csv_path, file_signature(csv_path), partition, file_signature(partition), _benchmarks.version)
+
+
+def load_comparison(platform='blinkit', location=None):
+    """Benchmark comparison of the platform's latest snapshot, cached until a source file changes."""
+    csv_path, cache_key = snapshot_version(platform, location)
+    cached = _view_model_cache.get((platform, location))
+    if cached is not None and cached[0] == cache_key:
+        return cached[1], csv_path
+    comparison = Comparison(load_snapshot(platform, csv_path, location), load_benchmarks())
+    _view_model_cache[(platform, location)] = (cache_key, comparison)
+    return comparison, csv_path
+
+
+def build_view_model(platform='blinkit', location=None):
+    comparison, csv_path = load_comparison(platform, location)
+    products = list(comparison.rows())
+    return products, snapshot_updated_at(csv_path), os.path.basename(csv_path) if csv_path else None, platform, comparison.summary()
+
+
+def snapshot_updated_at(csv_path):
+    return datetime.fromtimestamp(os.path.getmtime(csv_path)).strftime("%Y-%m-%d %H:%M:%S") if csv_path else ""
+
+
+_comparison_cache = {}
+
+
+def build_comparison():
+    """Cross-platform product groups for the latest CSVs, rebuilt only when one changes."""
+    paths = {platform: find_latest_csv(platform) for platform in PLATFORMS}
+    partitions = [latest_partition(platform) for platform in PLATFORMS]
+    cache_key = tuple((path, file_signature(path)) for path in [*paths.values(), *partitions])
+    if _comparison_cache.get("key") == cache_key:
+        return _comparison_cache["groups"]
+    groups = match_platforms({platform: load_snapshot(platform, path) for platform, path in paths.items()})
+    _comparison_cache.update(key=cache_key, groups=groups)
+    return groups
 
 
 def _sign(platform: str, ts: int) -> str:
@@ -118,11 +189,139 @@ def _verify_token(platform: str, ts_str: str, sig: str, max_age_sec: int = 600)
         return False
 
 
+def dashboard_context(args):
+    """Template variables for the dashboard; all of its file and snapshot loading happens here."""
+    platform = args.get('platform', 'blinkit')
+    if platform not in PLATFORMS:
+        platform = 'blinkit'
+    location = request_location(args)
+    # Rows are fetched page by page from /api/products; only the summary is rendered here.
+    comparison, csv_path = load_comparison(platform, location)
+    return dict(
+        updated_at=snapshot_updated_at(csv_path), csv_path=os.path.basename(csv_path) if csv_path else None,
+        platform=platform, platforms=PLATFORMS, summary=comparison.summary(),
+        location=location or job_specs.DEFAULT_LOCATION, locations=job_specs.snapshot_locations(platform),
+        sort_keys=SORT_KEYS, status_filters=STATUS_FILTERS, page_size=API_PAGE_SIZE,
+    )
+
+
 @app.route("/")
 def index():
+    return render_template("dashboard.html", **dashboard_context(request.args))
+
+
+API_PAGE_SIZE = 48
+API_MAX_PAGE_SIZE = 500
+
+
+@app.route("/api/products")
+def products_api():
+    """One page of the benchmark-merged snapshot.
+
+    ``?q=`` searches names, ``?status=above,below,equal,none`` filters,
+    ``?sort=price|discount|diff`` with ``?order=asc|desc`` sorts, and
+    ``?page=``/``?per_page=`` paginate. The ETag covers the snapshot version
+    and the query, so an unchanged poll is answered 304 without building a page.
+    """
     platform = request.args.get('platform', 'blinkit')
-    products, updated_at, csv_name, platform = build_view_model(platform)
-    return render_template("dashboard.html", products=products, updated_at=updated_at, csv_path=csv_name, platform=platform, platforms=PLATFORMS)
+    if platform not in PLATFORMS:
+        return jsonify({"ok": False, "error": "unknown platform"}), 400
+    location = request_location()
+    query = request.args.get("q", "").strip()
+    statuses = [s.strip() for s in request.args.get("status", "").split(",") if s.strip()]
+    sort = request.args.get("sort") or None
+    order = request.args.get("order", "asc")
+    if sort and sort not in SORT_KEYS:
+        return jsonify({"ok": False, "error": f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+    if any(s not in STATUS_FILTERS for s in statuses):
+        return jsonify({"ok": False, "error": f"status must be among {', '.join(STATUS_FILTERS)}"}), 400
+    if order not in ("asc", "desc"):
+        return jsonify({"ok": False, "error": "order must be asc or desc"}), 400
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+        per_page = max(1, min(int(request.args.get("per_page", API_PAGE_SIZE)), API_MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"ok": False, "error": "page and per_page must be integers"}), 400
+
+    csv_path, key = snapshot_version(platform, location)
+    version = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    etag = hashlib.sha1(f"{version}|{platform}|{location}|{query}|{statuses}|{sort}|{order}|{page}|{per_page}".encode("utf-8")).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        comparison, csv_path = load_comparison(platform, location)
+        indices = comparison.select(query, statuses, sort, descending=order == "desc")
+        total = len(indices)
+        pages = (total + per_page - 1) // per_page
+        response = jsonify({
+            "platform": platform,
+            "location": location or job_specs.DEFAULT_LOCATION,
+            "version": version,
+            "updated_at": snapshot_updated_at(csv_path),
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "next_page": page + 1 if page < pages else None,
+            "products": list(comparison.rows(indices[(page - 1) * per_page:page * per_page])),
+        })
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/compare")
+def compare():
+    show_all = request.args.get("all") == "1"
+    groups = [g for g in build_comparison() if show_all or len(g["offers"]) > 1]
+    return render_template("compare.html", groups=groups, platforms=PLATFORMS, show_all=show_all)
+
+
+@app.route("/api/compare")
+def compare_api():
+    show_all = request.args.get("all") == "1"
+    groups = [g for g in build_comparison() if show_all or len(g["offers"]) > 1]
+    return jsonify({"platforms": list(PLATFORMS), "count": len(groups), "groups": groups})
+
+
+@app.route("/changes")
+def changes_feed():
+    """Delta feed from the price store.
+
+    Poll with ``?after=<id>``, passing back the returned ``next`` (null until
+    a change has been returned); ``?since=`` takes an ISO date or timestamp
+    (UTC) to start from a point in time.
+    """
+    since = request.args.get("since", "").strip()
+    platform = request.args.get("platform") or None
+    if platform and platform not in PLATFORMS:
+        return jsonify({"ok": False, "error": "unknown platform"}), 400
+    try:
+        limit = max(1, min(int(request.args.get("limit", 500)), 5000))
+    except ValueError:
+        return jsonify({"ok": False, "error": "limit must be an integer"}), 400
+    after = request.args.get("after", "").strip()
+    if after and not after.isdigit():
+        return jsonify({"ok": False, "error": "after must be a change id"}), 400
+    after_id = int(after) if after else None
+    try:
+        changes = price_store.change_log(since, platform, limit, location=request_location(), after_id=after_id)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return jsonify({
+        "since": since,
+        "after": after_id,
+        "next": changes[-1]["id"] if changes else after_id,
+        "count": len(changes),
+        "changes": changes,
+    })
+
+
+@app.route("/metrics")
+def metrics():
+    """Latest run of every scrape job in Prometheus text format."""
+    records = _metrics_cache.get(scrape_metrics.METRICS_LOG) or []
+    return Response(scrape_metrics.prometheus_text(records), mimetype="text/plain; version=0.0.4")
 
 
 @app.route("/unlock", methods=["POST"])
@@ -143,7 +342,7 @@ def benchmarks_page():
     sig = request.args.get('sig', '')
     if not _verify_token(platform, ts, sig):
         return redirect(url_for("index", platform=platform))
-    products, updated_at, csv_name, platform = build_view_model(platform)
+    products, updated_at, csv_name, platform, summary = build_view_model(platform)
     return render_template("benchmarks.html", products=products, updated_at=updated_at, csv_path=csv_name, platform=platform, platforms=PLATFORMS, ts=ts, sig=sig)
 
 
@@ -155,78 +354,160 @@ def save_benchmarks_route():
     sig = form.get('sig', '')
     if not _verify_token(platform, ts, sig):
         return redirect(url_for("index", platform=platform))
-    benchmarks = load_benchmarks()
+    changes = {}
     for key, value in form.items():
         if key.startswith("price_"):
             name_key = key.replace("price_", "name_")
             product_name = form.get(name_key, "").strip()
             if product_name:
                 try:
-                    benchmarks[product_name] = float(value)
+                    changes[product_name] = float(value)
                 except Exception:
-                    benchmarks[product_name] = value
-    save_benchmarks(benchmarks)
+                    changes[product_name] = value
+    save_benchmarks(changes)
     # After save, send back to dashboard (token not persisted)
     return redirect(url_for("index", platform=platform))
 
 
+EXPORT_BATCH_SIZE = 5000
+
+
+def _snapshot_batches(platforms, location=None):
+    """Latest snapshot of each platform, compared against the benchmarks."""
+    for platform in platforms:
+        comparison, _ = load_comparison(platform, location)
+        batch = []
+        for row in comparison.rows():
+            row["platform"] = platform
+            row["location"] = location or job_specs.DEFAULT_LOCATION
+            batch.append(row)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _history_batches(platform, start, end, location=None):
+    """Stored observations in a date range, compared batch by batch."""
+    benchmarks = load_benchmarks()
+    for batch in snapshot_store.iter_history(platform, start, end, location, batch_size=EXPORT_BATCH_SIZE):
+        products = [{
+            "platform": r["platform"],
+            "location": r["location"],
+            "scraped_at": r["scraped_at"],
+            "name": r["name"],
+            "current_price": "NA" if r["current_price"] is None else str(r["current_price"]),
+            "original_price": "NA" if r["original_price"] is None else str(r["original_price"]),
+            "discount": r["discount"] or "NA",
+            "sizes": r["size"] or "NA",
+        } for r in batch]
+        yield list(Comparison(products, benchmarks).rows())
+
+
+def export_stream(args):
+    """``(mimetype, filename, chunks)`` for an export; ``chunks`` is lazy and does the reading.
+
+    Raises ValueError for an unknown format.
+    """
+    platform = args.get('platform', 'blinkit')
+    fmt = args.get('format', 'csv')
+    start = args.get('from') or None
+    end = args.get('to') or None
+    location = request_location(args)
+    if fmt not in ENCODERS:
+        raise ValueError(f"unknown format '{fmt}'")
+    if platform != 'all' and platform not in PLATFORMS:
+        platform = 'blinkit'
+
+    fieldnames = list(EXPORT_FIELDS)
+    if start or end:
+        batches = _history_batches(None if platform == 'all' else platform, start, end, location)
+        fieldnames = ["platform", "location", "scraped_at"] + fieldnames
+    elif platform == 'all':
+        batches = _snapshot_batches(list(PLATFORMS), location)
+        fieldnames = ["platform", "location"] + fieldnames
+    else:
+        batches = _snapshot_batches([platform], location)
+
+    mimetype, ext = FORMATS[fmt]
+    suffix = f"_{location}" if location else ""
+    return mimetype, f"export_with_benchmarks_{platform}{suffix}.{ext}", ENCODERS[fmt](batches, fieldnames)
+
+
 @app.route("/export")
 def export():
-    platform = request.args.get('platform', 'blinkit')
-    csv_path = find_latest_csv(platform)
-    products = load_products(csv_path)
-    benchmarks = load_benchmarks()
+    """Stream the benchmark-merged export as CSV, JSON lines or Parquet.
 
-    export_path = os.path.join(APP_DIR, f"export_with_benchmarks_{platform}.csv")
-    with open(export_path, "w", newline="", encoding="utf-8") as f:
-        fieldnames = [
-            "name",
-            "current_price",
-            "original_price",
-            "discount",
-            "sizes",
-            "benchmark_price",
-            "status",
-            "diff",
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for p in products:
-            name = p["name"]
-            cur = p.get("current_price") or ""
-            bench = benchmarks.get(name, "")
-            status = ""
-            diff = ""
-            try:
-                cur_val = float(cur)
-                bench_val = float(bench)
-                diff_val = cur_val - bench_val
-                status = "above" if diff_val > 0 else ("below" if diff_val < 0 else "equal")
-                diff = f"{diff_val:.2f}"
-            except Exception:
-                pass
-            row = dict(p)
-            row.update({
-                "benchmark_price": bench,
-                "status": status,
-                "diff": diff,
-            })
-            writer.writerow(row)
+    ``?platform=all`` exports every platform; ``?from=``/``?to=`` (YYYY-MM-DD)
+    export stored price history instead of the latest snapshot, and
+    ``?location=brand@pincode`` picks a location other than the default.
+    """
+    try:
+        mimetype, filename, chunks = export_stream(request.args)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+def is_admin_key(key):
+    return hmac.compare_digest(key or "", ADMIN_KEY)
 
-    return send_file(export_path, as_attachment=True)
+
+def _is_admin():
+    return is_admin_key(request.headers.get("X-Admin-Key") or request.form.get("key") or request.args.get("key"))
+
+
+def queue_scrapers(requested):
+    """Enqueue a run for the comma-separated ``requested`` platforms (all if empty) and start it.
+
+    Returns ``(job, created)``; an already active run is returned instead of a
+    second one. Raises ValueError for unknown platforms.
+    """
+    platforms = [p.strip().lower() for p in (requested or "").split(",") if p.strip()] or list(PLATFORMS)
+    unknown = [p for p in platforms if p not in PLATFORMS]
+    if unknown:
+        raise ValueError(f"unknown platform(s): {', '.join(unknown)}")
+    job, created = jobs.enqueue(platforms)
+    if created:
+        python_bin = os.environ.get("PYTHON_BIN") or os.path.join(APP_DIR, 'venv', 'bin', 'python')
+        if not os.path.exists(python_bin):
+            python_bin = 'python'
+        jobs.start(job, python_bin, os.path.join(APP_DIR, 'run_all_scrapers.py'), APP_DIR)
+    return job, created
 
 
 @app.route("/tasks/run-scrapers", methods=["POST"])
 def run_scrapers_task():
-    key = request.headers.get("X-Admin-Key") or request.form.get("key") or ""
-    if key != ADMIN_KEY:
+    """Queue a scraper run and return at once; poll ``status_url`` for progress."""
+    if not _is_admin():
         return jsonify({"ok": False, "error": "unauthorized"}), 401
-    python_bin = os.environ.get("PYTHON_BIN") or os.path.join(APP_DIR, 'venv', 'bin', 'python')
-    if not os.path.exists(python_bin):
-        python_bin = 'python'
-    code = subprocess.call([python_bin, os.path.join(APP_DIR, 'run_all_scrapers.py')], cwd=APP_DIR)
-    return jsonify({"ok": code == 0, "code": code})
-
+    try:
+        job, created = queue_scrapers(request.form.get("platforms") or request.args.get("platforms"))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return jsonify({
+        "ok": True,
+        "job_id": job["id"],
+        "state": job["state"],
+        "deduplicated": not created,
+        "status_url": url_for("scraper_job_status", job_id=job["id"]),
+    }), 202
+
+
+@app.route("/tasks/<job_id>")
+def scraper_job_status(job_id):
+    if not _is_admin():
+        return jsonify({"ok": False, "error": "unauthorized"}), 401
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "unknown job"}), 404
+    job.pop("pid", None)
+    return jsonify({"ok": True, **job})
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,172 @@
+"""ASGI serving mode for the dashboard.
+
+    uvicorn asgi:application --host 0.0.0.0 --port $PORT --workers 2
+
+Under ``gunicorn -w 2 app:app`` every request holds one of two sync
+workers for as long as it globs, stats, parses a CSV or Arrow partition,
+or streams an export. Here the hot routes are coroutines on each worker's
+event loop:
+
+- ``/`` loads its snapshot and comparison (``app.dashboard_context``) in a
+  thread and renders the summary template on the loop.
+- ``/export`` pulls each encoded chunk from ``app.export_stream`` in a
+  thread, so a large export never stalls the requests around it.
+- ``POST /tasks/run-scrapers`` enqueues the run and starts its subprocess
+  off the loop, and answers 202 at once.
+
+Every other route is the unchanged Flask app behind asgiref's
+``WsgiToAsgi``, which also runs it in a thread. The same caches and
+helpers serve both modes, so the responses are identical.
+``perf/load_test.py`` compares the two deployments.
+"""
+import asyncio
+import os
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import render_template
+from werkzeug.datastructures import MultiDict
+
+import app as dashboard
+
+wsgi_application = WsgiToAsgi(dashboard.app)
+# Exports are CPU-bound. Interleaving all of them only makes each one finish
+# later, so a worker streams this many at a time and queues the rest.
+EXPORT_CONCURRENCY = int(os.environ.get("ASGI_EXPORT_CONCURRENCY", "2"))
+_export_slots = None
+
+
+def query_args(scope):
+    return MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+
+
+def header(scope, name):
+    name = name.lower().encode("latin-1")
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_response(send, status, body, content_type, headers=()):
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, status, payload):
+    # Same encoding (compact, sorted keys, trailing newline) as Flask's jsonify.
+    await send_response(send, status, dashboard.app.json.dumps(payload, separators=(",", ":")) + "\n", "application/json")
+
+
+async def index(scope, receive, send):
+    context = await asyncio.to_thread(dashboard.dashboard_context, query_args(scope))
+    with dashboard.app.app_context():
+        html = render_template("dashboard.html", **context)
+    await send_response(send, 200, html, "text/html; charset=utf-8")
+
+
+async def export(scope, receive, send):
+    global _export_slots
+    if _export_slots is None:
+        _export_slots = asyncio.Semaphore(EXPORT_CONCURRENCY)
+    async with _export_slots:
+        await stream_export(scope, send)
+
+
+async def stream_export(scope, send):
+    try:
+        mimetype, filename, chunks = dashboard.export_stream(query_args(scope))
+    except ValueError as e:
+        await send_json(send, 400, {"ok": False, "error": str(e)})
+        return
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", mimetype.encode("latin-1")),
+            (b"content-disposition", f"attachment; filename={filename}".encode("latin-1")),
+        ],
+    })
+    try:
+        while True:
+            # Each chunk reads and compares up to EXPORT_BATCH_SIZE rows; keep that off the loop.
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            await send({
+                "type": "http.response.body",
+                "body": chunk.encode("utf-8") if isinstance(chunk, str) else chunk,
+                "more_body": True,
+            })
+    finally:
+        await asyncio.to_thread(chunks.close)
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def run_scrapers(scope, receive, send):
+    args = query_args(scope)
+    form = MultiDict()
+    if (header(scope, "content-type") or "").startswith("application/x-www-form-urlencoded"):
+        form = MultiDict(parse_qsl((await read_body(receive)).decode("utf-8"), keep_blank_values=True))
+    if not dashboard.is_admin_key(header(scope, "x-admin-key") or form.get("key") or args.get("key")):
+        await send_json(send, 401, {"ok": False, "error": "unauthorized"})
+        return
+    try:
+        job, created = await asyncio.to_thread(dashboard.queue_scrapers, form.get("platforms") or args.get("platforms"))
+    except ValueError as e:
+        await send_json(send, 400, {"ok": False, "error": str(e)})
+        return
+    await send_json(send, 202, {
+        "ok": True,
+        "job_id": job["id"],
+        "state": job["state"],
+        "deduplicated": not created,
+        "status_url": f"{scope.get('root_path', '')}/tasks/{job['id']}",
+    })
+
+
+ROUTES = {
+    ("GET", "/"): index,
+    ("GET", "/export"): export,
+    ("POST", "/tasks/run-scrapers"): run_scrapers,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    handler = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if handler is None:
+        await wsgi_application(scope, receive, send)
+        return
+    await handler(scope, receive, send)
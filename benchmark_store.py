@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Benchmark prices in SQLite, with versioned partial updates.
+
+One row per product name, plus a ``version`` counter that every write
+bumps in the same transaction. Writers take SQLite's write lock with
+``BEGIN IMMEDIATE``, so saves from several gunicorn workers serialise
+instead of overwriting each other. An update only touches the keys whose
+value actually changed. Readers never see a half-written state, and each
+worker keeps a ``BenchmarkCache`` that costs one ``SELECT version`` per
+request and reloads only after some process has written.
+
+The first connect to an empty database imports ``benchmarks.json``, the
+store's previous home, if it exists.
+
+    python benchmark_store.py import benchmarks.json --replace
+    python benchmark_store.py export > benchmarks.json
+    python benchmark_store.py set "Pepe Jeans Men's Vest" 349
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("BENCHMARKS_DB_PATH", os.path.join(APP_DIR, "benchmarks.db"))
+LEGACY_JSON_PATH = os.environ.get("BENCHMARKS_JSON_PATH", os.path.join(APP_DIR, "benchmarks.json"))
+
+# ``value`` has no declared type so numbers stay numbers and "" stays "",
+# exactly as the JSON file held them.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS benchmarks (
+    name TEXT PRIMARY KEY,
+    value,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%S', 'now'))
+);
+CREATE TABLE IF NOT EXISTS meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    imported INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO meta (id, version) VALUES (1, 0);
+"""
+# Stands in for "no stored value", which "" cannot: "" is a stored value.
+_ABSENT = object()
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    if "imported" not in {r[1] for r in conn.execute("PRAGMA table_info(meta)")}:
+        # Stores from before the flag: one that was ever written needs no import.
+        try:
+            conn.execute("ALTER TABLE meta ADD COLUMN imported INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE meta SET imported = 1 WHERE version > 0")
+        except sqlite3.OperationalError:
+            pass  # another worker added it first
+    if os.path.exists(LEGACY_JSON_PATH):
+        _import_legacy(conn)
+    return conn
+
+
+def _import_legacy(conn):
+    """Seed a brand-new store from benchmarks.json, once.
+
+    The ``imported`` flag, not the version, records that this happened, so a
+    file whose entries are all "" is not parsed again on every connect. A
+    store that was already written to is only flagged.
+    """
+    imported, current = conn.execute("SELECT imported, version FROM meta").fetchone()
+    if imported:
+        return
+    data = {}
+    if not current:
+        try:
+            with open(LEGACY_JSON_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+    _write(conn, data, imported=True)
+
+
+def version(conn):
+    return conn.execute("SELECT version FROM meta").fetchone()[0]
+
+
+def read_all(conn):
+    """``(version, {name: value})`` read in one transaction, so the two always agree."""
+    conn.execute("BEGIN")
+    try:
+        current = version(conn)
+        return current, dict(conn.execute("SELECT name, value FROM benchmarks"))
+    finally:
+        conn.execute("COMMIT")
+
+
+def _read_keys(conn, names):
+    """``{name: value}`` for ``names`` (every row if None), looked up by primary key."""
+    if names is None:
+        return dict(conn.execute("SELECT name, value FROM benchmarks"))
+    out = {}
+    for i in range(0, len(names), 500):
+        chunk = names[i:i + 500]
+        out.update(conn.execute(f"SELECT name, value FROM benchmarks WHERE name IN ({','.join('?' * len(chunk))})", chunk))
+    return out
+
+
+def _write(conn, changes, replace=False, imported=False):
+    """Apply ``changes`` under the write lock; returns ``(version, changed_count)``.
+
+    A value of None deletes the key. With ``replace`` every key not in
+    ``changes`` is deleted too. Keys whose value is unchanged are skipped,
+    and the version only moves if something was written. ``imported`` also
+    sets the legacy-import flag in the same transaction.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = _read_keys(conn, None if replace else list(changes))
+        upserts = [
+            (name, value) for name, value in changes.items()
+            if value is not None and current.get(name, _ABSENT) != value
+        ]
+        deletes = [name for name, value in changes.items() if value is None and name in current]
+        if replace:
+            deletes += [name for name in current if name not in changes]
+        conn.executemany(
+            "INSERT INTO benchmarks (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            upserts,
+        )
+        conn.executemany("DELETE FROM benchmarks WHERE name = ?", [(name,) for name in deletes])
+        changed = len(upserts) + len(deletes)
+        if changed:
+            conn.execute("UPDATE meta SET version = version + 1")
+        if imported:
+            conn.execute("UPDATE meta SET imported = 1")
+        new_version = version(conn)
+        conn.execute("COMMIT")
+        return new_version, changed
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def update(changes, path=None, replace=False):
+    """Write only the changed benchmarks; returns ``(version, changed_count)``."""
+    conn = connect(path)
+    try:
+        return _write(conn, changes, replace)
+    finally:
+        conn.close()
+
+
+def load(path=None):
+    """All benchmarks as ``{name: value}``."""
+    conn = connect(path)
+    try:
+        return read_all(conn)[1]
+    finally:
+        conn.close()
+
+
+class BenchmarkCache:
+    """A worker's copy of the benchmarks, reloaded only when the store's version moves.
+
+    Each thread keeps its own connection, so a check is a single indexed read.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entry = (None, {})
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    @property
+    def version(self):
+        return self._entry[0]
+
+    def get(self):
+        """The current benchmarks; treat the returned dict as read-only."""
+        conn = self._conn()
+        if version(conn) != self._entry[0]:
+            # Version and data are swapped in together, so no thread sees a mix.
+            self._entry = read_all(conn)
+        return self._entry[1]
+
+    def update(self, changes):
+        return _write(self._conn(), changes)
+
+    def clear(self):
+        self._entry = (None, {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the benchmark price store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="load benchmarks from a JSON object of name -> price")
+    imp.add_argument("json_path")
+    imp.add_argument("--replace", action="store_true", help="delete benchmarks missing from the file")
+    sub.add_parser("export", help="print all benchmarks as JSON")
+    one = sub.add_parser("set", help="set (or with no price, delete) one benchmark")
+    one.add_argument("name")
+    one.add_argument("price", nargs="?", type=float)
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        with open(args.json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        new_version, changed = update(data, replace=args.replace)
+        print(f"Changed {changed} benchmark(s); store is at version {new_version}")
+    elif args.command == "export":
+        json.dump(load(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        new_version, changed = update({args.name: args.price})
+        print(f"Changed {changed} benchmark(s); store is at version {new_version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,151 +1,147 @@
-from playwright.sync_api import sync_playwright
-from datetime import date
-import csv
-import re
-import time
-
-def clean_price(price_str):
-    """Remove currency symbols and commas, return as number or NA."""
-    if not price_str or price_str == "NA":
-        return "NA"
-    price = re.sub(r"[^\d]", "", price_str)
-    return price if price else "NA"
-
-def scrape_blinkit_pepe(output_file=None):
-    url = "https://blinkit.com/dc/?collection_filters=W3siYnJhbmRfaWQiOlsxNjIyOF19XQ%3D%3D&collection_name=Pepe+Jeans+Innerfashion"
-    if output_file is None:
-        output_file = f"./blinkit_data.csv"
-
-    with sync_playwright() as p:
-        print("Launching headless browser...")
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            geolocation={"latitude": 28.6139, "longitude": 77.2090},
-            locale="en-IN",
-            permissions=["geolocation"],
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/126.0.0.0 Safari/537.36"
-            ),
+import asyncio
+import urllib.parse
+
+from api_capture import first, price_value, text_of
+from job_specs import DEFAULT_BRAND, DEFAULT_PINCODE
+from scraper_engine import PlatformAdapter, Product, clean_text, run_standalone, scrape
+
+HOME_URL = "https://blinkit.com/"
+CATALOGUE_URL = "https://blinkit.com/dc/?collection_filters=W3siYnJhbmRfaWQiOlsxNjIyOF19XQ%3D%3D&collection_name=Pepe+Jeans+Innerfashion"
+PINCODE = DEFAULT_PINCODE
+
+# In-page extractor: returns the visible card count and, unless told not to,
+# every card whose name is not in ``seen`` as plain JSON (one IPC per round).
+EXTRACT_CARDS_JS = """
+({ seen, extract }) => {
+  let cards = document.querySelectorAll("div[role='button'].tw-relative.tw-flex.tw-h-full.tw-flex-col.tw-items-start");
+  if (!cards.length) cards = document.querySelectorAll("div[data-test-id='product-card']");
+  const rows = [];
+  if (!extract) return { count: cards.length, rows };
+  const skip = new Set(seen);
+  const text = (card, selectors) => {
+    for (const sel of selectors) {
+      const el = card.querySelector(sel);
+      if (el) return el.innerText.trim();
+    }
+    return null;
+  };
+  for (const card of cards) {
+    const name = text(card, ["div.tw-text-300.tw-font-semibold", "[data-test-id='product-name']"]);
+    if (!name || skip.has(name)) continue;
+    skip.add(name);
+    const sizeEl = [...card.querySelectorAll("div.tw-font-semibold")].find(el => /size/i.test(el.innerText))
+      || card.querySelector("[data-test-id='size']");
+    rows.push({
+      name,
+      current_price: text(card, ["div.tw-text-200.tw-font-semibold", "[data-test-id='current-price']"]),
+      original_price: text(card, ["div.tw-text-200.tw-font-regular", "[data-test-id='original-price']"]),
+      discount: text(card, ["div.tw-text-050", "[data-test-id='discount']"]),
+      sizes: sizeEl ? sizeEl.innerText : null,
+    });
+  }
+  return { count: cards.length, rows };
+}
+"""
+
+
+def catalogue_url(brand):
+    """The Pepe collection page, or a search results page for any other brand."""
+    if brand["brand"] == DEFAULT_BRAND["brand"]:
+        return CATALOGUE_URL
+    return f"https://blinkit.com/s/?q={urllib.parse.quote_plus(brand['query'])}"
+
+
+class BlinkitAdapter(PlatformAdapter):
+    platform = "blinkit"
+    default_output = "./blinkit_data.csv"
+    home_url = HOME_URL
+    # Listing/search endpoints the collection page pages through.
+    api_url_fragments = ("/v1/layout/", "/v2/collection", "/v6/search", "/listing")
+    location_prompt_selector = "input[placeholder*='pincode' i], input[aria-label*='pincode' i]"
+    card_selector = "div[role='button'].tw-relative.tw-flex.tw-h-full.tw-flex-col.tw-items-start, div[data-test-id='product-card']"
+    extract_js = EXTRACT_CARDS_JS
+    context_options = {
+        "geolocation": {"latitude": 28.6139, "longitude": 77.2090},
+        "locale": "en-IN",
+        "permissions": ["geolocation"],
+        "user_agent": (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/126.0.0.0 Safari/537.36"
+        ),
+    }
+    max_stable_rounds = 4
+    max_rounds = 300
+
+    def parse_api_item(self, item):
+        """Map one product dict from a Blinkit listing payload to a Product."""
+        name = text_of(first(item, "name", "display_name"))
+        cur = first(item, "price", "normal_price", "offer_price")
+        if not isinstance(name, str) or cur is None or isinstance(cur, (list, bool)):
+            return None
+        return Product(
+            name,
+            price_value(text_of(cur)),
+            price_value(text_of(first(item, "mrp", "original_price"))),
+            clean_text(text_of(first(item, "offer", "offer_tag.title", "discount"))),
+            clean_text(text_of(first(item, "unit", "variant", "size"))),
         )
-        page = context.new_page()
-
-        try:
-            # Set serviceable location
-            print("Opening homepage to set location...")
-            page.goto("https://blinkit.com/", timeout=120000)
-            page.wait_for_load_state("domcontentloaded")
-            time.sleep(1)
-
-            print("Attempting to set pincode to 560012...")
-            pin_input_selectors = [
-                "input[placeholder*='pincode' i]",
-                "input[aria-label*='pincode' i]",
-                "input[type='tel']",
-                "input[type='text']",
-            ]
-            pincode_set = False
-            for sel in pin_input_selectors:
-                el = page.query_selector(sel)
-                if el:
-                    try:
-                        el.click()
-                        el.fill("560012")
-                        el.press("Enter")
-                        page.wait_for_load_state("networkidle")
-                        time.sleep(1)
-                        pincode_set = True
-                        print("Pincode entered.")
-                        break
-                    except Exception:
-                        pass
-
-            # Navigate to the collection URL
-            print(f"Opening URL: {url}")
-            page.goto(url, timeout=120000)
-            page.wait_for_load_state("domcontentloaded")
-            time.sleep(3)
-
-            # Scroll to load all products
-            print("Scrolling to load all products...")
-            stable_rounds = 0
-            max_stable_rounds = 4
-            total_rounds = 0
-            max_total_rounds = 300
-            last_card_count = 0
-            collected = {}
-
-            def parse_card(card):
-                # Product name
-                name_tag = card.query_selector("div.tw-text-300.tw-font-semibold") or card.query_selector("[data-test-id='product-name']")
-                name = (name_tag.inner_text().strip() if name_tag else "NA")
-                if name == "NA":
-                    return None, None
-
-                # Prices
-                cur_tag = card.query_selector("div.tw-text-200.tw-font-semibold") or card.query_selector("[data-test-id='current-price']")
-                orig_tag = card.query_selector("div.tw-text-200.tw-font-regular") or card.query_selector("[data-test-id='original-price']")
-                cur_price = clean_price(cur_tag.inner_text().strip()) if cur_tag else "NA"
-                orig_price = clean_price(orig_tag.inner_text().strip()) if orig_tag else "NA"
-
-                # Discount
-                discount_tag = card.query_selector("div.tw-text-050") or card.query_selector("[data-test-id='discount']")
-                discount = discount_tag.inner_text().strip() if discount_tag else "NA"
-
-                # Sizes
-                sizes_tag = card.query_selector("div.tw-font-semibold:has-text('Size')") or card.query_selector("[data-test-id='size']")
-                sizes = sizes_tag.inner_text().replace("ADD", "").strip() if sizes_tag else "NA"
-
-                return name, {
-                    "name": name,
-                    "current_price": cur_price,
-                    "original_price": orig_price,
-                    "discount": discount,
-                    "sizes": sizes,
-                }
-
-            while True:
-                total_rounds += 1
-                cards = page.query_selector_all("div[role='button'].tw-relative.tw-flex.tw-h-full.tw-flex-col.tw-items-start") or page.query_selector_all("div[data-test-id='product-card']") or []
-                new_added = 0
-                for card in cards:
-                    key, data = parse_card(card)
-                    if key and key not in collected:
-                        collected[key] = data
-                        new_added += 1
-
-                card_count = len(cards)
-                print(f"Scroll round {total_rounds}: cards visible = {card_count}, new added = {new_added}")
-
-                if card_count <= last_card_count:
-                    stable_rounds += 1
-                else:
-                    stable_rounds = 0
-                    last_card_count = card_count
-
-                if stable_rounds >= max_stable_rounds or total_rounds >= max_total_rounds:
-                    break
-
-                # Scroll page down
-                page.evaluate("window.scrollBy(0, window.innerHeight * 0.8)")
-                time.sleep(1)
-
-                        # Save CSV only if products were scraped
-            products = list(collected.values())
-            if products:  # <-- NEW check
-                with open(output_file, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.DictWriter(f, fieldnames=["name", "current_price", "original_price", "discount", "sizes"])
-                    writer.writeheader()
-                    writer.writerows(products)
-                print(f"Scraped {len(products)} unique products. Saved to {output_file}")
-            else:
-                print("No products scraped. CSV file not modified.")
-
-
-        finally:
-            context.close()
-            browser.close()
+
+    def normalise(self, raw):
+        # The size label shares its element with the "ADD" button text.
+        product = Product.from_dom(raw)
+        product.sizes = clean_text(product.sizes.replace("ADD", ""))
+        return product
+
+    async def set_location(self, page, pincode):
+        """Open the homepage and enter the delivery pincode; True if it was accepted."""
+        self.log("Opening homepage to set location...")
+        await page.goto(HOME_URL, timeout=120000)
+        await page.wait_for_load_state("domcontentloaded")
+        await asyncio.sleep(1)
+
+        self.log(f"Attempting to set pincode to {pincode}...")
+        pin_input_selectors = [
+            "input[placeholder*='pincode' i]",
+            "input[aria-label*='pincode' i]",
+            "input[type='tel']",
+            "input[type='text']",
+        ]
+        for sel in pin_input_selectors:
+            el = await page.query_selector(sel)
+            if el:
+                try:
+                    await el.click()
+                    await el.fill(pincode)
+                    await el.press("Enter")
+                    await page.wait_for_load_state("networkidle")
+                    await asyncio.sleep(1)
+                    self.log("Pincode entered.")
+                    return True
+                except Exception:
+                    pass
+        return False
+
+    async def open_catalogue(self, page, brand):
+        url = catalogue_url(brand)
+        self.log(f"Opening URL: {url}")
+        await page.goto(url, timeout=120000)
+        await page.wait_for_load_state("domcontentloaded")
+        await asyncio.sleep(3)
+        return True
+
+
+ADAPTER = BlinkitAdapter()
+
+
+async def scrape_blinkit_pepe_async(browser, output_file=None, pincode=PINCODE, brand=None, metrics=None):
+    """Scrape one brand at one pincode in its own context of a shared browser."""
+    return await scrape(ADAPTER, browser, output_file, pincode, brand, metrics)
+
+
+def scrape_blinkit_pepe(output_file=None, pincode=PINCODE, brand=None):
+    """Standalone entry point: launch a browser just for Blinkit."""
+    return run_standalone(ADAPTER, output_file, pincode, brand)
 
 
 if __name__ == "__main__":
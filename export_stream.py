@@ -0,0 +1,89 @@
+"""Streaming encoders for the dashboard export.
+
+Each encoder takes an iterable of row batches (lists of dicts) and yields
+encoded chunks, so a response can be written to the client while rows are
+still being read, with memory bounded by one batch whatever the export
+size. Nothing touches the disk.
+"""
+import csv
+import io
+import json
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def iter_csv(batches, fieldnames):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    tail = buf.getvalue()
+    if tail:
+        yield tail
+
+
+def iter_jsonl(batches, fieldnames):
+    for batch in batches:
+        yield "".join(json.dumps({k: row.get(k, "") for k in fieldnames}, ensure_ascii=False) + "\n" for row in batch)
+
+
+class _ChunkSink:
+    """Write-only file object whose bytes are drained after every row group."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_parquet(batches, fieldnames):
+    """One Parquet row group per batch; every column is written as a string."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.string()) for name in fieldnames])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for batch in batches:
+            columns = {name: ["" if row.get(name) is None else str(row.get(name)) for row in batch] for name in fieldnames}
+            writer.write_table(pa.table(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+ENCODERS = {"csv": iter_csv, "jsonl": iter_jsonl, "parquet": iter_parquet}
@@ -0,0 +1,62 @@
+"""In-process caches keyed on file identity (path, mtime, size).
+
+The dashboard re-reads the same few files on every request. These helpers
+keep the parsed result per worker and only reload when the file on disk has
+actually changed, so steady-state page views cost a ``stat`` instead of a
+glob plus a full CSV/JSON parse.
+"""
+import glob
+import os
+
+
+def file_signature(path):
+    """``(mtime_ns, size)`` of ``path``, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, TypeError):
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileCache:
+    """Memoise ``loader(path)`` until the file's signature changes."""
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._entries = {}
+
+    def get(self, path):
+        sig = file_signature(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == sig:
+            return entry[1]
+        value = self.loader(path)
+        self._entries[path] = (sig, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+
+class LatestMatchCache:
+    """Newest file matching a glob pattern, re-globbing only when its directory changes.
+
+    Adding, removing or renaming files bumps the directory mtime; rewriting an
+    existing file does not, so candidates are still re-stat'ed to pick the newest.
+    """
+
+    def __init__(self):
+        self._matches = {}
+
+    def latest(self, pattern):
+        dir_sig = file_signature(os.path.dirname(pattern) or ".")
+        entry = self._matches.get(pattern)
+        if entry is None or entry[0] != dir_sig:
+            entry = (dir_sig, glob.glob(pattern))
+            self._matches[pattern] = entry
+        newest, newest_mtime = None, None
+        for path in entry[1]:
+            sig = file_signature(path)
+            if sig is not None and (newest_mtime is None or sig[0] > newest_mtime):
+                newest, newest_mtime = path, sig[0]
+        return newest
@@ -0,0 +1,82 @@
+"""Incremental crawling against the previous run's product set.
+
+A full crawl only stops after several rounds in which nothing new appears,
+so every run pays for the whole catalogue plus that idle tail. When the
+previous CSV is known, a ``CatalogueTracker`` ends the scroll as soon as
+every known product has been seen again and a short settle window
+(``SCRAPER_INCREMENTAL_SETTLE`` rounds) has passed with no new items. A
+removed product keeps the known set incomplete, so that run falls back to
+the normal stability rule and the removal is still seen.
+
+Each run's additions and removals are appended to ``scrape_deltas.jsonl``.
+Set ``SCRAPER_INCREMENTAL=0`` to always crawl in full.
+"""
+import csv
+import json
+import os
+
+from price_store import product_key, utc_now
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ENABLED = os.environ.get("SCRAPER_INCREMENTAL", "1") != "0"
+SETTLE_ROUNDS = int(os.environ.get("SCRAPER_INCREMENTAL_SETTLE", "2"))
+DELTA_LOG = os.environ.get("SCRAPER_DELTA_LOG", os.path.join(APP_DIR, "scrape_deltas.jsonl"))
+
+
+def previous_names(csv_path):
+    """Product names from the last CSV a scraper wrote; empty if there is none."""
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            return [row["name"] for row in csv.DictReader(f) if row.get("name")]
+    except (OSError, KeyError, csv.Error):
+        return []
+
+
+class CatalogueTracker:
+    """Decides when a scroll loop has re-seen the whole known catalogue."""
+
+    def __init__(self, known_names, settle_rounds=SETTLE_ROUNDS, enabled=ENABLED):
+        self.known = {product_key(n): n for n in known_names}
+        self.seen = set()
+        self.settle_rounds = settle_rounds
+        self.enabled = enabled and bool(self.known)
+        self.quiet_rounds = 0
+
+    def observe(self, names):
+        """Record the names collected so far; call once per scroll round."""
+        before = len(self.seen)
+        self.seen.update(product_key(n) for n in names)
+        if len(self.seen) > before or not self.known.keys() <= self.seen:
+            self.quiet_rounds = 0
+        else:
+            self.quiet_rounds += 1
+
+    @property
+    def missing(self):
+        return len(self.known.keys() - self.seen)
+
+    def done(self):
+        return self.enabled and self.known.keys() <= self.seen and self.quiet_rounds >= self.settle_rounds
+
+
+def record_delta(platform, tracker, products, early_stop, path=None):
+    """Append this run's additions/removals to the delta log; returns the counts."""
+    current = {product_key(p["name"]): p["name"] for p in products}
+    added = sorted(name for key, name in current.items() if key not in tracker.known)
+    removed = sorted(name for key, name in tracker.known.items() if key not in current)
+    entry = {
+        "platform": platform,
+        "scraped_at": utc_now(),
+        "early_stop": early_stop,
+        "count": len(current),
+        "added": added,
+        "removed": removed,
+    }
+    # The very first run has nothing to diff against; only log real deltas.
+    if tracker.known:
+        try:
+            with open(path or DELTA_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"[{platform}] Could not write delta log: {e}", flush=True)
+    return {"added": len(added), "removed": len(removed), "early_stop": early_stop}
@@ -1,128 +1,134 @@
-from playwright.sync_api import sync_playwright
-import re
-import time
-import csv
-
-
-def clean_price(text):
-    if not text:
-        return "NA"
-    return re.sub(r"[^\d]", "", text)
-
-
-def scrape_instamart_pepe():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto("https://www.swiggy.com/instamart")
-
-        # --- Step 3: Click on "Search for an area or address"
-        page.wait_for_selector('div.sc-aXZVg.jubfzr.tDEYY')
-        page.click('div.sc-aXZVg.jubfzr.tDEYY')
-
-        # --- Step 4: Enter pin code
-        page.wait_for_selector('input._1wkJd')
-        page.fill('input._1wkJd', '560012')
-        page.keyboard.press("Enter")
-        time.sleep(1)
-        page.click('div._11n32 div.sc-aXZVg.gPfbij')
-
-        # --- Step 5: Confirm location
-        page.wait_for_selector('button:has-text("Confirm Location")')
-        page.click('button:has-text("Confirm Location")')
-
-        # --- Step 6: Click "Re-check your address" if it appears
-        time.sleep(2)
-        recheck_elements = page.query_selector_all('div.sc-aXZVg.dsXDwT')
+from playwright.async_api import TimeoutError
+import asyncio
+
+from api_capture import first, price_value, text_of
+from job_specs import DEFAULT_PINCODE
+from scraper_engine import PlatformAdapter, Product, clean_text, run_standalone, scrape
+
+HOME_URL = "https://www.swiggy.com/instamart"
+PINCODE = DEFAULT_PINCODE
+
+# In-page extractor: every unseen product card as plain JSON in one round trip.
+EXTRACT_CARDS_JS = """
+({ seen, extract }) => {
+  const cards = document.querySelectorAll('div[data-testid="default_container_ux4"]');
+  const rows = [];
+  if (!extract) return { count: cards.length, rows };
+  const skip = new Set(seen);
+  const text = (card, sel) => {
+    const el = card.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+  };
+  for (const card of cards) {
+    const name = text(card, "div.byAowK._1sPB0") || text(card, "div.novMV");
+    if (!name || skip.has(name)) continue;
+    skip.add(name);
+    rows.push({
+      name,
+      sizes: text(card, 'div[aria-label*="Small"], div[aria-label*="Medium"], div[aria-label*="Large"]'),
+      current_price: text(card, 'div[data-testid="item-offer-price"]'),
+      original_price: text(card, 'div[data-testid="item-mrp-price"]'),
+      discount: text(card, 'div[data-testid="offer-text"]'),
+    });
+  }
+  return { count: cards.length, rows };
+}
+"""
+
+
+class InstamartAdapter(PlatformAdapter):
+    platform = "instamart"
+    default_output = "instamart_data.csv"
+    home_url = HOME_URL
+    # Swiggy Instamart listing/search endpoints that feed the brand page.
+    api_url_fragments = ("/api/instamart/search", "/api/instamart/category-listing", "/api/instamart/item", "/api/instamart/home")
+    # "Search for an area or address" entry shown when no location is set.
+    location_prompt_selector = "div.sc-aXZVg.jubfzr.tDEYY, input._1wkJd"
+    card_selector = 'div[data-testid="default_container_ux4"]'
+    extract_js = EXTRACT_CARDS_JS
+    max_stable_rounds = 5
+
+    def parse_api_item(self, item):
+        """Map one item (with its first variation) of an Instamart payload to a Product."""
+        variations = item.get("variations")
+        name = text_of(first(item, "display_name", "displayName", "name"))
+        if not isinstance(variations, list) or not variations or not isinstance(name, str):
+            return None
+        variation = variations[0] if isinstance(variations[0], dict) else {}
+        price = variation.get("price") or {}
+        unit = first(variation, "quantity", "quantityDescription", "sku_quantity_with_combo")
+        return Product(
+            name,
+            price_value(first(price, "offer_price", "offerPrice.units", "offerPrice")),
+            price_value(first(price, "mrp", "mrp.units")),
+            clean_text(text_of(first(variation, "offer_applied.listing_description", "offerApplied.listingDescription"))),
+            str(unit) if unit else "NA",
+        )
+
+    async def set_location(self, page, pincode):
+        """Pick the delivery address from the Instamart landing page."""
+        await page.goto(HOME_URL)
+
+        # Click on "Search for an area or address"
+        await page.wait_for_selector('div.sc-aXZVg.jubfzr.tDEYY')
+        await page.click('div.sc-aXZVg.jubfzr.tDEYY')
+
+        # Enter pin code
+        await page.wait_for_selector('input._1wkJd')
+        await page.fill('input._1wkJd', pincode)
+        await page.keyboard.press("Enter")
+        await asyncio.sleep(1)
+        await page.click('div._11n32 div.sc-aXZVg.gPfbij')
+
+        # Confirm location
+        await page.wait_for_selector('button:has-text("Confirm Location")')
+        await page.click('button:has-text("Confirm Location")')
+
+        # Click "Re-check your address" if it appears
+        await asyncio.sleep(2)
+        recheck_elements = await page.query_selector_all('div.sc-aXZVg.dsXDwT')
         if recheck_elements:
-            recheck_elements[0].click(force=True)
-
-        # --- Step 7: Click search bar container and type "pepe"
-        search_bar_container = page.wait_for_selector('div._1AaZg')
-        search_bar_container.click(force=True)
-        time.sleep(0.5)
-        search_input = page.wait_for_selector('input[data-testid="search-page-header-search-bar-input"]')
-        search_input.fill('pepe')
-        time.sleep(1)
-        page.click('div.sc-aXZVg.gctPCj._5MSn4', force=True)
-
-        # --- Step 8: Click on brand image (first image)
-        page.wait_for_selector('img._16I1D')
-        page.click('img._16I1D')
-
-        # --- Step 9: Click "Explore all Pepe Jeans items"
-        page.wait_for_selector('span[data-testid="brand-cta-text"]')
-        page.click('span[data-testid="brand-cta-text"]')
-
-        # --- Step 10: Card-by-card scrolling
-        products = []
-        seen_products = set()
-        consecutive_no_new = 0
-        scroll_pause = 1.0
-
-        while True:
-            # Get all product cards currently in DOM
-            product_cards = page.query_selector_all('div[data-testid="default_container_ux4"]')
-            new_count = 0
-
-            for card in product_cards:
-                try:
-                    # Scroll this card into view
-                    page.evaluate('(el) => el.scrollIntoView({behavior: "smooth", block: "center"})', card)
-                    time.sleep(0.3)
-
-                    # Name
-                    name_elem = card.query_selector('div.byAowK._1sPB0') or card.query_selector('div.novMV')
-                    name = name_elem.inner_text() if name_elem else "NA"
-                    if name in seen_products:
-                        continue
-                    seen_products.add(name)
-
-                    # Unit / size
-                    unit_elem = card.query_selector('div[aria-label*="Small"], div[aria-label*="Medium"], div[aria-label*="Large"]')
-                    unit = unit_elem.inner_text() if unit_elem else "NA"
-
-                    # Prices and discount
-                    current_price_elem = card.query_selector('div[data-testid="item-offer-price"]')
-                    original_price_elem = card.query_selector('div[data-testid="item-mrp-price"]')
-                    discount_elem = card.query_selector('div[data-testid="offer-text"]')
-
-                    current_price = clean_price(current_price_elem.inner_text()) if current_price_elem else "NA"
-                    original_price = clean_price(original_price_elem.inner_text()) if original_price_elem else "NA"
-                    discount = discount_elem.inner_text() if discount_elem else "NA"
-
-                    products.append({
-                        "name": name,
-                        "unit": unit,
-                        "current_price": current_price,
-                        "original_price": original_price,
-                        "discount": discount
-                    })
-                    new_count += 1
-                except:
-                    continue
-
-            # Stop after 5 consecutive iterations with no new products
-            if new_count == 0:
-                consecutive_no_new += 1
-            else:
-                consecutive_no_new = 0
-            if consecutive_no_new >= 5:
-                break
-
-            # Scroll a bit more to trigger any lazy loading
-            page.evaluate('window.scrollBy(0, 800)')
-            time.sleep(scroll_pause)
-
-        # --- Save to CSV
-        keys = ["name", "unit", "current_price", "original_price", "discount"]
-        with open("instamart_data.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(products)
-
-        print(f"Scraped {len(products)} products.")
-        browser.close()
+            await recheck_elements[0].click(force=True)
+        return True
+
+    async def open_catalogue(self, page, brand):
+        """Search for the brand and open its "Explore all" listing; True once the grid renders."""
+        # Click search bar container and type the brand query
+        search_bar_container = await page.wait_for_selector('div._1AaZg')
+        await search_bar_container.click(force=True)
+        await asyncio.sleep(0.5)
+        search_input = await page.wait_for_selector('input[data-testid="search-page-header-search-bar-input"]')
+        await search_input.fill(brand["query"])
+        await asyncio.sleep(1)
+        await page.click('div.sc-aXZVg.gctPCj._5MSn4', force=True)
+
+        # Click on brand image (first image)
+        await page.wait_for_selector('img._16I1D')
+        await page.click('img._16I1D')
+
+        # Click "Explore all <brand> items"
+        await page.wait_for_selector('span[data-testid="brand-cta-text"]')
+        await page.click('span[data-testid="brand-cta-text"]')
+        try:
+            # The brand listing is client-routed; wait for it before the URL is cached.
+            await page.wait_for_selector(self.card_selector, timeout=30000)
+            return True
+        except TimeoutError:
+            self.log("Product grid did not appear after opening the brand page.")
+            return False
+
+
+ADAPTER = InstamartAdapter()
+
+
+async def scrape_instamart_pepe_async(browser, output_file="instamart_data.csv", pincode=PINCODE, brand=None, metrics=None):
+    """Scrape one brand page at one pincode in its own context of a shared browser."""
+    return await scrape(ADAPTER, browser, output_file, pincode, brand, metrics)
+
+
+def scrape_instamart_pepe(output_file="instamart_data.csv", pincode=PINCODE, brand=None):
+    """Standalone entry point: launch a browser just for Instamart."""
+    return run_standalone(ADAPTER, output_file, pincode, brand)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""Scrape job specs: which platform, delivery pincode and brand to crawl.
+
+A job is a plain dict::
+
+    {"platform": "zepto", "pincode": "110001", "brand": "pepe",
+     "query": "pepe", "label": "Pepe Jeans",
+     "location": "pepe@110001", "output_file": ".../snapshots/zepto/pepe@110001.csv"}
+
+``brand`` is the short key used in file names and tags, ``query`` is what
+is typed into the platform search, and ``label`` is the brand's display
+name on product cards. The default job (Pepe Jeans at 560012) keeps writing
+the original ``<platform>_data.csv``; every other job writes
+``snapshots/<platform>/<brand>@<pincode>.csv`` and tags its price history
+with the same ``brand@pincode`` location, which the dashboard slices on.
+
+A spec file (``SCRAPER_JOBS_FILE``, default ``scrape_jobs.json``) lists
+explicit jobs and/or a matrix that is expanded into one job per
+platform x pincode x brand::
+
+    {
+      "matrix": {"platforms": ["blinkit", "zepto"], "pincodes": ["560012", "110001"],
+                 "brands": [{"brand": "pepe", "query": "pepe", "label": "Pepe Jeans"}]},
+      "jobs": [{"platform": "instamart", "pincode": "400001"}]
+    }
+"""
+import glob
+import json
+import os
+import re
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_FILE = os.environ.get("SCRAPER_JOBS_FILE", os.path.join(APP_DIR, "scrape_jobs.json"))
+SNAPSHOT_DIR = os.environ.get("SCRAPER_SNAPSHOT_DIR", os.path.join(APP_DIR, "snapshots"))
+PLATFORMS = ("blinkit", "instamart", "zepto")
+DEFAULT_PINCODE = "560012"
+DEFAULT_BRAND = {"brand": "pepe", "query": "pepe", "label": "Pepe Jeans"}
+
+
+def location_tag(brand, pincode):
+    return f"{brand}@{pincode}"
+
+
+DEFAULT_LOCATION = location_tag(DEFAULT_BRAND["brand"], DEFAULT_PINCODE)
+
+
+def output_path(platform, brand, pincode):
+    if brand == DEFAULT_BRAND["brand"] and pincode == DEFAULT_PINCODE:
+        return os.path.join(APP_DIR, f"{platform}_data.csv")
+    return os.path.join(SNAPSHOT_DIR, platform, f"{location_tag(brand, pincode)}.csv")
+
+
+def make_spec(platform, pincode=DEFAULT_PINCODE, brand=None, query=None, label=None):
+    """Validate one job and fill in its defaults, location tag and output file."""
+    if platform not in PLATFORMS:
+        raise ValueError(f"unknown platform '{platform}'")
+    pincode = str(pincode)
+    if not re.fullmatch(r"\d{6}", pincode):
+        raise ValueError(f"pincode must be 6 digits, got '{pincode}'")
+    brand = (brand or DEFAULT_BRAND["brand"]).strip().lower()
+    if not re.fullmatch(r"[a-z0-9][a-z0-9_-]*", brand):
+        raise ValueError(f"brand key must be lowercase letters, digits, '-' or '_', got '{brand}'")
+    if brand == DEFAULT_BRAND["brand"]:
+        query = query or DEFAULT_BRAND["query"]
+        label = label or DEFAULT_BRAND["label"]
+    return {
+        "platform": platform,
+        "pincode": pincode,
+        "brand": brand,
+        "query": query or brand,
+        "label": label or (query or brand).title(),
+        "location": location_tag(brand, pincode),
+        "output_file": output_path(platform, brand, pincode),
+    }
+
+
+def default_specs(platforms=None):
+    return [make_spec(p) for p in (platforms or PLATFORMS)]
+
+
+def load_specs(path=None, platforms=None):
+    """Jobs from the spec file (or one default job per platform), deduplicated.
+
+    ``platforms`` restricts the result to those platforms.
+    """
+    path = path or JOBS_FILE
+    if not os.path.exists(path):
+        return default_specs(platforms)
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    specs = []
+    matrix = raw.get("matrix")
+    if matrix:
+        brands = matrix.get("brands") or [DEFAULT_BRAND]
+        for platform in matrix.get("platforms") or PLATFORMS:
+            for pincode in matrix.get("pincodes") or [DEFAULT_PINCODE]:
+                for b in brands:
+                    specs.append(make_spec(platform, pincode, b.get("brand"), b.get("query"), b.get("label")))
+    for job in raw.get("jobs", []):
+        specs.append(make_spec(job["platform"], job.get("pincode", DEFAULT_PINCODE), job.get("brand"), job.get("query"), job.get("label")))
+    unique = {}
+    for spec in specs:
+        if not platforms or spec["platform"] in platforms:
+            unique.setdefault((spec["platform"], spec["location"]), spec)
+    return list(unique.values())
+
+
+def snapshot_locations(platform):
+    """Location tags with a snapshot on disk for ``platform``, default first."""
+    tags = [DEFAULT_LOCATION]
+    for path in sorted(glob.glob(os.path.join(SNAPSHOT_DIR, platform, "*@*.csv"))):
+        tag = os.path.basename(path)[:-len(".csv")]
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def parse_location(tag):
+    """``brand@pincode`` back into ``(brand, pincode)``; None if malformed."""
+    match = re.fullmatch(r"([a-z0-9][a-z0-9_-]*)@(\d{6})", tag or "")
+    return (match.group(1), match.group(2)) if match else None
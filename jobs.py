@@ -0,0 +1,205 @@
+"""Background scraper jobs with status polling.
+
+Running ``run_all_scrapers.py`` inside an HTTP request ties a gunicorn
+worker up for the whole multi-minute scrape. Instead a request enqueues a
+job and returns its id at once; a thread in that worker runs the scraper
+subprocess, parses its ``[PROGRESS]`` lines into per-platform state, and
+records timings and row counts. Jobs live in SQLite so every gunicorn
+worker sees the same state, and an enqueue while a run is already queued
+or running returns that run instead of starting a second Chromium fleet.
+"""
+from datetime import datetime, timezone
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import threading
+import uuid
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(APP_DIR, "scraper_jobs.db"))
+JOB_LOG_DIR = os.environ.get("JOB_LOG_DIR", os.path.join(APP_DIR, "job_logs"))
+# Hard cap on one run, counted from its start: the scraper process is killed
+# when it trips. Below it, a job whose pid is alive is trusted however long
+# it takes.
+JOB_MAX_SECONDS = float(os.environ.get("JOB_MAX_SECONDS", "14400"))
+# A job gets its subprocess pid within moments of being queued; one still
+# without a pid after this long was never started (its worker died first).
+JOB_START_GRACE_SECONDS = float(os.environ.get("JOB_START_GRACE_SECONDS", "30"))
+ACTIVE_STATES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    platforms TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    exit_code INTEGER,
+    pid INTEGER,
+    progress TEXT NOT NULL DEFAULT '{}',
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state);
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _age_seconds(ts):
+    then = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - then).total_seconds()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _stale(row):
+    """Whether an active job's run is gone.
+
+    A job without a pid gets ``JOB_START_GRACE_SECONDS`` to start, and one
+    with a pid is trusted while the pid is alive. The worker running the
+    job kills it at ``JOB_MAX_SECONDS``; a process still alive past that
+    (plus the grace) lost its worker, so it is killed here.
+    """
+    if not row["pid"]:
+        return _age_seconds(row["created_at"]) > JOB_START_GRACE_SECONDS
+    if not _pid_alive(row["pid"]):
+        return True
+    if row["started_at"] and _age_seconds(row["started_at"]) > JOB_MAX_SECONDS + JOB_START_GRACE_SECONDS:
+        try:
+            os.kill(row["pid"], signal.SIGTERM)
+        except OSError:
+            pass
+        return True
+    return False
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or JOBS_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _to_dict(row):
+    job = dict(row)
+    job["platforms"] = json.loads(job["platforms"])
+    job["progress"] = json.loads(job["progress"])
+    if job["started_at"]:
+        end = job["finished_at"] or _now()
+        job["seconds"] = round(_age_seconds(job["started_at"]) - _age_seconds(end), 1)
+    else:
+        job["seconds"] = None
+    job["rows"] = sum(p.get("rows", 0) for p in job["progress"].values())
+    return job
+
+
+def get(job_id, path=None):
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def update(job_id, path=None, **fields):
+    if "progress" in fields:
+        fields["progress"] = json.dumps(fields["progress"])
+    assignments = ", ".join(f"{k} = ?" for k in fields)
+    conn = connect(path)
+    try:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    finally:
+        conn.close()
+
+
+def enqueue(platforms, path=None):
+    """Create a queued job, or return the active one; ``(job, created)``.
+
+    The check and insert run in one ``BEGIN IMMEDIATE`` transaction, so two
+    workers racing on the same request cannot both start a run.
+    """
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for row in conn.execute("SELECT * FROM jobs WHERE state IN (?, ?)", ACTIVE_STATES).fetchall():
+            if _stale(row):
+                conn.execute(
+                    "UPDATE jobs SET state = 'failed', finished_at = ?, error = 'stale: worker or process went away' WHERE id = ?",
+                    (_now(), row["id"]),
+                )
+                continue
+            conn.execute("COMMIT")
+            return _to_dict(row), False
+        job_id = uuid.uuid4().hex[:12]
+        conn.execute(
+            "INSERT INTO jobs (id, state, platforms, created_at, progress) VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, json.dumps(platforms), _now(), json.dumps({p: {"status": "queued"} for p in platforms})),
+        )
+        conn.execute("COMMIT")
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_dict(row), True
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def _run(job_id, cmd, cwd, platforms, path=None):
+    progress = {p: {"status": "queued"} for p in platforms}
+    update(job_id, path, state="running", started_at=_now())
+    try:
+        os.makedirs(JOB_LOG_DIR, exist_ok=True)
+        with open(os.path.join(JOB_LOG_DIR, f"{job_id}.log"), "w", encoding="utf-8") as log:
+            proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+            update(job_id, path, pid=proc.pid)
+            killed = threading.Event()
+
+            def kill():
+                killed.set()
+                proc.kill()
+
+            watchdog = threading.Timer(JOB_MAX_SECONDS, kill)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in proc.stdout:
+                    log.write(line)
+                    if line.startswith("[PROGRESS] "):
+                        try:
+                            event = json.loads(line[len("[PROGRESS] "):])
+                        except ValueError:
+                            continue
+                        progress[event.pop("platform", "?")] = event
+                        update(job_id, path, progress=progress)
+                code = proc.wait()
+            finally:
+                watchdog.cancel()
+        error = f"killed at the {JOB_MAX_SECONDS:.0f}s limit" if killed.is_set() else ""
+        update(job_id, path, state="succeeded" if code == 0 else "failed", exit_code=code, error=error, finished_at=_now())
+    except Exception as e:
+        update(job_id, path, state="failed", error=str(e), finished_at=_now())
+
+
+def start(job, python_bin, script, cwd):
+    """Run ``job`` on a daemon thread of this process."""
+    cmd = [python_bin, "-u", script, *job["platforms"]]
+    thread = threading.Thread(target=_run, args=(job["id"], cmd, cwd, job["platforms"]), name=f"scraper-job-{job['id']}", daemon=True)
+    thread.start()
+    return thread
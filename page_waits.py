@@ -0,0 +1,84 @@
+"""Event-driven waits for the scrapers' scroll loops.
+
+Instead of sleeping a fixed time after every scroll, a round waits until
+something actually happens: the product grid gains cards, a MutationObserver
+sees new grid children, or a captured API response adds rows. The idle
+timeout is only the fallback for rounds where nothing changes.
+"""
+import asyncio
+import os
+
+# Seconds a round waits when nothing at all happens on the page.
+IDLE_TIMEOUT = float(os.environ.get("SCRAPER_IDLE_TIMEOUT", "1.0"))
+
+WAIT_FOR_GRID_JS = """
+({ selector, count, timeout }) => new Promise(resolve => {
+  const current = () => document.querySelectorAll(selector).length;
+  if (current() > count) return resolve("grew");
+  const first = document.querySelector(selector);
+  const target = (first && first.parentElement) || document.body;
+  let timer = null;
+  const observer = new MutationObserver(records => {
+    if (!records.some(r => r.addedNodes.length)) return;
+    finish(current() > count ? "grew" : "mutation");
+  });
+  const finish = (reason) => {
+    observer.disconnect();
+    clearTimeout(timer);
+    resolve(reason);
+  };
+  observer.observe(target, { childList: true, subtree: true });
+  timer = setTimeout(() => finish("idle"), timeout);
+})
+"""
+
+CLICK_LOAD_MORE_JS = """
+() => {
+  const el = document.querySelector("[data-test-id='load-more']")
+    || [...document.querySelectorAll("button")].find(b => /^(show|load|see) more/i.test(b.innerText.trim()));
+  if (!el) return false;
+  el.click();
+  return true;
+}
+"""
+
+
+async def _capture_grows(capture, since):
+    while len(capture.rows) <= since:
+        capture.changed.clear()
+        if len(capture.rows) > since:
+            break
+        await capture.changed.wait()
+    return "response"
+
+
+async def wait_for_new_content(page, selector, count, capture=None, idle_timeout=None):
+    """Wait until the grid matched by ``selector`` changes or ``capture`` gains rows.
+
+    ``count`` is the card count seen before the triggering scroll/click. Returns
+    ``"grew"``, ``"mutation"``, ``"response"`` or ``"idle"``.
+    """
+    idle_timeout = IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+    waiters = [asyncio.ensure_future(page.evaluate(
+        WAIT_FOR_GRID_JS, {"selector": selector, "count": count, "timeout": int(idle_timeout * 1000)}
+    ))]
+    if capture is not None and capture.enabled:
+        waiters.append(asyncio.ensure_future(_capture_grows(capture, len(capture.rows))))
+    try:
+        done, _ = await asyncio.wait(waiters, timeout=idle_timeout + 1, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.cancel()
+    for waiter in done:
+        if not waiter.cancelled() and waiter.exception() is None:
+            return waiter.result()
+    return "idle"
+
+
+async def click_load_more(page):
+    """Click a visible "Show/Load/See more" button in one round trip; True if clicked."""
+    try:
+        return await page.evaluate(CLICK_LOAD_MORE_JS)
+    except Exception:
+        return False
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Dashboard micro-benchmarks on synthetic snapshots of 1k, 10k and 100k rows.
+
+Times ``load_products`` (CSV) against ``latest_by_location`` (the same
+snapshot compacted to Arrow), ``build_view_model`` (cold and cached), the
+rendered dashboard, a sorted ``/api/products`` page, the streamed
+``/export`` and a five-price benchmark save against generated CSVs and
+benchmarks in a temp dir; the repo's own data files are never read.
+
+    python perf/bench_app.py
+    python perf/bench_app.py --sizes 1000 10000 --repeat 3
+    python perf/bench_app.py --save-baseline perf/app_baseline.json
+    python perf/bench_app.py --baseline perf/app_baseline.json --tolerance 0.3
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+
+from harness import add_baseline_args, finish, timed
+
+
+def write_snapshot(path, rows, seed=7):
+    """A Blinkit-shaped CSV with ``rows`` products, a few with NA prices."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "current_price", "original_price", "discount", "sizes"])
+        writer.writeheader()
+        for i in range(rows):
+            mrp = rng.randrange(299, 2999)
+            off = rng.choice((0, 10, 20, 30, 40, 50))
+            writer.writerow({
+                "name": f"Pepe Jeans Men's Item {i}",
+                "current_price": "NA" if i % 97 == 0 else str(mrp * (100 - off) // 100),
+                "original_price": str(mrp),
+                "discount": f"{off}% OFF" if off else "NA",
+                "sizes": rng.choice(("S", "M", "L", "XL", "Pack of 2")),
+            })
+
+
+def write_benchmarks(benchmark_store, rows, seed=11):
+    """Benchmarks for every other product, replacing the previous size's."""
+    rng = random.Random(seed)
+    benchmark_store.update({f"Pepe Jeans Men's Item {i}": rng.randrange(199, 2499) for i in range(0, rows, 2)}, replace=True)
+
+
+def bench_size(app, snapshot_store, workdir, rows, repeat):
+    snapshot = os.path.join(workdir, f"blinkit_{rows}.csv")
+    write_snapshot(snapshot, rows)
+    app.PLATFORMS["blinkit"]["pattern"] = snapshot
+    write_benchmarks(app.benchmark_store, rows)
+    client = app.app.test_client()
+
+    def clear_caches():
+        app._products_cache.clear()
+        app._benchmarks.clear()
+        app._view_model_cache.clear()
+        app._partition_cache.clear()
+
+    def cold_view_model():
+        clear_caches()
+        app.build_view_model("blinkit")
+
+    def export():
+        response = client.get("/export?platform=blinkit")
+        assert response.status_code == 200
+        b"".join(response.response)
+
+    def dashboard():
+        assert client.get("/?platform=blinkit").status_code == 200
+
+    def api_page():
+        assert client.get("/api/products?platform=blinkit&sort=diff&order=desc&page=2").status_code == 200
+
+    edits = iter(range(10 ** 9))
+
+    def save_edits():
+        n = next(edits)
+        app.save_benchmarks({f"Pepe Jeans Men's Item {i}": 100 + n for i in range(0, 10, 2)})
+
+    def compacted():
+        return snapshot_store.latest_by_location(snapshot_store.partition_path("blinkit", day))
+
+    scraped_at = app.price_store.utc_now()
+    day = scraped_at[:10]
+    app.price_store.ingest("blinkit", app.load_products(snapshot), scraped_at=scraped_at, benchmarks={})
+    snapshot_store.compact()
+
+    app.build_view_model("blinkit")
+    return {
+        f"load_products_{rows}": timed(lambda: app.load_products(snapshot), repeat),
+        f"load_snapshot_arrow_{rows}": timed(compacted, repeat),
+        f"build_view_model_cold_{rows}": timed(cold_view_model, repeat),
+        f"build_view_model_warm_{rows}": timed(lambda: app.build_view_model("blinkit"), repeat),
+        f"dashboard_{rows}": timed(dashboard, repeat),
+        f"api_products_page_{rows}": timed(api_page, repeat),
+        f"export_csv_{rows}": timed(export, repeat),
+        f"save_5_benchmarks_{rows}": timed(save_edits, repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard micro-benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="pricepulse-bench-")
+    os.environ["PRICE_DB_PATH"] = os.path.join(workdir, "history.db")
+    os.environ["SNAPSHOT_STORE_DIR"] = os.path.join(workdir, "store")
+    os.environ["BENCHMARKS_DB_PATH"] = os.path.join(workdir, "benchmarks.db")
+    os.environ["BENCHMARKS_JSON_PATH"] = os.path.join(workdir, "benchmarks.json")
+    import app
+    import snapshot_store
+
+    results = {}
+    for rows in args.sizes:
+        print(f"[perf] {rows} rows...", flush=True)
+        results.update(bench_size(app, snapshot_store, workdir, rows, args.repeat))
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
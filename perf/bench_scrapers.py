@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""End-to-end scraper benchmark that never touches the live sites.
+
+Each platform's real ``scrape_*_pepe_async`` runs against an offline
+stand-in (see ``stub_site.py``): by default a generated infinite-scroll
+catalogue, or with ``--har-dir`` a recorded HAR per platform. All output
+(CSV, price history, state cache, metrics) goes to a temp dir, so the
+working tree is untouched. Reported per platform: wall time, rows, scroll
+rounds, DOM round trips, responses, and peak RSS.
+
+    python perf/bench_scrapers.py                          # stub catalogues, 200 products each
+    python perf/bench_scrapers.py zepto --products 1000 --repeat 3
+    python perf/bench_scrapers.py --record --har-dir perf/fixtures   # live, once, to capture HARs
+    python perf/bench_scrapers.py --har-dir perf/fixtures  # replay them offline
+    python perf/bench_scrapers.py --save-baseline perf/scrapers_baseline.json
+    python perf/bench_scrapers.py --baseline perf/scrapers_baseline.json
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from harness import add_baseline_args, finish, max_rss_mb
+
+PLATFORMS = ("blinkit", "instamart", "zepto")
+
+
+def isolate(workdir):
+    """Point every on-disk side effect of the scrapers at ``workdir``.
+
+    Must run before the scraper modules are imported: they read these at import time.
+    """
+    os.environ.update(
+        SCRAPER_STATE_DIR=os.path.join(workdir, "state"),
+        PRICE_DB_PATH=os.path.join(workdir, "history.db"),
+        SCRAPER_DELTA_LOG=os.path.join(workdir, "deltas.jsonl"),
+        SCRAPER_METRICS_LOG=os.path.join(workdir, "metrics.jsonl"),
+        BENCHMARKS_DB_PATH=os.path.join(workdir, "benchmarks.db"),
+        BENCHMARKS_JSON_PATH=os.path.join(workdir, "benchmarks.json"),
+        SCRAPER_INCREMENTAL="0",
+    )
+
+
+async def run_once(platform, args, workdir, run):
+    from playwright.async_api import async_playwright
+
+    import run_all_scrapers
+    import state_cache
+    from scrape_metrics import RunMetrics
+    from stub_site import RoutedBrowser, seed_state
+
+    scrape = run_all_scrapers.SCRAPERS[platform]
+    har_path = os.path.join(args.har_dir, f"{platform}.har") if args.har_dir else None
+    if har_path and not args.record and not os.path.exists(har_path):
+        raise SystemExit(f"[perf] no HAR for {platform} at {har_path}; record one with --record")
+    if not har_path:
+        seed_state(state_cache, platform, "560012")
+    else:
+        state_cache.invalidate(platform, "560012")
+
+    output_file = os.path.join(workdir, f"{platform}_{run}.csv")
+    metrics = RunMetrics(platform, "bench")
+    async with async_playwright() as p:
+        launch_started = time.perf_counter()
+        browser = await p.chromium.launch(headless=True)
+        metrics.add_phase("browser_launch", time.perf_counter() - launch_started)
+        routed = RoutedBrowser(
+            browser, platform, har_path=har_path, record=args.record,
+            stub={"total": args.products, "batch": args.batch, "delay_ms": args.delay_ms},
+        )
+        try:
+            started = time.perf_counter()
+            outcome = await scrape(routed, output_file, "560012", None, metrics)
+            seconds = time.perf_counter() - started
+        finally:
+            await browser.close()
+    return seconds, outcome, metrics.record("ok", outcome["rows"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end scraper benchmark.")
+    parser.add_argument("platforms", nargs="*", help=f"any of {', '.join(PLATFORMS)} (default: all)")
+    parser.add_argument("--products", type=int, default=200, help="stub catalogue size")
+    parser.add_argument("--batch", type=int, default=24, help="cards rendered per lazy load")
+    parser.add_argument("--delay-ms", type=int, default=80, help="simulated latency per lazy load")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--har-dir", help="replay <platform>.har from this directory instead of the stub")
+    parser.add_argument("--record", action="store_true", help="scrape the live site once and save <platform>.har to --har-dir")
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+    unknown = [p for p in args.platforms if p not in PLATFORMS]
+    if unknown:
+        parser.error(f"unknown platform(s): {', '.join(unknown)}")
+    if args.record and not args.har_dir:
+        parser.error("--record needs --har-dir")
+    if args.har_dir:
+        os.makedirs(args.har_dir, exist_ok=True)
+
+    workdir = tempfile.mkdtemp(prefix="pricepulse-bench-")
+    isolate(workdir)
+    results = {}
+    for platform in args.platforms or PLATFORMS:
+        runs = [asyncio.run(run_once(platform, args, workdir, i)) for i in range(1 if args.record else args.repeat)]
+        _, outcome, record = runs[-1]
+        results[f"scrape_{platform}"] = {
+            "seconds": round(statistics.median(r[0] for r in runs), 3),
+            "rows": outcome["rows"],
+            "rounds": record["rounds"],
+            "dom_round_trips": record["dom_round_trips"],
+            "responses": record["responses"],
+            "launch_s": record["phases"].get("browser_launch", 0),
+        }
+        if args.record:
+            print(f"[perf] recorded {os.path.join(args.har_dir, platform + '.har')}")
+    print(f"[perf] peak RSS: python {max_rss_mb()} MB, browser processes {max_rss_mb(children=True)} MB")
+    print(f"[perf] outputs in {workdir}")
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Timing, memory and baseline helpers shared by the perf scripts.
+
+Results are flat ``{name: {metric: value}}`` dicts. ``--save-baseline``
+writes one to JSON, and ``--baseline`` compares a new run against it: any
+``seconds`` metric slower than the baseline by more than ``--tolerance``
+fails the run with exit code 1. That makes the scripts usable as a
+regression gate in CI or before merging performance work.
+"""
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def timed(fn, repeat=5):
+    """Median/min seconds over ``repeat`` runs, plus peak Python memory of one extra traced run.
+
+    Memory is traced separately because tracemalloc slows the code it watches.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": round(statistics.median(times), 6),
+        "min_seconds": round(min(times), 6),
+        "peak_mb": round(peak / 1e6, 2),
+    }
+
+
+def max_rss_mb(children=False):
+    """Peak resident set size of this process (or its reaped children) in MB."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return round(usage.ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3), 1)
+
+
+def print_table(results):
+    metrics = []
+    for row in results.values():
+        for key in row:
+            if key not in metrics:
+                metrics.append(key)
+    width = max(len(name) for name in results) if results else 10
+    print(f"{'benchmark':<{width}}  " + "  ".join(f"{m:>14}" for m in metrics))
+    for name, row in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{row.get(m, ''):>14}" for m in metrics))
+
+
+def compare(results, baseline, tolerance):
+    """Names whose ``seconds`` regressed past ``tolerance`` (a fraction) vs the baseline."""
+    regressions = []
+    for name, row in results.items():
+        old = baseline.get(name, {}).get("seconds")
+        new = row.get("seconds")
+        if old and new and new > old * (1 + tolerance):
+            regressions.append(f"{name}: {new:.4f}s vs baseline {old:.4f}s (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def add_baseline_args(parser):
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as a baseline JSON file")
+    parser.add_argument("--baseline", help="compare against a baseline JSON file and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (default 0.25 = 25%%)")
+
+
+def finish(results, args):
+    """Print, save and gate ``results``; returns the process exit code."""
+    print_table(results)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            print(f"[perf] wrote {path}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            return 1
+        print(f"[perf] no regressions beyond {args.tolerance:.0%} of {args.baseline}")
+    return 0
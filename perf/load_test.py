@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Concurrent-client load test of the dashboard, sync vs ASGI deployment.
+
+Each mode is started as its own server against a synthetic snapshot in a
+temp dir, with the same worker count:
+
+- ``sync``: ``gunicorn -w N app:app``, the render.yaml deployment.
+- ``asgi``: ``uvicorn asgi:application --workers N``, see ``asgi.py``.
+
+Then ``--clients`` keep-alive clients hammer ``/`` and ``/export`` for
+``--duration`` seconds each. The report gives requests per second, p50 and
+p99 latency, and errors per mode and route. ``seconds`` is the p99, which
+is what ``--baseline`` gates on.
+
+    python perf/load_test.py                                # both modes, 10k rows, 32 clients
+    python perf/load_test.py --modes asgi --clients 64 --duration 20
+    python perf/load_test.py --url http://127.0.0.1:5000    # a server that is already running
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from harness import ROOT, add_baseline_args, finish
+
+ROUTES = {
+    "dashboard": "/?platform=blinkit",
+    "export": "/export?platform=blinkit",
+}
+
+
+def server_command(mode, port, workers):
+    if mode == "sync":
+        return [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:app"]
+    return [
+        sys.executable, "-m", "uvicorn", "asgi:application", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(conn, path):
+    conn.request("GET", path)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def wait_until_up(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            if get(conn, "/") == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"[perf] server on port {port} did not come up within {timeout}s")
+
+
+def hammer(host, port, path, clients, duration):
+    """``clients`` threads issuing ``path`` back to back; returns (latencies, errors, seconds)."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        mine, failed = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = get(conn, path) == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=60)
+            if ok:
+                mine.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0], time.monotonic() - started
+
+
+def measure(label, host, port, args):
+    results = {}
+    for route, path in ROUTES.items():
+        for _ in range(3):  # warm the per-worker caches
+            get(http.client.HTTPConnection(host, port, timeout=60), path)
+        latencies, errors, seconds = hammer(host, port, path, args.clients, args.duration)
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        results[f"{label}_{route}"] = {
+            "rps": round(len(latencies) / seconds, 1),
+            "p50_seconds": round(statistics.median(latencies), 6) if latencies else 0.0,
+            "seconds": round(p99, 6),
+            "errors": errors,
+        }
+        print(f"[perf] {label} {route}: {results[f'{label}_{route}']}", flush=True)
+    return results
+
+
+def prepare(workdir, rows):
+    """Synthetic snapshot and benchmarks; returns the env the servers run with."""
+    env = dict(
+        os.environ,
+        SNAPSHOT_CSV_DIR=workdir,
+        PRICE_DB_PATH=os.path.join(workdir, "history.db"),
+        SNAPSHOT_STORE_DIR=os.path.join(workdir, "store"),
+        BENCHMARKS_DB_PATH=os.path.join(workdir, "benchmarks.db"),
+        BENCHMARKS_JSON_PATH=os.path.join(workdir, "benchmarks.json"),
+        JOBS_DB_PATH=os.path.join(workdir, "jobs.db"),
+    )
+    os.environ.update(env)
+    import benchmark_store
+    from bench_app import write_benchmarks, write_snapshot
+
+    write_snapshot(os.path.join(workdir, "blinkit_data.csv"), rows)
+    write_benchmarks(benchmark_store, rows)
+    return env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard load test, sync vs ASGI.")
+    parser.add_argument("--modes", nargs="+", choices=("sync", "asgi"), default=["sync", "asgi"])
+    parser.add_argument("--url", help="load-test this running server instead of starting one per mode")
+    parser.add_argument("--rows", type=int, default=10000, help="products in the synthetic snapshot")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per route")
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        target = urlsplit(args.url)
+        return finish(measure("url", target.hostname, target.port or 80, args), args)
+
+    env = prepare(tempfile.mkdtemp(prefix="pricepulse-load-"), args.rows)
+    results = {}
+    for mode in args.modes:
+        port = free_port()
+        print(f"[perf] starting {mode} server on port {port} ({args.workers} workers)...", flush=True)
+        server = subprocess.Popen(server_command(mode, port, args.workers), cwd=ROOT, env=env)
+        try:
+            wait_until_up("127.0.0.1", port)
+            results.update(measure(mode, "127.0.0.1", port, args))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return finish(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Offline stand-ins for the three storefronts.
+
+``RoutedBrowser`` wraps a Playwright browser so that every context the
+scrapers open is routed before they use it, either to a recorded HAR file
+(``context.route_from_har``) or to a generated stub catalogue. The stub is
+an infinite-scroll page with the same card markup and selectors the
+scrapers' extractors read, and it renders ``batch`` more cards ``delay_ms``
+after each scroll near the bottom, like the real lazy-loading grids.
+Nothing leaves the machine.
+
+The stubs start from the catalogue page: ``seed_state`` writes a warm
+state-cache entry pointing there, so the location flow is skipped. Record a
+HAR with ``bench_scrapers.py --record`` to benchmark the full cold flow.
+"""
+import json
+import os
+import time
+
+STUB_URLS = {
+    "blinkit": "https://blinkit.com/dc/?collection_filters=W3siYnJhbmRfaWQiOlsxNjIyOF19XQ%3D%3D&collection_name=Pepe+Jeans+Innerfashion",
+    "zepto": "https://www.zeptonow.com/brand/pepe-jeans/stub",
+    "instamart": "https://www.swiggy.com/instamart/collection-listing?stub=pepe",
+}
+
+# One JS template literal per platform; ``i``, ``price``, ``mrp`` and ``off`` are in scope.
+CARD_TEMPLATES = {
+    "blinkit": """
+<div role="button" class="tw-relative tw-flex tw-h-full tw-flex-col tw-items-start card">
+  <div class="tw-text-300 tw-font-semibold">Pepe Jeans Men's Trunk ${i}</div>
+  <div class="tw-font-semibold">Size: M</div>
+  <div class="tw-text-200 tw-font-semibold">₹${price}</div>
+  <div class="tw-text-200 tw-font-regular">₹${mrp}</div>
+  <div class="tw-text-050">${off}% OFF</div>
+</div>""",
+    "zepto": """
+<div class="c5SZXs ccdFPa card">
+  <div data-slot-id="ProductName"><span>Pepe Jeans Men's Vest ${i}</span></div>
+  <div data-slot-id="PackSize"><span>1 pc (M)</span></div>
+  <div data-slot-id="Price"><p>₹${price}</p><p>₹${mrp}</p></div>
+  <div class="c5aJJW"><span>${off}% Off</span></div>
+</div>""",
+    "instamart": """
+<div data-testid="default_container_ux4" class="card">
+  <div class="novMV">Pepe Jeans Men's Brief ${i}</div>
+  <div aria-label="Medium">M</div>
+  <div data-testid="item-offer-price">₹${price}</div>
+  <div data-testid="item-mrp-price">₹${mrp}</div>
+  <div data-testid="offer-text">${off}% OFF</div>
+</div>""",
+}
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>stub catalogue</title>
+<style>body{margin:0;font-family:sans-serif} .card{height:140px;border-bottom:1px solid #ddd;padding:8px}</style>
+</head><body><main id="grid"></main>
+<script>
+const TOTAL = __TOTAL__, BATCH = __BATCH__, DELAY = __DELAY__;
+const grid = document.getElementById("grid");
+let rendered = 0, loading = false;
+const card = (i) => { const mrp = 499 + (i % 7) * 100, off = 10 + (i % 5) * 10, price = Math.round(mrp * (100 - off) / 100); return `__CARD__`; };
+function more() {
+  if (loading || rendered >= TOTAL) return;
+  loading = true;
+  setTimeout(() => {
+    const end = Math.min(rendered + BATCH, TOTAL);
+    let html = "";
+    for (let i = rendered; i < end; i++) html += card(i);
+    grid.insertAdjacentHTML("beforeend", html);
+    rendered = end;
+    loading = false;
+  }, DELAY);
+}
+document.addEventListener("scroll", () => {
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 400) more();
+}, true);
+more();
+</script></body></html>"""
+
+
+def catalogue_html(platform, total, batch, delay_ms):
+    return (
+        PAGE.replace("__TOTAL__", str(total))
+        .replace("__BATCH__", str(batch))
+        .replace("__DELAY__", str(delay_ms))
+        .replace("__CARD__", CARD_TEMPLATES[platform].strip())
+    )
+
+
+def stub_handler(platform, total, batch, delay_ms):
+    html = catalogue_html(platform, total, batch, delay_ms)
+    url = STUB_URLS[platform]
+
+    async def handle(route):
+        request = route.request
+        if request.url == url:
+            await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=html)
+        elif request.resource_type == "document":
+            await route.fulfill(status=404, content_type="text/html", body="<html><body>stub: not recorded</body></html>")
+        else:
+            await route.fulfill(status=204, body="")
+
+    return handle
+
+
+def seed_state(state_cache, platform, pincode):
+    """Write a warm state-cache entry whose catalogue is the stub page."""
+    os.makedirs(state_cache.STATE_DIR, exist_ok=True)
+    entry = {
+        "platform": platform,
+        "pincode": pincode,
+        "catalogue_url": STUB_URLS[platform],
+        "saved_at": time.time(),
+        "storage_state": {"cookies": [], "origins": []},
+    }
+    with open(state_cache.state_path(platform, pincode), "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+
+
+class RoutedBrowser:
+    """Browser proxy whose ``new_context`` installs the replay/stub routes first.
+
+    Routes added later (the scrapers' resource policy) fall back to these.
+    """
+
+    def __init__(self, browser, platform, har_path=None, record=False, stub=None):
+        self.browser = browser
+        self.platform = platform
+        self.har_path = har_path
+        self.record = record
+        self.stub = stub or {"total": 200, "batch": 24, "delay_ms": 80}
+
+    def __getattr__(self, name):
+        return getattr(self.browser, name)
+
+    async def new_context(self, **kwargs):
+        if self.record:
+            kwargs.update(record_har_path=self.har_path, record_har_content="embed")
+            return await self.browser.new_context(**kwargs)
+        context = await self.browser.new_context(**kwargs)
+        if self.har_path:
+            await context.route_from_har(self.har_path, not_found="abort")
+        else:
+            await context.route("**/*", stub_handler(self.platform, **self.stub))
+        return context
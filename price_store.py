@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Append-only price history in SQLite.
+
+The scrapers overwrite their CSV on every run, so each run is also
+ingested here in a single transaction: one ``runs`` row plus one ``prices``
+row per product. Rows are indexed on (platform, product_key, scraped_at),
+so "price of X over the last 30 days" or "every change since yesterday" is
+an index range scan instead of a pass over many CSV files. The database
+runs in WAL mode, which lets the dashboard read while a scraper writes.
+
+Ingest also diffs the run against the platform's previous run and appends
+the delta to the ``changes`` log: new and removed products, price moves,
+discount changes and benchmark crossings. Consumers poll that small log
+(``GET /changes?after=<id>``) instead of reloading full snapshots; set
+``PRICE_WEBHOOK_URL`` to have each non-empty delta POSTed as JSON as well.
+
+    python price_store.py import blinkit blinkit_data.csv
+    python price_store.py history "Pepe Jeans Men's Vest" --platform instamart --days 30
+    python price_store.py changes --since 2025-09-26
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import csv
+import http.client
+import json
+import os
+import re
+import sqlite3
+import urllib.error
+import urllib.request
+
+import benchmark_store
+from job_specs import DEFAULT_LOCATION
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("PRICE_DB_PATH", os.path.join(APP_DIR, "price_history.db"))
+WEBHOOK_URL = os.environ.get("PRICE_WEBHOOK_URL", "")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prices (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    platform TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    current_price INTEGER,
+    original_price INTEGER,
+    discount TEXT,
+    size TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_prices_product_time ON prices(platform, product_key, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_prices_time ON prices(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_runs_platform_time ON runs(platform, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_prices_run ON prices(run_id);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    platform TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    changed_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_time ON changes(changed_at);
+"""
+# Scrapes are tagged with a brand@pincode location; rows stored before
+# multi-location jobs existed belong to the default job.
+LOCATION_COLUMN = f"location TEXT NOT NULL DEFAULT '{DEFAULT_LOCATION}'"
+LOCATION_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_runs_platform_location_time ON runs(platform, location, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_prices_location_time ON prices(location, scraped_at);
+"""
+
+
+def product_key(name):
+    """Stable key for a product name: case- and whitespace-insensitive."""
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+def to_int_price(value):
+    """CSV prices are digit strings or "NA"; store them as integers or NULL."""
+    digits = re.sub(r"[^\d]", "", str(value or ""))
+    return int(digits) if digits else None
+
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    for table in ("runs", "prices", "changes"):
+        columns = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if "location" not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {LOCATION_COLUMN}")
+    conn.executescript(LOCATION_INDEXES)
+    return conn
+
+
+def read_benchmarks(path=None):
+    """Benchmarks as {product_key: price}; an unreadable store gives {}."""
+    try:
+        raw = benchmark_store.load(path)
+    except sqlite3.Error:
+        return {}
+    out = {}
+    for name, value in raw.items():
+        try:
+            out[product_key(name)] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def benchmark_status(price, benchmark):
+    if price is None or benchmark is None:
+        return None
+    return "above" if price > benchmark else "below" if price < benchmark else "equal"
+
+
+def diff_snapshots(previous, current, benchmarks):
+    """Keyed delta between two runs' rows (dicts keyed by product_key).
+
+    Yields ``(product_key, name, kind, old_value, new_value)`` where kind is
+    new, removed, price_up, price_down, discount or benchmark.
+    """
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            yield key, row["name"], "new", None, row["current_price"]
+            continue
+        before, after = old["current_price"], row["current_price"]
+        if before is not None and after is not None and before != after:
+            yield key, row["name"], "price_up" if after > before else "price_down", before, after
+        if (old["discount"] or None) != (row["discount"] or None):
+            yield key, row["name"], "discount", old["discount"], row["discount"]
+        bench = benchmarks.get(key)
+        was, now = benchmark_status(before, bench), benchmark_status(after, bench)
+        if was and now and was != now:
+            yield key, row["name"], "benchmark", was, now
+    for key, old in previous.items():
+        if key not in current:
+            yield key, old["name"], "removed", old["current_price"], None
+
+
+def ingest(platform, products, scraped_at=None, path=None, benchmarks=None, location=DEFAULT_LOCATION, resumed=()):
+    """Append one scrape of ``platform`` in a single transaction; returns the run id.
+
+    The delta against the previous run of the same platform and location is
+    written to ``changes`` in the same transaction. Products named in
+    ``resumed`` were filled in from a checkpoint rather than seen by this
+    run: they are stored with it but left out of its changes.
+    """
+    scraped_at = scraped_at or utc_now()
+    benchmarks = read_benchmarks() if benchmarks is None else benchmarks
+    rows = [
+        (
+            platform,
+            location,
+            product_key(p.get("name")),
+            p.get("name", ""),
+            scraped_at,
+            to_int_price(p.get("current_price")),
+            to_int_price(p.get("original_price")),
+            p.get("discount") or None,
+            p.get("sizes") or p.get("unit") or None,
+        )
+        for p in products
+    ]
+    current = {r[2]: {"name": r[3], "current_price": r[5], "discount": r[7]} for r in rows}
+    conn = connect(path)
+    try:
+        with conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (platform, location, scraped_at, row_count) VALUES (?, ?, ?, ?)",
+                (platform, location, scraped_at, len(products)),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO prices (run_id, platform, location, product_key, name, scraped_at, current_price, original_price, discount, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, *r) for r in rows],
+            )
+            prev = conn.execute(
+                "SELECT id FROM runs WHERE platform = ? AND location = ? AND id != ? AND scraped_at <= ? "
+                "ORDER BY scraped_at DESC, id DESC LIMIT 1",
+                (platform, location, run_id, scraped_at),
+            ).fetchone()
+            changes = []
+            if prev:
+                previous = {
+                    r["product_key"]: dict(r)
+                    for r in conn.execute("SELECT product_key, name, current_price, discount FROM prices WHERE run_id = ?", (prev["id"],))
+                }
+                skip = {product_key(name) for name in resumed}
+                changes = [c for c in diff_snapshots(previous, current, benchmarks) if c[0] not in skip]
+                conn.executemany(
+                    "INSERT INTO changes (run_id, platform, location, product_key, name, changed_at, kind, old_value, new_value) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, platform, location, key, name, scraped_at, kind, _text(old), _text(new)) for key, name, kind, old, new in changes],
+                )
+        if changes and WEBHOOK_URL:
+            notify(platform, location, run_id, scraped_at, changes)
+        return run_id
+    finally:
+        conn.close()
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def notify(platform, location, run_id, scraped_at, changes, url=None):
+    """POST one run's delta to the webhook; returns whether it was delivered, never raises.
+
+    This blocks for up to 10s, so async callers run ``ingest`` in a thread.
+    """
+    body = json.dumps({
+        "platform": platform,
+        "location": location,
+        "run_id": run_id,
+        "scraped_at": scraped_at,
+        "changes": [
+            {"name": name, "kind": kind, "old_value": _text(old), "new_value": _text(new)}
+            for _, name, kind, old, new in changes
+        ],
+    }).encode("utf-8")
+    try:
+        req = urllib.request.Request(url or WEBHOOK_URL, data=body, headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(req, timeout=10).close()
+    except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError) as e:
+        print(f"[price_store] Webhook delivery of run {run_id} ({platform}, {len(changes)} changes) failed: {e}", flush=True)
+        return False
+    return True
+
+
+# What ``change_log`` accepts as ``since``: a date or a timestamp as ``changed_at`` stores it.
+_SINCE = re.compile(r"\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2})?)?")
+
+
+def parse_since(since):
+    """``since`` if it is an ISO date or UTC timestamp (``YYYY-MM-DD[THH:MM[:SS]]``), else ValueError."""
+    try:
+        if not _SINCE.fullmatch(since):
+            raise ValueError
+        datetime.fromisoformat(since)
+    except ValueError:
+        raise ValueError(f"since must be an ISO date or timestamp (YYYY-MM-DD[THH:MM[:SS]]), got '{since}'") from None
+    return since
+
+
+def change_log(since="", platform=None, limit=500, path=None, location=None, after_id=None):
+    """Logged changes after a cursor, oldest first.
+
+    ``after_id`` returns ids greater than it (the polling cursor); ``since``
+    is an ISO date or timestamp (UTC, inclusive). Either, both or neither
+    may be given; a ``since`` in any other form raises ValueError.
+    """
+    clauses, params = [], []
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(int(after_id))
+    if since:
+        clauses.append("changed_at >= ?")
+        params.append(parse_since(since))
+    if platform:
+        clauses.append("platform = ?")
+        params.append(platform)
+    if location:
+        clauses.append("location = ?")
+        params.append(location)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT id, run_id, platform, location, name, changed_at, kind, old_value, new_value FROM changes"
+            + where + " ORDER BY id LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def price_history(platform, name, days=30, path=None, location=DEFAULT_LOCATION):
+    """Observations of one product at one location over the last ``days`` days, oldest first."""
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S")
+    conn = connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT scraped_at, current_price, original_price, discount, size FROM prices "
+            "WHERE platform = ? AND product_key = ? AND scraped_at >= ? AND location = ? ORDER BY scraped_at",
+            (platform, product_key(name), since, location),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def changes_since(since, platform=None, path=None):
+    """Every observation at or after ``since`` whose current price differs from the one before it."""
+    sql = (
+        "SELECT * FROM ("
+        " SELECT p.platform, p.location, p.name, p.product_key, p.scraped_at, p.current_price,"
+        "  (SELECT q.current_price FROM prices q"
+        "   WHERE q.platform = p.platform AND q.location = p.location AND q.product_key = p.product_key"
+        "   AND q.scraped_at < p.scraped_at"
+        "   ORDER BY q.scraped_at DESC LIMIT 1) AS previous_price"
+        " FROM prices p WHERE p.scraped_at >= ?" + (" AND p.platform = ?" if platform else "") +
+        ") WHERE previous_price IS NOT NULL AND previous_price IS NOT current_price"
+        " ORDER BY scraped_at, platform, name"
+    )
+    params = (since, platform) if platform else (since,)
+    conn = connect(path)
+    try:
+        return [dict(r) for r in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def iter_prices(platform=None, start=None, end=None, path=None, batch_size=5000, location=None):
+    """Yield stored observations in time order as lists of at most ``batch_size`` dicts.
+
+    ``start``/``end`` are inclusive ISO dates or timestamps (UTC); a bare end
+    date covers that whole day. Rows are streamed from the cursor, so memory
+    stays bounded by one batch.
+    """
+    clauses, params = [], []
+    if platform:
+        clauses.append("platform = ?")
+        params.append(platform)
+    if location:
+        clauses.append("location = ?")
+        params.append(location)
+    if start:
+        clauses.append("scraped_at >= ?")
+        params.append(start)
+    if end:
+        clauses.append("scraped_at <= ?")
+        params.append(f"{end}T23:59:59" if len(end) == 10 else end)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = connect(path)
+    try:
+        cursor = conn.execute(
+            "SELECT platform, location, scraped_at, name, current_price, original_price, discount, size FROM prices"
+            + where + " ORDER BY scraped_at, platform, id",
+            params,
+        )
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield [dict(r) for r in batch]
+    finally:
+        conn.close()
+
+
+def import_csv(platform, csv_path, path=None, location=DEFAULT_LOCATION):
+    """Backfill one scraper CSV, stamped with the file's modification time."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        products = list(csv.DictReader(f))
+    scraped_at = datetime.fromtimestamp(os.path.getmtime(csv_path), timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    return ingest(platform, products, scraped_at=scraped_at, path=path, location=location)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query or backfill the price history store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="ingest an existing scraper CSV")
+    imp.add_argument("platform")
+    imp.add_argument("csv_path")
+    imp.add_argument("--location", default=DEFAULT_LOCATION, help="brand@pincode tag")
+    hist = sub.add_parser("history", help="price of one product over time")
+    hist.add_argument("name")
+    hist.add_argument("--platform", required=True)
+    hist.add_argument("--days", type=int, default=30)
+    hist.add_argument("--location", default=DEFAULT_LOCATION, help="brand@pincode tag")
+    chg = sub.add_parser("changes", help="logged changes since a date (UTC) and/or after a change id")
+    chg.add_argument("--since", default="", help="YYYY-MM-DD[THH:MM[:SS]]")
+    chg.add_argument("--after", type=int, help="change id")
+    chg.add_argument("--platform")
+    chg.add_argument("--limit", type=int, default=1000)
+    chg.add_argument("--location", help="brand@pincode tag")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        print(f"Imported run {import_csv(args.platform, args.csv_path, location=args.location)}")
+    elif args.command == "history":
+        for r in price_history(args.platform, args.name, args.days, location=args.location):
+            print(f"{r['scraped_at']}  {r['current_price']}  (MRP {r['original_price']}, {r['discount']})")
+    else:
+        if args.since:
+            try:
+                parse_since(args.since)
+            except ValueError as e:
+                parser.error(str(e))
+        for r in change_log(args.since, args.platform, args.limit, location=args.location, after_id=args.after):
+            print(f"{r['changed_at']}  {r['platform']:<9}  {r['kind']:<10}  {r['old_value']} -> {r['new_value']}  {r['name']}")
+
+
+if __name__ == "__main__":
+    main()
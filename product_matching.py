@@ -0,0 +1,182 @@
+"""Link equivalent products across Blinkit, Zepto and Instamart.
+
+Platforms title the same SKU differently ("Pepe Jeans Innerfashion Men's
+Vest (Grey)" vs "Pepe Jeans Grey Melange Men Vest"), so names are reduced
+to normalised token sets and indexed per platform in an inverted index
+weighted by IDF. A product only gets compared with the handful of products
+that share its rarer tokens, never with the whole catalogue, so matching
+stays near-linear as catalogues grow. Pairs that are each other's best
+match above ``MATCH_THRESHOLD`` are linked, and links are merged across
+platforms into groups with the cheapest offer marked.
+"""
+from collections import defaultdict
+import math
+import re
+
+MATCH_THRESHOLD = 0.45
+# Candidates re-scored exactly per query after the index pass.
+TOP_CANDIDATES = 10
+# Upper bound on how many postings of one token are scanned per query.
+MAX_POSTINGS = 200
+
+STOPWORDS = frozenset({
+    "pepe", "jeans", "innerfashion", "inner", "fashion", "the", "a", "an", "and", "with",
+    "for", "of", "in", "by", "pc", "pcs", "piece", "pieces", "unit", "units", "size",
+})
+TOKEN_ALIASES = {
+    "mens": "men", "man": "men", "womens": "women", "woman": "women", "ladies": "women",
+    "boy": "boys", "girl": "girls", "kid": "kids", "tshirt": "tee", "tees": "tee",
+    "grey": "gray", "trackpant": "track",
+}
+SIZE_ALIASES = {
+    "xs": "xs", "extra small": "xs", "s": "s", "small": "s", "m": "m", "medium": "m",
+    "l": "l", "large": "l", "xl": "xl", "extra large": "xl", "x large": "xl",
+    "xxl": "xxl", "2xl": "xxl", "xxxl": "xxxl", "3xl": "xxxl",
+}
+
+
+def name_tokens(name):
+    """Normalised, de-duplicated content tokens of a product name."""
+    text = (name or "").lower().replace("'s", "").replace("t-shirt", "tshirt")
+    tokens = []
+    for raw in re.split(r"[^a-z0-9]+", text):
+        if not raw or raw in STOPWORDS:
+            continue
+        token = TOKEN_ALIASES.get(raw, raw)
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def normalise_size(size):
+    """Map "Size M", "1 Medium", "M" ... to a canonical size code, or "" if unknown."""
+    text = re.sub(r"[^a-z0-9 ]+", " ", (size or "").lower())
+    text = re.sub(r"\bsize\b", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    if not text or text == "na" or re.fullmatch(r"\d+ ?(pcs?|pieces?|units?)?", text):
+        return ""
+    # "1 Small" on Instamart is a count followed by the size.
+    counted = re.fullmatch(r"\d+ ([a-z ]+)", text)
+    if counted and counted.group(1) in SIZE_ALIASES:
+        text = counted.group(1)
+    return SIZE_ALIASES.get(text, text)
+
+
+def _price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MatchIndex:
+    """Inverted token index over one platform's products."""
+
+    def __init__(self, products):
+        self.products = products
+        self.tokens = [frozenset(name_tokens(p.get("name"))) for p in products]
+        self.sizes = [normalise_size(p.get("sizes") or p.get("unit")) for p in products]
+        self.postings = defaultdict(list)
+        for doc_id, tokens in enumerate(self.tokens):
+            for token in tokens:
+                self.postings[token].append(doc_id)
+        n = max(len(products), 1)
+        self.idf = {t: math.log(1 + n / len(ids)) for t, ids in self.postings.items()}
+        self.default_idf = math.log(1 + n)
+        # Tokens on a large share of the catalogue ("men", "brief") add little
+        # signal and long postings; they are skipped for candidate generation
+        # unless a name has nothing rarer.
+        self.max_postings = max(20, min(n // 5, MAX_POSTINGS))
+
+    def weight(self, token):
+        return self.idf.get(token, self.default_idf)
+
+    def similarity(self, tokens, doc_id):
+        """IDF-weighted Jaccard between a token set and one indexed product."""
+        doc = self.tokens[doc_id]
+        union = tokens | doc
+        if not union:
+            return 0.0
+        shared = sum(self.weight(t) for t in tokens & doc)
+        return shared / sum(self.weight(t) for t in union)
+
+    def best_match(self, name, size=""):
+        """``(doc_id, score)`` of the closest product, or ``(None, 0.0)``."""
+        tokens = frozenset(name_tokens(name))
+        indexed = sorted((t for t in tokens if t in self.postings), key=lambda t: len(self.postings[t]))
+        scores = defaultdict(float)
+        for token in indexed:
+            ids = self.postings[token]
+            if len(ids) > self.max_postings and scores:
+                break
+            w = self.idf[token]
+            for doc_id in ids[:MAX_POSTINGS]:
+                scores[doc_id] += w
+        candidates = sorted(scores, key=scores.get, reverse=True)[:TOP_CANDIDATES]
+        best, best_score = None, 0.0
+        for doc_id in candidates:
+            if size and self.sizes[doc_id] and size != self.sizes[doc_id]:
+                continue
+            score = self.similarity(tokens, doc_id)
+            if score > best_score:
+                best, best_score = doc_id, score
+        return best, best_score
+
+
+def match_platforms(catalogues, threshold=MATCH_THRESHOLD):
+    """Group equivalent products across platforms.
+
+    ``catalogues`` maps platform -> list of product dicts (name, current_price,
+    sizes/unit, ...). Returns groups sorted by name, each
+    ``{"name", "offers": {platform: product}, "cheapest", "spread"}``.
+    """
+    platforms = [p for p in catalogues if catalogues[p]]
+    indexes = {p: MatchIndex(catalogues[p]) for p in platforms}
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for i, a in enumerate(platforms):
+        for b in platforms[i + 1:]:
+            ia, ib = indexes[a], indexes[b]
+            for doc_a, product in enumerate(ia.products):
+                doc_b, score = ib.best_match(product.get("name"), ia.sizes[doc_a])
+                if doc_b is None or score < threshold:
+                    continue
+                back, _ = ia.best_match(ib.products[doc_b].get("name"), ib.sizes[doc_b])
+                if back == doc_a:
+                    parent[find((a, doc_a))] = find((b, doc_b))
+
+    groups = defaultdict(dict)
+    # A chain of links (A1-B1, B1-C1, C1-A2) can pull two listings of one
+    # platform into a group. The first keeps the group's offer; the others
+    # are listed on their own as unmatched rather than dropped.
+    extra = []
+    for platform in platforms:
+        for doc_id, product in enumerate(catalogues[platform]):
+            offers = groups[find((platform, doc_id))]
+            if platform in offers:
+                extra.append({platform: product})
+            else:
+                offers[platform] = product
+
+    result = []
+    for offers in [*groups.values(), *extra]:
+        priced = {p: _price(o.get("current_price")) for p, o in offers.items()}
+        priced = {p: v for p, v in priced.items() if v is not None}
+        cheapest = min(priced, key=priced.get) if priced else ""
+        result.append({
+            "name": min((o.get("name", "") for o in offers.values()), key=len),
+            "offers": offers,
+            "cheapest": cheapest if len(priced) > 1 else "",
+            "spread": (max(priced.values()) - min(priced.values())) if len(priced) > 1 else 0.0,
+        })
+    result.sort(key=lambda g: (-len(g["offers"]), g["name"].lower()))
+    return result
@@ -0,0 +1,139 @@
+"""Per-platform request blocking for scraper browser contexts.
+
+We only keep names, prices, sizes and discounts, so product images, web
+fonts, video and analytics beacons are pure overhead: they slow every
+``networkidle`` wait and burn bandwidth and CPU. ``install`` adds a
+``context.route`` handler that aborts those requests before they load and
+keeps counters so the runner can report what was saved.
+"""
+from urllib.parse import urlsplit
+import os
+
+# Set SCRAPER_BLOCK_RESOURCES=0 to let every request through.
+BLOCKING_ENABLED = os.environ.get("SCRAPER_BLOCK_RESOURCES", "1") != "0"
+
+BLOCKED_TYPES = ("image", "font", "media", "texttrack", "eventsource", "manifest")
+
+TRACKER_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "facebook.com",
+    "clarity.ms",
+    "hotjar.com",
+    "branch.io",
+    "sentry.io",
+    "mixpanel.com",
+    "segment.io",
+    "newrelic.com",
+    "nr-data.net",
+    "amplitude.com",
+    "moengage.com",
+    "clevertap-prod.com",
+    "appsflyer.com",
+    "webengage.com",
+    "bugsnag.com",
+)
+
+# Hosts a platform needs (first party, its CDNs, and the maps APIs behind the
+# location pickers). Anything else third party is aborted.
+POLICIES = {
+    "blinkit": {
+        "allow_hosts": ("blinkit.com", "grofers.com", "googleapis.com", "gstatic.com"),
+        "deny_hosts": TRACKER_HOSTS,
+        "block_types": BLOCKED_TYPES,
+    },
+    "zepto": {
+        "allow_hosts": ("zeptonow.com", "zepto.com", "zepto.co.in", "googleapis.com", "gstatic.com"),
+        "deny_hosts": TRACKER_HOSTS,
+        "block_types": BLOCKED_TYPES,
+    },
+    "instamart": {
+        "allow_hosts": ("swiggy.com", "swiggy.in", "swiggyassets.com", "googleapis.com", "gstatic.com"),
+        "deny_hosts": TRACKER_HOSTS,
+        "block_types": BLOCKED_TYPES,
+    },
+}
+
+# Images are answered with a 1x1 GIF instead of aborted: the location and
+# brand flows click <img> elements, which must still lay out and be clickable.
+PLACEHOLDER_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+# Aborted requests never report a size, so savings are estimated from
+# typical transfer sizes per resource type on these storefronts.
+TYPICAL_BYTES = {
+    "image": 35_000,
+    "font": 40_000,
+    "media": 400_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_TYPICAL_BYTES = 5_000
+
+
+def _host_matches(host, suffixes):
+    return any(host == s or host.endswith("." + s) for s in suffixes)
+
+
+class ResourcePolicy:
+    """Decides which requests of one platform's context are aborted."""
+
+    def __init__(self, platform, allow_hosts=(), deny_hosts=(), block_types=()):
+        self.platform = platform
+        self.allow_hosts = tuple(allow_hosts)
+        self.deny_hosts = tuple(deny_hosts)
+        self.block_types = frozenset(block_types)
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+        self.est_bytes_saved = 0
+
+    @classmethod
+    def for_platform(cls, platform):
+        return cls(platform, **POLICIES.get(platform, {}))
+
+    def should_block(self, url, resource_type):
+        if resource_type == "document":
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        if _host_matches(host, self.deny_hosts):
+            return True
+        if resource_type in self.block_types:
+            return True
+        return bool(self.allow_hosts) and bool(host) and not _host_matches(host, self.allow_hosts)
+
+    async def handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            self.est_bytes_saved += TYPICAL_BYTES.get(request.resource_type, DEFAULT_TYPICAL_BYTES)
+            if request.resource_type == "image":
+                await route.fulfill(status=200, content_type="image/gif", body=PLACEHOLDER_GIF)
+            else:
+                await route.abort("blockedbyclient")
+        else:
+            self.allowed += 1
+            # fallback() rather than continue_(): an earlier route (a HAR replay
+            # or a test stub) may still answer the request instead of the network.
+            await route.fallback()
+
+    def summary(self):
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "est_bytes_saved": self.est_bytes_saved,
+        }
+
+
+async def install(context, platform):
+    """Route every request of ``context`` through the platform's policy."""
+    policy = ResourcePolicy.for_platform(platform)
+    if BLOCKING_ENABLED:
+        await context.route("**/*", policy.handle)
+    return policy
@@ -1,58 +1,220 @@
 #!/usr/bin/env python3
+"""Run the scrape jobs concurrently on one shared Chromium.
+
+Every job (platform x pincode x brand, see ``job_specs.py``) gets its own
+isolated browser context inside a single ``async_playwright`` browser. At
+most ``SCRAPER_MAX_WORKERS`` contexts are open at once, at most
+``SCRAPER_PLATFORM_CONCURRENCY`` of them on the same platform, and jobs on
+one platform start at least ``SCRAPER_POLITENESS_SECONDS`` apart (with
+jitter), so fanning out over many pincodes does not hammer any one site.
+
+    python run_all_scrapers.py                    # every job in scrape_jobs.json, or the defaults
+    python run_all_scrapers.py zepto blinkit      # only these platforms
+    python run_all_scrapers.py --jobs areas.json  # another spec file
+"""
 from datetime import datetime
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+import blinkit_scraper
+import instamart
+import job_specs
+import scrape_metrics
+import snapshot_store
+import zepto_scraper
+
+
+SCRAPERS = {
+    "blinkit": blinkit_scraper.scrape_blinkit_pepe_async,
+    "instamart": instamart.scrape_instamart_pepe_async,
+    "zepto": zepto_scraper.scrape_zepto_pepe_async,
+}
+# Per-job wall-clock budget in seconds; a hung job is cancelled without
+# taking the others down with it.
+PLATFORM_TIMEOUT = float(os.environ.get("SCRAPER_PLATFORM_TIMEOUT", "900"))
+MAX_WORKERS = int(os.environ.get("SCRAPER_MAX_WORKERS", "3"))
+PLATFORM_CONCURRENCY = int(os.environ.get("SCRAPER_PLATFORM_CONCURRENCY", "1"))
+POLITENESS_SECONDS = float(os.environ.get("SCRAPER_POLITENESS_SECONDS", "10"))
+
+
+def emit_progress(**event):
+    """Machine-readable progress line; the background job runner parses these."""
+    print(f"[PROGRESS] {json.dumps(event)}", flush=True)
+
+
+class PlatformGate:
+    """Caps concurrent jobs on one platform and spaces out their start times.
+
+    Entering the gate only takes one of the platform's slots. A job calls
+    ``wait_turn`` once it also holds its browser-pool slot, so the spacing
+    is measured between real starts and not between jobs joining the queue.
+    """
+
+    def __init__(self, concurrency, min_interval):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.min_interval = min_interval
+        self.lock = asyncio.Lock()
+        self.last_start = None
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        return self
+
+    async def wait_turn(self):
+        """Sleep out the gap since the platform's last start, then record this start."""
+        async with self.lock:
+            if self.last_start is not None:
+                gap = self.min_interval * random.uniform(0.7, 1.3)
+                delay = self.last_start + gap - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.last_start = time.monotonic()
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+def job_label(spec):
+    """Default jobs keep the bare platform name; others add their location."""
+    if spec["location"] == job_specs.DEFAULT_LOCATION:
+        return spec["platform"]
+    return f"{spec['platform']}:{spec['location']}"
 
-any_failed = False
-
-print(f"[INFO] Starting all scrapers at {datetime.now().isoformat(timespec='seconds')}")
-
-# ------------- Blinkit -------------
-try:
-    import blinkit_scraper
-
-    print("[RUN] blinkit scraper")
-    blinkit_scraper.scrape_blinkit_pepe()  # your existing function
-    print("[OK] blinkit scraper completed")
-except Exception as e:
-    print(f"[ERROR] blinkit scraper failed: {e}")
-    any_failed = True
-
-# ------------- Instamart -------------
-try:
-    import instamart
-
-    print("[RUN] instamart scraper")
-    instamart.scrape_instamart_pepe()
-    print("[OK] instamart scraper completed")
-except Exception as e:
-    print(f"[ERROR] instamart scraper failed: {e}")
-    any_failed = True
-
-# ------------- Zepto -------------
-try:
-    import zepto_scraper
-
-    print("[RUN] zepto scraper")
-    zepto_scraper.scrape_zepto_pepe()
-    print("[OK] zepto scraper completed")
-except Exception as e:
-    print(f"[ERROR] zepto scraper failed: {e}")
-    any_failed = True
-
-if any_failed:
-    print("[DONE] Completed with errors")
-    exit(1)
-else:
-    print("[DONE] All scrapers completed successfully")
-    exit(0)
 
-    import subprocess
-    from datetime import date
+async def run_job(browser, spec, launch_seconds=0.0, scrape=None):
+    """Run one job under the timeout and emit its progress and metrics.
 
+    ``scrape`` defaults to the platform's ``scrape_*_pepe_async``; the daemon
+    passes its warm-context runner instead.
+    """
+    name = job_label(spec)
+    scrape = scrape or SCRAPERS[spec["platform"]]
+    brand = {k: spec[k] for k in ("brand", "query", "label")}
+    print(f"[RUN] {name} scraper")
+    emit_progress(platform=name, status="running")
+    started = time.monotonic()
+    metrics = scrape_metrics.RunMetrics(spec["platform"], spec["location"])
+    metrics.add_phase("browser_launch", launch_seconds)
+    result = {
+        "platform": name, "ok": False, "status": "error", "rows": 0, "error": "", "resources": {},
+        "location": spec["location"], "output_file": spec["output_file"],
+    }
     try:
-        subprocess.run(["git", "add", "*.csv"], check=True)
-        subprocess.run(["git", "commit", "-m", f"Auto-update scraper data: {date.today()}"], check=True)
-        print("[GIT] CSV files committed")
-    except subprocess.CalledProcessError as e:
-        print(f"[GIT ERROR] {e}")
+        os.makedirs(os.path.dirname(spec["output_file"]), exist_ok=True)
+        outcome = await asyncio.wait_for(
+            scrape(browser, spec["output_file"], spec["pincode"], brand, metrics), timeout=PLATFORM_TIMEOUT
+        )
+        result.update(ok=True, status="ok", **outcome)
+        print(f"[OK] {name} scraper completed")
+    except asyncio.TimeoutError:
+        result.update(status="timeout", error=f"timed out after {PLATFORM_TIMEOUT:.0f}s")
+        print(f"[ERROR] {name} scraper timed out after {PLATFORM_TIMEOUT:.0f}s")
+    except Exception as e:
+        result["error"] = str(e)
+        print(f"[ERROR] {name} scraper failed: {e}")
+    result["seconds"] = round(time.monotonic() - started, 2)
+    await metrics.drain()
+    result["metrics"] = metrics.record(result["status"], result["rows"], result["error"])
+    scrape_metrics.emit(result["metrics"])
+    emit_progress(platform=name, status=result["status"], rows=result["rows"], seconds=result["seconds"], error=result["error"])
+    return result
+
+
+def interleave(specs):
+    """Round-robin the jobs across platforms so one platform never fills the pool."""
+    by_platform = {}
+    for spec in specs:
+        by_platform.setdefault(spec["platform"], []).append(spec)
+    queues = list(by_platform.values())
+    ordered = []
+    while any(queues):
+        for queue in queues:
+            if queue:
+                ordered.append(queue.pop(0))
+    return ordered
+
+
+async def run_all(platforms=None, specs=None):
+    specs = interleave(specs if specs is not None else job_specs.load_specs(platforms=platforms))
+    pool = asyncio.Semaphore(MAX_WORKERS)
+    gates = {platform: PlatformGate(PLATFORM_CONCURRENCY, POLITENESS_SECONDS) for platform in SCRAPERS}
+
+    async def worker(browser, spec, launch_seconds):
+        async with gates[spec["platform"]] as gate, pool:
+            await gate.wait_turn()
+            return await run_job(browser, spec, launch_seconds)
+
+    async with async_playwright() as p:
+        launch_started = time.monotonic()
+        browser = await p.chromium.launch(headless=True)
+        launch_seconds = time.monotonic() - launch_started
+        try:
+            return await asyncio.gather(*(worker(browser, spec, launch_seconds) for spec in specs))
+        finally:
+            await browser.close()
+
+
+def print_summary(r):
+    """The [SUMMARY]/[DELTA]/[METRICS]/[SAVED] lines for one job result."""
+    print(f"[SUMMARY] {r['platform']}: {r['status']} rows={r['rows']} time={r['seconds']}s")
+    if "added" in r:
+        stop = "early stop" if r["early_stop"] else "full crawl"
+        print(f"[DELTA] {r['platform']}: +{r['added']} -{r['removed']} ({stop})")
+    m = r["metrics"]
+    phases = " ".join(f"{k}={v:.1f}s" for k, v in m["phases"].items())
+    print(
+        f"[METRICS] {r['platform']}: {phases} rounds={m['rounds']} dom_calls={m['dom_round_trips']} "
+        f"retries={m.get('retries', 0)} bytes={m['bytes_received']} products/s={m['products_per_second']}"
+    )
+    res = r["resources"]
+    if res:
+        print(
+            f"[SAVED] {r['platform']}: blocked {res['blocked']} of {res['blocked'] + res['allowed']} requests "
+            f"(~{res['est_bytes_saved'] / 1e6:.1f} MB) {res['blocked_by_type']}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the platform scrapers.")
+    parser.add_argument("platforms", nargs="*", help="only run jobs for these platforms")
+    parser.add_argument("--jobs", help=f"job spec JSON file (default: {os.path.basename(job_specs.JOBS_FILE)} if present)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    unknown = [name for name in args.platforms if name not in SCRAPERS]
+    if unknown:
+        print(f"[ERROR] Unknown platform(s): {', '.join(unknown)}")
+        return 2
+    try:
+        specs = job_specs.load_specs(args.jobs, platforms=args.platforms or None)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[ERROR] Invalid job spec: {e}")
+        return 2
+
+    print(f"[INFO] Starting {len(specs)} scrape job(s) at {datetime.now().isoformat(timespec='seconds')}")
+    started = time.monotonic()
+    results = asyncio.run(run_all(specs=specs))
+
+    for r in results:
+        print_summary(r)
+    try:
+        compacted = snapshot_store.compact()
+        print(f"[COMPACT] {compacted['partitions']} partition(s), {compacted['rows']} rows")
+    except Exception as e:
+        print(f"[ERROR] Snapshot compaction failed: {e}")
+    print(f"[INFO] Wall time {time.monotonic() - started:.1f}s")
+
+    if any(not r["ok"] for r in results):
+        print("[DONE] Completed with errors")
+        return 1
+    print("[DONE] All scrapers completed successfully")
+    return 0
+
 
-    exit(0)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Per-run, per-phase scraper metrics.
+
+Every scrape job fills a ``RunMetrics``: wall time per phase (browser
+launch, context setup, location, navigation, scroll, extraction, CSV
+write), scroll rounds, DOM round trips (``page.evaluate`` calls), phase
+retries, bytes received and products per second. The runner appends one JSON line per
+job to ``scraper_metrics.jsonl`` (``SCRAPER_METRICS_LOG``), and the app's
+``/metrics`` endpoint renders the latest run of each job in Prometheus
+text format.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import asyncio
+import json
+import os
+import time
+
+from price_store import utc_now
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_LOG = os.environ.get("SCRAPER_METRICS_LOG", os.path.join(APP_DIR, "scraper_metrics.jsonl"))
+# /metrics only needs the latest runs; never parse more than this much of the log.
+TAIL_BYTES = 512 * 1024
+# How long a finished run waits for the byte counts of its last responses.
+DRAIN_SECONDS = 5.0
+
+
+class RunMetrics:
+    def __init__(self, platform, location):
+        self.platform = platform
+        self.location = location
+        self.started = time.monotonic()
+        self.phases = {}
+        self.rounds = 0
+        self.dom_round_trips = 0
+        self.retries = 0
+        self.responses = 0
+        self.bytes_received = 0
+        self._pending = set()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block; repeated phases accumulate."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.monotonic() - started
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def watch(self, context):
+        """Count responses and the bytes they transferred on a browser context."""
+        context.on("response", self._on_response)
+
+    def unwatch(self, context):
+        """Stop counting on a context that outlives this run."""
+        context.remove_listener("response", self._on_response)
+
+    def _on_response(self, response):
+        self.responses += 1
+        # Content-Length is missing on chunked and most compressed responses;
+        # the transferred sizes are only known once the body has arrived.
+        task = asyncio.ensure_future(self._count_bytes(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _count_bytes(self, response):
+        try:
+            sizes = await response.request.sizes()
+        except Exception:
+            return
+        self.bytes_received += max(sizes["responseHeadersSize"], 0) + max(sizes["responseBodySize"], 0)
+
+    async def drain(self, timeout=DRAIN_SECONDS):
+        """Wait for in-flight byte counts; a response still streaming after ``timeout`` is left out."""
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=timeout)
+
+    def record(self, status, rows, error=""):
+        seconds = time.monotonic() - self.started
+        return {
+            "platform": self.platform,
+            "location": self.location,
+            "finished_at": utc_now(),
+            "status": status,
+            "error": error,
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "phases": {name: round(value, 3) for name, value in self.phases.items()},
+            "rounds": self.rounds,
+            "dom_round_trips": self.dom_round_trips,
+            "retries": self.retries,
+            "responses": self.responses,
+            "bytes_received": self.bytes_received,
+            "products_per_second": round(rows / seconds, 3) if seconds > 0 else 0.0,
+        }
+
+
+def emit(record, path=None):
+    """Append one run record as a JSON line; a failure only logs."""
+    try:
+        with open(path or METRICS_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[metrics] Could not write {path or METRICS_LOG}: {e}", flush=True)
+
+
+def latest_runs(path=None):
+    """The most recent record per (platform, location), read from the log's tail."""
+    path = path or METRICS_LOG
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - TAIL_BYTES))
+            tail = f.read()
+    except OSError:
+        return []
+    lines = tail.splitlines()
+    if size > TAIL_BYTES and lines:
+        lines = lines[1:]  # first line is probably cut off
+    latest = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        latest[(record.get("platform"), record.get("location"))] = record
+    return list(latest.values())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+GAUGES = [
+    ("scraper_run_seconds", "Wall time of the latest run.", "seconds"),
+    ("scraper_rows", "Products written by the latest run.", "rows"),
+    ("scraper_scroll_rounds", "Scroll rounds in the latest run.", "rounds"),
+    ("scraper_dom_round_trips", "page.evaluate calls in the latest run.", "dom_round_trips"),
+    ("scraper_retries", "Phase retries in the latest run.", "retries"),
+    ("scraper_responses", "Network responses seen in the latest run.", "responses"),
+    ("scraper_bytes_received", "Response bytes (headers and body, as transferred) received in the latest run.", "bytes_received"),
+    ("scraper_products_per_second", "Products per second of wall time in the latest run.", "products_per_second"),
+]
+
+
+def prometheus_text(records):
+    """Render run records in the Prometheus text exposition format."""
+    out = []
+
+    def labels(r, **extra):
+        pairs = {"platform": r.get("platform", ""), "location": r.get("location", ""), **extra}
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
+
+    out.append("# HELP scraper_phase_seconds Wall time per scraper phase in the latest run.")
+    out.append("# TYPE scraper_phase_seconds gauge")
+    for r in records:
+        for phase, seconds in r.get("phases", {}).items():
+            out.append(f"scraper_phase_seconds{labels(r, phase=phase)} {seconds}")
+    for name, help_text, key in GAUGES:
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} gauge")
+        for r in records:
+            out.append(f"{name}{labels(r)} {r.get(key, 0)}")
+    out.append("# HELP scraper_last_run_timestamp_seconds Unix time the latest run finished.")
+    out.append("# TYPE scraper_last_run_timestamp_seconds gauge")
+    for r in records:
+        try:
+            finished = datetime.strptime(r["finished_at"], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+        except (KeyError, ValueError):
+            continue
+        out.append(f"scraper_last_run_timestamp_seconds{labels(r)} {int(finished.timestamp())}")
+    out.append("# HELP scraper_run_success 1 if the latest run succeeded, else 0.")
+    out.append("# TYPE scraper_run_success gauge")
+    for r in records:
+        out.append(f"scraper_run_success{labels(r)} {1 if r.get('status') == 'ok' else 0}")
+    return "\n".join(out) + "\n"
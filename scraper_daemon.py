@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Resident scraper service with a pool of warm browser contexts.
+
+``run_all_scrapers.py`` starts cold every hour: import Playwright, launch
+Chromium, set the location and open the catalogue for every job before a
+single product is read. The daemon does that once. Each job (see
+``job_specs.py``) keeps its context parked on the catalogue page, and a
+scheduled run is just a reload and extract. Runs go through the same
+``run_job`` as the batch runner, so progress lines, timeouts, metrics,
+CSVs, price history and compaction behave the same, and the same worker
+pool and per-platform politeness gates apply.
+
+Every job repeats every ``SCRAPER_DAEMON_INTERVAL`` seconds, jittered by
+``SCRAPER_DAEMON_JITTER`` so the jobs drift apart. A context is recycled
+(closed and warmed up again) after ``SCRAPER_RECYCLE_RUNS`` runs, or when
+its page's JS heap passes ``SCRAPER_RECYCLE_MB``. A crashed browser is
+relaunched on the next run.
+
+    python scraper_daemon.py                    # every job, forever
+    python scraper_daemon.py zepto --interval 900
+    python scraper_daemon.py --once             # one warm round, then exit
+
+The daemon is opt-in: the Docker image and the hourly launchd job still run
+``run_all_scrapers.py``. Run one or the other, not both (see
+``com.mac.scraper.daemon.plist``), or every job scrapes twice an interval.
+"""
+from datetime import datetime
+import argparse
+import asyncio
+import os
+import random
+import signal
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+import blinkit_scraper
+import instamart
+import job_specs
+import run_all_scrapers
+import snapshot_store
+import zepto_scraper
+from scraper_engine import open_session, run_session
+
+INTERVAL_SECONDS = float(os.environ.get("SCRAPER_DAEMON_INTERVAL", "3600"))
+# Each wait is the interval times a random factor in [1 - JITTER, 1 + JITTER].
+JITTER = float(os.environ.get("SCRAPER_DAEMON_JITTER", "0.1"))
+RECYCLE_RUNS = int(os.environ.get("SCRAPER_RECYCLE_RUNS", "24"))
+RECYCLE_MB = float(os.environ.get("SCRAPER_RECYCLE_MB", "512"))
+
+ADAPTERS = {
+    "blinkit": blinkit_scraper.ADAPTER,
+    "instamart": instamart.ADAPTER,
+    "zepto": zepto_scraper.ADAPTER,
+}
+
+
+def jittered(seconds, jitter=JITTER):
+    return seconds * random.uniform(1 - jitter, 1 + jitter)
+
+
+class WarmSlot:
+    """The parked session of one job, reopened when it is lost or recycled."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = run_all_scrapers.job_label(spec)
+        self.adapter = ADAPTERS[spec["platform"]]
+        self.brand = {k: spec[k] for k in ("brand", "query", "label")}
+        self.session = None
+
+    async def warm(self, browser):
+        """Open the session now so the next run only reloads; False if setup failed."""
+        if self.session is not None:
+            return True
+        started = time.monotonic()
+        try:
+            self.session = await open_session(self.adapter, browser, self.spec["pincode"], self.brand)
+        except Exception as e:
+            print(f"[ERROR] {self.name} warm-up failed: {e}", flush=True)
+            return False
+        print(f"[WARM] {self.name}: on the catalogue in {time.monotonic() - started:.1f}s", flush=True)
+        return True
+
+    async def run(self, browser, output_file, pincode, brand, metrics):
+        """``run_job``'s scrape callable: reload the parked catalogue (or set it up) and crawl it."""
+        session = self.session
+        if session is not None:
+            session.attach(metrics)
+            with metrics.phase("refresh"):
+                ok = await session.refresh()
+            if not ok:
+                self.adapter.log("Parked session lost its location; setting up again.")
+                await self.close()
+                session = None
+        if session is None:
+            self.session = session = await open_session(self.adapter, browser, pincode, brand, metrics)
+        try:
+            return await run_session(session, output_file, metrics)
+        except BaseException:
+            # A failed or cancelled run leaves the page in an unknown state.
+            await self.close()
+            raise
+
+    async def recycle_if_due(self):
+        """Close the session after RECYCLE_RUNS runs or past RECYCLE_MB of JS heap; True if closed."""
+        if self.session is None:
+            return False
+        reason = None
+        if self.session.runs >= RECYCLE_RUNS:
+            reason = f"{self.session.runs} runs"
+        else:
+            heap_mb = await self.session.memory_mb()
+            if heap_mb >= RECYCLE_MB:
+                reason = f"JS heap {heap_mb:.0f} MB"
+        if reason is None:
+            return False
+        print(f"[RECYCLE] {self.name}: {reason}", flush=True)
+        await self.close()
+        return True
+
+    async def close(self):
+        session, self.session = self.session, None
+        if session is not None:
+            try:
+                await session.close()
+            except Exception:
+                pass
+
+
+class ScraperDaemon:
+    """One resident Chromium and one scheduling loop per job."""
+
+    def __init__(self, specs, interval=INTERVAL_SECONDS, once=False):
+        self.slots = [WarmSlot(spec) for spec in run_all_scrapers.interleave(specs)]
+        self.interval = interval
+        self.once = once
+        self.pool = asyncio.Semaphore(run_all_scrapers.MAX_WORKERS)
+        self.gates = {
+            platform: run_all_scrapers.PlatformGate(
+                run_all_scrapers.PLATFORM_CONCURRENCY, run_all_scrapers.POLITENESS_SECONDS
+            )
+            for platform in ADAPTERS
+        }
+        self.stopping = asyncio.Event()
+        self.browser_lock = asyncio.Lock()
+        self.compact_lock = asyncio.Lock()
+        self.playwright = None
+        self.browser = None
+        # Charged to the first run after a (re)launch only.
+        self.launch_seconds = 0.0
+
+    async def ensure_browser(self):
+        """The shared browser, relaunched (dropping every parked session) if it died."""
+        async with self.browser_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return self.browser
+            if self.browser is not None:
+                print("[ERROR] Browser disconnected; relaunching.", flush=True)
+                for slot in self.slots:
+                    slot.session = None
+            started = time.monotonic()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+            self.launch_seconds = time.monotonic() - started
+            return self.browser
+
+    async def sleep(self, seconds):
+        """Wait ``seconds`` or until stopped; True if stopped."""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self.stopping.is_set()
+
+    async def compact(self, platform):
+        async with self.compact_lock:
+            try:
+                compacted = await asyncio.to_thread(snapshot_store.compact, [platform])
+                print(f"[COMPACT] {platform}: {compacted['partitions']} partition(s), {compacted['rows']} rows", flush=True)
+            except Exception as e:
+                print(f"[ERROR] Snapshot compaction failed: {e}", flush=True)
+
+    async def warm_slot(self, slot):
+        """Park the slot on its catalogue, under the same pool and gate as a run."""
+        async with self.gates[slot.spec["platform"]] as gate, self.pool:
+            await gate.wait_turn()
+            await slot.warm(await self.ensure_browser())
+
+    async def run_slot(self, slot):
+        platform = slot.spec["platform"]
+        while not self.stopping.is_set():
+            try:
+                async with self.gates[platform] as gate, self.pool:
+                    await gate.wait_turn()
+                    browser = await self.ensure_browser()
+                    launch_seconds, self.launch_seconds = self.launch_seconds, 0.0
+                    result = await run_all_scrapers.run_job(browser, slot.spec, launch_seconds, scrape=slot.run)
+                    if not self.once and await slot.recycle_if_due():
+                        await slot.warm(browser)
+                run_all_scrapers.print_summary(result)
+                await self.compact(platform)
+            except Exception as e:
+                print(f"[ERROR] {slot.name} run failed: {e}", flush=True)
+            if self.once:
+                return
+            delay = jittered(self.interval)
+            print(f"[INFO] {slot.name}: next run in {delay:.0f}s", flush=True)
+            if await self.sleep(delay):
+                return
+
+    def stop(self):
+        print("[INFO] Stopping after the runs in progress...", flush=True)
+        self.stopping.set()
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        async with async_playwright() as p:
+            self.playwright = p
+            try:
+                if not self.once:
+                    # Every context reaches its catalogue before the first scheduled runs.
+                    print(f"[INFO] Warming {len(self.slots)} context(s)...", flush=True)
+                    await asyncio.gather(*(self.warm_slot(slot) for slot in self.slots))
+                await asyncio.gather(*(self.run_slot(slot) for slot in self.slots))
+            finally:
+                for slot in self.slots:
+                    await slot.close()
+                if self.browser is not None:
+                    await self.browser.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the platform scrapers as a resident service.")
+    parser.add_argument("platforms", nargs="*", help="only run jobs for these platforms")
+    parser.add_argument("--jobs", help=f"job spec JSON file (default: {os.path.basename(job_specs.JOBS_FILE)} if present)")
+    parser.add_argument("--interval", type=float, default=INTERVAL_SECONDS, help="seconds between runs of a job")
+    parser.add_argument("--once", action="store_true", help="run every job once, then exit")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    unknown = [name for name in args.platforms if name not in ADAPTERS]
+    if unknown:
+        print(f"[ERROR] Unknown platform(s): {', '.join(unknown)}")
+        return 2
+    try:
+        specs = job_specs.load_specs(args.jobs, platforms=args.platforms or None)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[ERROR] Invalid job spec: {e}")
+        return 2
+
+    print(
+        f"[INFO] Scraper daemon serving {len(specs)} job(s) every ~{args.interval:.0f}s "
+        f"from {datetime.now().isoformat(timespec='seconds')}",
+        flush=True,
+    )
+    asyncio.run(ScraperDaemon(specs, args.interval, args.once).serve())
+    print("[DONE] Scraper daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
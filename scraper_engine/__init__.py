@@ -0,0 +1,22 @@
+"""Shared scraper engine; the platform modules are thin adapters on top of it.
+
+    from scraper_engine import PlatformAdapter, Product, scrape
+"""
+from scraper_engine.adapter import PlatformAdapter
+from scraper_engine.engine import Session, open_session, run_session, run_standalone, scrape
+from scraper_engine.records import CSV_FIELDS, MISSING, Product, clean_price, clean_text, write_csv
+
+__all__ = [
+    "CSV_FIELDS",
+    "MISSING",
+    "PlatformAdapter",
+    "Product",
+    "Session",
+    "clean_price",
+    "clean_text",
+    "open_session",
+    "run_session",
+    "run_standalone",
+    "scrape",
+    "write_csv",
+]
@@ -0,0 +1,82 @@
+"""The platform-adapter interface the engine drives.
+
+An adapter describes one storefront: how to reach its catalogue (location
+flow and navigation), how to read it (an in-page extractor and a listing
+API parser) and when its list has ended. The adaptive scroll step, the
+extract/scroll/wait loop, state cache, request blocking, API capture,
+metrics, CSV and history are the engine's job, so they behave the same on
+every platform.
+"""
+from page_waits import click_load_more
+from scraper_engine.records import Product
+from scraper_engine.scroller import ADAPTIVE_SCROLL_JS
+
+
+class PlatformAdapter:
+    """Base class for storefront adapters.
+
+    Subclasses set the class attributes and implement ``set_location`` and
+    ``open_catalogue``; the remaining hooks have defaults that fit a plain
+    infinite-scroll grid.
+    """
+
+    platform = None
+    default_output = None
+    # Where a retried navigation starts over from (the location is kept in cookies).
+    home_url = None
+    # Listing/search API URL fragments whose JSON is parsed by parse_api_item.
+    api_url_fragments = ()
+    # Shown instead of the catalogue when the session has no delivery location.
+    location_prompt_selector = None
+    card_selector = None
+    # ``({ seen, extract, prefix }) => { count, rows }``: the visible card count
+    # and, if ``extract``, every card whose name is not in ``seen`` as
+    # ``{name, current_price, original_price, discount, sizes}`` with trimmed text.
+    extract_js = None
+    # Also press a "Show/Load more" button after each scroll.
+    click_load_more = False
+    # Extra browser.new_context() options (user agent, viewport, geolocation...).
+    context_options = {}
+    # Fallback end-of-list rule for when the scroll geometry cannot tell:
+    # rounds without new cards or rows.
+    max_stable_rounds = 4
+    max_rounds = 300
+
+    def log(self, msg):
+        print(f"[{self.platform}] {msg}", flush=True)
+
+    def matches(self, name, query):
+        """Whether a captured API product belongs to the brand being scraped."""
+        return query in name.lower()
+
+    def parse_api_item(self, item):
+        """Map one dict of a listing payload to a Product, or None if it is not one."""
+        return None
+
+    def normalise(self, raw):
+        """Map one extractor row to a Product."""
+        return Product.from_dom(raw)
+
+    async def set_location(self, page, pincode):
+        """Run the delivery-location flow; True if the location was confirmed."""
+        raise NotImplementedError
+
+    async def open_catalogue(self, page, brand):
+        """Navigate to the brand's product grid; True if it was reached."""
+        raise NotImplementedError
+
+    async def scroll(self, page, progress):
+        """Jump one rendered window down the grid; returns the number of page round trips used."""
+        progress.geometry = await page.evaluate(ADAPTIVE_SCROLL_JS, {"selector": self.card_selector})
+        if self.click_load_more:
+            await click_load_more(page)
+            return 2
+        return 1
+
+    def finished(self, progress):
+        """End-of-list detection, called with the run's ScrollProgress after every round."""
+        return (
+            progress.reached_end()
+            or progress.stable_rounds >= self.max_stable_rounds
+            or progress.rounds >= self.max_rounds
+        )
@@ -0,0 +1,82 @@
+"""On-disk checkpoints of the rows a scrape job has collected so far.
+
+The scroll phase is the longest part of a job, and a failure late in it
+used to throw every collected row away. While it scrolls, the engine
+flushes the rows to ``<SCRAPER_STATE_DIR>/checkpoints/`` every
+``SCRAPER_CHECKPOINT_SECONDS``, and again when the phase fails or is
+cancelled. A run restarted within ``SCRAPER_CHECKPOINT_TTL_MINUTES`` still
+reads every card it reaches, and takes from the checkpoint only the
+products its own scroll never reached; those are kept out of the price
+history's change log. A checkpoint is deleted once its job writes its
+CSV. Set ``SCRAPER_CHECKPOINT=0`` to disable.
+"""
+import json
+import os
+import time
+
+from job_specs import DEFAULT_BRAND
+from scraper_engine.records import CSV_FIELDS, Product
+import state_cache
+
+CHECKPOINT_DIR = os.environ.get("SCRAPER_CHECKPOINT_DIR", os.path.join(state_cache.STATE_DIR, "checkpoints"))
+INTERVAL_SECONDS = float(os.environ.get("SCRAPER_CHECKPOINT_SECONDS", "15"))
+TTL_SECONDS = float(os.environ.get("SCRAPER_CHECKPOINT_TTL_MINUTES", "20")) * 60
+ENABLED = os.environ.get("SCRAPER_CHECKPOINT", "1") != "0"
+
+
+def checkpoint_path(platform, pincode, brand=DEFAULT_BRAND["brand"]):
+    return os.path.join(CHECKPOINT_DIR, f"{platform}_{brand}_{pincode}.json")
+
+
+class Checkpoint:
+    """The collected rows of one platform/pincode/brand job, keyed by name like ``collected``."""
+
+    def __init__(self, platform, pincode, brand=DEFAULT_BRAND["brand"]):
+        self.path = checkpoint_path(platform, pincode, brand)
+        self.last_saved = time.monotonic()
+        # What the file holds. Rows map to the Product objects themselves, so
+        # a renamed, added, dropped or replaced row all differ from it.
+        self.saved = {}
+
+    def load(self):
+        """Rows of a fresh checkpoint, or ``{}``."""
+        if not ENABLED:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if time.time() - entry.get("saved_at", 0) > TTL_SECONDS:
+            return {}
+        rows = {}
+        for raw in entry.get("rows", []):
+            product = Product(*(raw.get(field, "NA") for field in CSV_FIELDS))
+            rows[product.name] = product
+        return rows
+
+    def due(self):
+        return ENABLED and time.monotonic() - self.last_saved >= INTERVAL_SECONDS
+
+    def save(self, rows):
+        """Write ``rows`` (name -> Product) atomically; a failure only logs."""
+        self.last_saved = time.monotonic()
+        if not ENABLED or not rows or rows == self.saved:
+            return
+        entry = {"saved_at": time.time(), "rows": [p.as_dict() for p in rows.values()]}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.saved = dict(rows)
+        except OSError as e:
+            print(f"[checkpoint] Could not write {self.path}: {e}", flush=True)
+
+    def clear(self):
+        self.saved = {}
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,333 @@
+"""One scrape job, driven by a platform adapter.
+
+``scrape`` opens an isolated context on a shared browser, reuses or runs
+the location flow, then loops: one batched extraction round trip, end-of-
+list checks, one adaptive scroll step (see ``scroller``), and an
+event-driven wait for the grid or the listing API to react. Rows captured
+from the API win over DOM rows. The result is written as the shared CSV
+layout and appended to the price history. Each phase is retried with
+backoff, and the scroll phase checkpoints its rows (see ``checkpoint``) so
+a restarted run can fill in the products its own scroll never reached. The
+context and page form a ``Session`` that a long-lived caller can keep on
+the catalogue and reuse for the next run.
+"""
+from playwright.async_api import async_playwright
+import asyncio
+import os
+import random
+import time
+
+from api_capture import ResponseCapture
+from incremental import CatalogueTracker, previous_names, record_delta
+from job_specs import DEFAULT_BRAND, DEFAULT_PINCODE, location_tag
+from page_waits import wait_for_new_content
+import price_store
+import resource_policy
+import state_cache
+from scrape_metrics import RunMetrics
+from scraper_engine.checkpoint import Checkpoint
+from scraper_engine.records import write_csv
+from scraper_engine.scroller import ScrollProgress
+
+# Extra attempts per phase (location, navigation, scroll) before the job fails.
+PHASE_RETRIES = int(os.environ.get("SCRAPER_PHASE_RETRIES", "2"))
+# Base delay before a retry, doubled each time and jittered by +-25%.
+RETRY_BACKOFF = float(os.environ.get("SCRAPER_RETRY_BACKOFF", "2"))
+
+
+async def retry_phase(adapter, name, attempt, metrics, recover=None):
+    """Await ``attempt()`` up to 1 + PHASE_RETRIES times with exponential backoff.
+
+    An exception or a falsy result is a failure; ``recover()`` runs before
+    each retry to put the page back where the phase starts. The last
+    attempt's result (or exception) is the phase's.
+    """
+    for n in range(PHASE_RETRIES + 1):
+        last = n == PHASE_RETRIES
+        try:
+            if n and recover is not None:
+                await recover()
+            result = await attempt()
+            if result or last:
+                return result
+            reason = "did not complete"
+        except Exception as e:
+            if last:
+                raise
+            reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+        delay = RETRY_BACKOFF * 2 ** n * random.uniform(0.75, 1.25)
+        metrics.retries += 1
+        adapter.log(f"{name} failed ({reason}); retry {n + 1}/{PHASE_RETRIES} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def record_history(adapter, rows, location, resumed=()):
+    """Append this run to the price history store; a failure never loses the CSV."""
+    try:
+        price_store.ingest(adapter.platform, rows, location=location, resumed=resumed)
+    except Exception as e:
+        adapter.log(f"Price history ingest failed: {e}")
+
+
+async def reach_catalogue(adapter, context, page, cached, pincode, brand, metrics):
+    """Resume a cached session or run the full location flow; returns ``(warm, ready)``.
+
+    ``ready`` is True when a cold setup fully succeeded, i.e. its state is worth caching.
+    """
+    warm, ready = False, True
+    with metrics.phase("location"):
+        if cached:
+            adapter.log("Reusing cached location state...")
+            warm = await state_cache.resume(page, cached["catalogue_url"], adapter.location_prompt_selector, adapter.card_selector)
+            if not warm:
+                adapter.log("Cached location state rejected; running full setup.")
+                state_cache.invalidate(adapter.platform, pincode, brand["brand"])
+                await context.clear_cookies()
+        if not warm:
+            ready = await retry_phase(adapter, "Location", lambda: adapter.set_location(page, pincode), metrics)
+    if not warm:
+        with metrics.phase("navigation"):
+            opened = await retry_phase(
+                adapter, "Navigation", lambda: adapter.open_catalogue(page, brand), metrics,
+                recover=lambda: page.goto(adapter.home_url, timeout=120000),
+            )
+            ready = opened and ready
+    return warm, ready
+
+
+async def extract_visible(adapter, page, collected, query, extract=True, captured=None):
+    """Merge every visible card not yet in ``collected`` or ``captured`` into ``collected`` in one round trip.
+
+    Returns ``(card_count, new_added)``.
+    """
+    seen = [*collected, *(captured or ())]
+    batch = await page.evaluate(adapter.extract_js, {"seen": seen, "extract": extract, "prefix": query})
+    added = 0
+    for raw in batch["rows"]:
+        product = adapter.normalise(raw)
+        if product.name not in collected and product.name not in (captured or ()):
+            added += 1
+        collected[product.name] = product
+    return batch["count"], added
+
+
+async def collect(adapter, page, capture, tracker, query, metrics, collected=None, checkpoint=None):
+    """Scroll until the list ends or the known catalogue is re-seen; returns ``(collected, early_stop)``.
+
+    ``collected`` may already hold this run's rows from a failed attempt;
+    it is filled in place, and flushed to ``checkpoint`` every few seconds.
+    """
+    adapter.log("Scrolling to load all products...")
+    collected = {} if collected is None else collected
+    progress = ScrollProgress()
+    last_captured = 0
+    while True:
+        with metrics.phase("extraction"):
+            # Server-rendered cards never reach the listing API, so the DOM is
+            # read for every visible card the captured rows do not cover.
+            card_count, new_added = await extract_visible(adapter, page, collected, query, captured=capture.rows)
+        metrics.dom_round_trips += 1
+        new_added += len(capture.rows) - last_captured
+        last_captured = len(capture.rows)
+        progress.observe(card_count, new_added)
+        metrics.rounds = progress.rounds
+        tracker.observe([*collected, *capture.rows])
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save({**collected, **capture.rows})
+        adapter.log(f"Scroll round {progress.rounds}: cards visible = {card_count}, new added = {new_added}")
+
+        if tracker.done():
+            adapter.log(f"All {len(tracker.known)} known products seen again; stopping early.")
+            return collected, True
+        if adapter.finished(progress):
+            if progress.reached_end():
+                adapter.log(f"Reached the end of the list ({progress.geometry['scrollHeight']}px) with nothing new.")
+            return collected, False
+
+        with metrics.phase("scroll"):
+            metrics.dom_round_trips += await adapter.scroll(page, progress) + 1
+            progress.last_wait = await wait_for_new_content(page, adapter.card_selector, card_count, capture)
+
+
+class Session:
+    """One job's browser context and page, parked on its catalogue between runs.
+
+    ``scrape`` opens one, runs it once and closes it; the scraper daemon keeps
+    it and only ``refresh``es the catalogue before each run.
+    """
+
+    def __init__(self, adapter, context, page, policy, capture, pincode, brand):
+        self.adapter = adapter
+        self.context = context
+        self.page = page
+        self.policy = policy
+        self.capture = capture
+        self.pincode = pincode
+        self.brand = brand
+        self.query = brand["query"].lower()
+        self.location = location_tag(brand["brand"], pincode)
+        self.catalogue_url = None
+        # Resumed from the state cache, or its state has been saved since.
+        self.warm = False
+        # The cold location flow and navigation both succeeded.
+        self.ready = True
+        # When the catalogue was last (re)loaded; None once a run has scrolled it.
+        self.loaded_at = None
+        self.runs = 0
+        self.metrics = None
+        self.checkpoint = Checkpoint(adapter.platform, pincode, brand["brand"])
+
+    def attach(self, metrics):
+        """Count this context's traffic into ``metrics`` instead of the previous run's."""
+        if self.metrics is not None:
+            self.metrics.unwatch(self.context)
+        self.metrics = metrics
+        metrics.watch(self.context)
+
+    async def refresh(self, max_age=60):
+        """Reload the catalogue for another run; False if the location was lost.
+
+        A page loaded less than ``max_age`` seconds ago and not yet scrolled is used as is.
+        """
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < max_age:
+            return True
+        self.capture.reset()
+        adapter = self.adapter
+        ok = await state_cache.resume(self.page, self.catalogue_url, adapter.location_prompt_selector, adapter.card_selector)
+        self.loaded_at = time.monotonic() if ok else None
+        return ok
+
+    async def memory_mb(self):
+        """The page's JS heap in MB (Chromium's ``performance.memory``); 0 if unavailable."""
+        try:
+            used = await self.page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+        except Exception:
+            return 0.0
+        return used / 1e6
+
+    async def close(self):
+        if self.metrics is not None:
+            # Byte counts need the context; collect them before it goes.
+            await self.metrics.drain()
+        await self.context.close()
+
+
+async def open_session(adapter, browser, pincode=DEFAULT_PINCODE, brand=None, metrics=None):
+    """New context for one job, left on its catalogue page (resumed or set up cold)."""
+    brand = brand or DEFAULT_BRAND
+    metrics = metrics or RunMetrics(adapter.platform, location_tag(brand["brand"], pincode))
+    setup_started = time.monotonic()
+    cached = state_cache.load(adapter.platform, pincode, brand["brand"])
+    context = await browser.new_context(
+        **adapter.context_options,
+        service_workers="block",
+        storage_state=cached["storage_state"] if cached else None,
+    )
+    try:
+        policy = await resource_policy.install(context, adapter.platform)
+        page = await context.new_page()
+        query = brand["query"].lower()
+        capture = ResponseCapture(
+            page, adapter.api_url_fragments, adapter.parse_api_item, keep=lambda row: adapter.matches(row.name, query)
+        )
+        session = Session(adapter, context, page, policy, capture, pincode, brand)
+        session.attach(metrics)
+        metrics.add_phase("context", time.monotonic() - setup_started)
+        session.warm, session.ready = await reach_catalogue(adapter, context, page, cached, pincode, brand, metrics)
+        session.catalogue_url = page.url
+        session.loaded_at = time.monotonic()
+        if not session.warm and session.ready:
+            # Cache the location as soon as the catalogue is reached, so a run
+            # that fails later restarts from here rather than from the homepage.
+            await state_cache.save(context, adapter.platform, pincode, session.catalogue_url, brand["brand"])
+            session.warm = True
+    except BaseException:
+        await context.close()
+        raise
+    return session
+
+
+async def run_session(session, output_file=None, metrics=None):
+    """Crawl the session's catalogue once, write the CSV and record the history."""
+    adapter = session.adapter
+    platform = adapter.platform
+    output_file = output_file or adapter.default_output
+    if metrics is not None and metrics is not session.metrics:
+        session.attach(metrics)
+    metrics = session.metrics
+    capture = session.capture
+    session.loaded_at = None
+    session.runs += 1
+
+    tracker = CatalogueTracker(previous_names(output_file))
+    checkpoint = session.checkpoint
+    # Rows an earlier run checkpointed. They are never passed to collect(), so
+    # every card this run reaches is read again and only they count towards
+    # the early stop; they just fill in what this run never reached.
+    resumed = checkpoint.load()
+    if resumed:
+        adapter.log(f"Loaded {len(resumed)} products from the last checkpoint.")
+    collected = {}
+
+    async def crawl():
+        return await collect(adapter, session.page, capture, tracker, session.query, metrics, collected, checkpoint)
+
+    async def reload():
+        # Keep what the failed attempt found; the reload clears the captured rows.
+        collected.update(capture.rows)
+        checkpoint.save(collected)
+        if not await session.refresh(max_age=0):
+            raise RuntimeError("the catalogue lost its delivery location on reload")
+
+    try:
+        collected, early_stop = await retry_phase(adapter, "Scroll", crawl, metrics, recover=reload)
+        with metrics.phase("extraction"):
+            await capture.drain()
+    except BaseException:
+        checkpoint.save({**collected, **capture.rows})
+        raise
+    if capture.rows:
+        adapter.log(f"Captured {len(capture.rows)} products from {capture.responses} API responses.")
+        collected = {**collected, **capture.rows}
+    if not collected:
+        adapter.log("No products scraped. CSV file not modified.")
+        return {"rows": 0, "resources": session.policy.summary()}
+    filled = [p for name, p in resumed.items() if name not in collected]
+    if filled:
+        adapter.log(f"Filled in {len(filled)} products the scroll did not reach from the last checkpoint.")
+
+    products = [*collected.values(), *filled]
+    with metrics.phase("csv_write"):
+        write_csv(output_file, products)
+    rows = [p.as_dict() for p in products]
+    with metrics.phase("history"):
+        # SQLite writes and the change webhook block; keep them off the shared event loop.
+        # Checkpointed prices were observed by an earlier run; keep them out of the changes.
+        await asyncio.to_thread(record_history, adapter, rows, session.location, [p.name for p in filled])
+        delta = await asyncio.to_thread(record_delta, platform, tracker, rows, early_stop)
+    checkpoint.clear()
+    adapter.log(f"Scraped {len(products)} unique products. Saved to {output_file}")
+    return {"rows": len(products), "resources": session.policy.summary(), **delta}
+
+
+async def scrape(adapter, browser, output_file=None, pincode=DEFAULT_PINCODE, brand=None, metrics=None):
+    """Scrape one brand at one pincode in its own context of a shared browser."""
+    session = await open_session(adapter, browser, pincode, brand, metrics)
+    try:
+        return await run_session(session, output_file)
+    finally:
+        await session.close()
+
+
+def run_standalone(adapter, output_file=None, pincode=DEFAULT_PINCODE, brand=None):
+    """Launch a browser just for one adapter and scrape once."""
+    async def _main():
+        async with async_playwright() as p:
+            adapter.log("Launching headless browser...")
+            browser = await p.chromium.launch(headless=True)
+            try:
+                return await scrape(adapter, browser, output_file, pincode, brand)
+            finally:
+                await browser.close()
+
+    return asyncio.run(_main())
@@ -0,0 +1,60 @@
+"""The normalised product record every platform adapter produces.
+
+All three storefronts end up as the same five columns, in the same order,
+with "NA" for anything missing. ``__slots__`` keeps a catalogue of records
+small (no per-instance ``__dict__``); ``as_dict`` gives the plain rows the
+price store and delta log take.
+"""
+import csv
+import re
+
+CSV_FIELDS = ("name", "current_price", "original_price", "discount", "sizes")
+MISSING = "NA"
+
+
+def clean_price(text):
+    """Digits of a price label ("₹1,299" -> "1299"), or NA when there are none."""
+    if not text or text == MISSING:
+        return MISSING
+    return re.sub(r"[^\d]", "", str(text)) or MISSING
+
+
+def clean_text(text):
+    text = text.strip() if isinstance(text, str) else ""
+    return text or MISSING
+
+
+class Product:
+    __slots__ = CSV_FIELDS
+
+    def __init__(self, name, current_price=MISSING, original_price=MISSING, discount=MISSING, sizes=MISSING):
+        self.name = name
+        self.current_price = current_price
+        self.original_price = original_price
+        self.discount = discount
+        self.sizes = sizes
+
+    @classmethod
+    def from_dom(cls, raw):
+        """Build a record from an in-page extractor row (label text straight off the card)."""
+        return cls(
+            raw["name"].strip(),
+            clean_price(raw.get("current_price")),
+            clean_price(raw.get("original_price")),
+            clean_text(raw.get("discount")),
+            clean_text(raw.get("sizes")),
+        )
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in CSV_FIELDS}
+
+    def __repr__(self):
+        return f"Product({self.name!r}, {self.current_price}, {self.original_price}, {self.discount!r}, {self.sizes!r})"
+
+
+def write_csv(path, products):
+    """Write records as the shared CSV layout, header first."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows((p.name, p.current_price, p.original_price, p.discount, p.sizes) for p in products)
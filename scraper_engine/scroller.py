@@ -0,0 +1,95 @@
+"""Adaptive scroll steps sized from the product grid's own geometry.
+
+The grids are infinite-scroll lists, and some are virtualised: Blinkit
+keeps about 48 cards mounted and recycles them as the list moves, so
+"cards visible" stops growing even though the list still has products. A
+fixed step (one screen, 800px) either crawls through such a window in
+many small rounds, or the per-card ``scrollIntoView`` overshoots it.
+
+One ``ADAPTIVE_SCROLL_JS`` round trip finds the element that actually
+scrolls the grid (the nearest scrollable ancestor of the cards, else the
+document) and measures the card height, cards per row, the rendered window
+and the container's ``scrollHeight``. It then jumps so that the last
+rendered row sits at the top of the view. Everything above that row has
+already been extracted, so the next window the list mounts starts where
+this one ended and no product is skipped, on any platform, in the fewest
+rounds.
+
+The same measurement tells when the list has ended. If the step reached
+``scrollHeight``, the wait after it saw nothing arrive, and the next
+extraction found no new products, then there is nothing more to load. The
+idle-rounds limit is only the fallback when the geometry cannot tell.
+"""
+
+ADAPTIVE_SCROLL_JS = """
+({ selector }) => {
+  const cards = document.querySelectorAll(selector);
+  const root = document.scrollingElement || document.documentElement;
+  const scrollable = (el) => {
+    const overflow = getComputedStyle(el).overflowY;
+    return /(auto|scroll|overlay)/.test(overflow) && el.scrollHeight > el.clientHeight + 1;
+  };
+  let box = cards.length ? cards[0].parentElement : null;
+  while (box && box !== document.body && box !== document.documentElement && !scrollable(box)) {
+    box = box.parentElement;
+  }
+  const container = box && box !== document.body && box !== document.documentElement ? box : root;
+  const isRoot = container === root;
+  const viewTop = isRoot ? 0 : container.getBoundingClientRect().top;
+  const viewHeight = isRoot ? window.innerHeight : container.clientHeight;
+  const before = container.scrollTop;
+
+  let step = viewHeight;
+  let cardHeight = 0;
+  let perRow = 0;
+  if (cards.length) {
+    const first = cards[0].getBoundingClientRect();
+    const last = cards[cards.length - 1].getBoundingClientRect();
+    cardHeight = Math.round(first.height);
+    perRow = [...cards].slice(0, 50).filter((c) => Math.abs(c.getBoundingClientRect().top - first.top) < 1).length;
+    // Last rendered row to the top of the view; at least half a screen so a
+    // short, fully visible grid still moves towards its loader.
+    step = Math.max(last.top - viewTop, viewHeight / 2);
+  }
+  container.scrollTop = before + step;
+  const top = container.scrollTop;
+  return {
+    step: Math.round(top - before),
+    scrollTop: Math.round(top),
+    scrollHeight: container.scrollHeight,
+    viewHeight: Math.round(viewHeight),
+    cardHeight,
+    perRow,
+    rendered: cards.length,
+    atEnd: top + viewHeight >= container.scrollHeight - 2,
+  };
+}
+"""
+
+
+class ScrollProgress:
+    """Per-run scroll state the engine updates and the adapter's ``finished`` reads."""
+
+    def __init__(self):
+        self.rounds = 0
+        # Rounds in a row without more cards or new products.
+        self.stable_rounds = 0
+        self.last_count = 0
+        # What the last ADAPTIVE_SCROLL_JS step measured, and how the wait after it ended.
+        self.geometry = None
+        self.last_wait = None
+
+    def observe(self, card_count, new_added):
+        """Record one extraction round."""
+        self.rounds += 1
+        # New rows count as progress even when a virtualised grid keeps its card count.
+        if card_count > self.last_count or new_added > 0:
+            self.stable_rounds = 0
+            self.last_count = max(card_count, self.last_count)
+        else:
+            self.stable_rounds += 1
+
+    def reached_end(self):
+        """The last step hit ``scrollHeight``, nothing arrived after it, and no new products showed."""
+        geometry = self.geometry or {}
+        return bool(geometry.get("atEnd")) and self.last_wait == "idle" and self.stable_rounds > 0
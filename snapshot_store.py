@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Columnar snapshot store: price history compacted into Arrow IPC files.
+
+Compaction copies the price store's rows into one Arrow IPC file per
+platform and UTC day (``snapshot_store/<platform>/<YYYY-MM-DD>.arrow``).
+Prices are int32 columns with nulls where a scraper wrote "NA", and
+scraped_at is a second-resolution timestamp (UTC). The files are left
+uncompressed so readers can memory-map them: loading a snapshot or a week
+of history selects the few columns it needs straight from the page cache,
+with no text parsing.
+
+Each file records the last run id it contains in its schema metadata.
+``compact()`` only rewrites days whose newest run is not in their file yet,
+so running it after every scrape touches only today's partitions. Readers
+fall back to the SQLite store for any day that has not been compacted.
+
+    python snapshot_store.py compact
+    python snapshot_store.py compact --full --platform zepto
+    python snapshot_store.py latest blinkit --location pepe@560012
+"""
+from datetime import datetime
+import argparse
+import glob
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import price_store
+from job_specs import DEFAULT_LOCATION
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.environ.get("SNAPSHOT_STORE_DIR", os.path.join(APP_DIR, "snapshot_store"))
+
+SCHEMA = pa.schema([
+    ("run_id", pa.int64()),
+    ("location", pa.string()),
+    ("scraped_at", pa.timestamp("s")),
+    ("name", pa.string()),
+    ("current_price", pa.int32()),
+    ("original_price", pa.int32()),
+    ("discount", pa.string()),
+    ("size", pa.string()),
+])
+LAST_RUN_KEY = b"last_run_id"
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+SNAPSHOT_COLUMNS = ["run_id", "location", "scraped_at", "name", "current_price", "original_price", "discount", "size"]
+HISTORY_COLUMNS = ["location", "scraped_at", "name", "current_price", "original_price", "discount", "size"]
+
+
+def partition_path(platform, day, store_dir=None):
+    return os.path.join(store_dir or STORE_DIR, platform, f"{day}.arrow")
+
+
+def partition_pattern(platform, store_dir=None):
+    return os.path.join(store_dir or STORE_DIR, platform, "*.arrow")
+
+
+def read_table(path, columns=None):
+    """Memory-map an Arrow IPC file and return only ``columns``; buffers are not copied."""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def last_run_id(path):
+    """The newest run id compacted into a partition, from its footer only; None if absent."""
+    try:
+        with pa.memory_map(path, "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    value = metadata.get(LAST_RUN_KEY)
+    return int(value) if value else None
+
+
+def write_partition(conn, platform, day, last_run, store_dir=None, batch_size=50000):
+    """Rewrite one platform/day partition from the price store; returns rows written."""
+    target = partition_path(platform, day, store_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    schema = SCHEMA.with_metadata({LAST_RUN_KEY: str(last_run).encode()})
+    cursor = conn.execute(
+        "SELECT run_id, location, scraped_at, name, current_price, original_price, discount, size FROM prices "
+        "WHERE platform = ? AND scraped_at >= ? AND scraped_at <= ? AND run_id <= ? ORDER BY scraped_at, id",
+        (platform, day, f"{day}T23:59:59", last_run),
+    )
+    tmp = f"{target}.tmp"
+    rows = 0
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            columns = list(zip(*batch))
+            columns[2] = [datetime.strptime(v, TIME_FORMAT) for v in columns[2]]
+            writer.write_batch(pa.record_batch([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+            rows += len(batch)
+    os.replace(tmp, target)
+    return rows
+
+
+def stale_partitions(conn, platforms=None, store_dir=None, full=False):
+    """``(platform, day, last_run)`` for every day whose newest run is not compacted yet."""
+    days = conn.execute(
+        "SELECT platform, substr(scraped_at, 1, 10) AS day, MAX(id) AS last_run FROM runs GROUP BY platform, day ORDER BY day, platform"
+    ).fetchall()
+    for r in days:
+        if platforms and r["platform"] not in platforms:
+            continue
+        if full or last_run_id(partition_path(r["platform"], r["day"], store_dir)) != r["last_run"]:
+            yield r["platform"], r["day"], r["last_run"]
+
+
+def compact(platforms=None, path=None, store_dir=None, full=False):
+    """Bring the columnar store up to date with the price store; returns ``{"partitions", "rows"}``."""
+    conn = price_store.connect(path)
+    try:
+        written = rows = 0
+        for platform, day, last_run in list(stale_partitions(conn, platforms, store_dir, full)):
+            rows += write_partition(conn, platform, day, last_run, store_dir)
+            written += 1
+        return {"partitions": written, "rows": rows}
+    finally:
+        conn.close()
+
+
+def _text(column, missing):
+    """A string/int column as Python strings, ``missing`` for nulls (the CSV's "NA")."""
+    if not pa.types.is_string(column.type):
+        column = pc.cast(column, pa.string())
+    return pc.fill_null(column, missing).to_pylist()
+
+
+def latest_by_location(path):
+    """Latest snapshot of each location in one partition file.
+
+    Returns ``{location: {"scraped_at": datetime, "products": [...]}}`` with
+    products shaped like the dashboard's CSV rows.
+    """
+    table = read_table(path, SNAPSHOT_COLUMNS)
+    out = {}
+    if table.num_rows == 0:
+        return out
+    newest = table.group_by("location").aggregate([("scraped_at", "max")])
+    for location, scraped_at in zip(newest["location"].to_pylist(), newest["scraped_at_max"].to_pylist()):
+        rows = table.filter(pc.and_(pc.equal(table["location"], location), pc.equal(table["scraped_at"], scraped_at)))
+        # Two runs stamped in the same second: keep the later one.
+        rows = rows.filter(pc.equal(rows["run_id"], pc.max(rows["run_id"])))
+        out[location] = {
+            "scraped_at": scraped_at,
+            "products": [
+                {"name": n, "current_price": c, "original_price": o, "discount": d, "sizes": s}
+                for n, c, o, d, s in zip(
+                    _text(rows["name"], ""),
+                    _text(rows["current_price"], "NA"),
+                    _text(rows["original_price"], "NA"),
+                    _text(rows["discount"], "NA"),
+                    _text(rows["size"], "NA"),
+                )
+            ],
+        }
+    return out
+
+
+def _bound(value, end=False):
+    if not value:
+        return None
+    if len(value) == 10:
+        value += "T23:59:59" if end else "T00:00:00"
+    return value
+
+
+def iter_history(platform=None, start=None, end=None, location=None, batch_size=5000, path=None, store_dir=None):
+    """Same rows and batches as ``price_store.iter_prices``, read from the columnar store.
+
+    Days are walked in order; a day whose partition is missing or behind the
+    price store is read from SQLite instead, so results are never stale.
+    """
+    start, end = _bound(start), _bound(end, end=True)
+    clauses, params = [], []
+    if platform:
+        clauses.append("platform = ?")
+        params.append(platform)
+    if location:
+        clauses.append("location = ?")
+        params.append(location)
+    if start:
+        clauses.append("scraped_at >= ?")
+        params.append(start[:10])
+    if end:
+        clauses.append("scraped_at <= ?")
+        params.append(end)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = price_store.connect(path)
+    try:
+        days = conn.execute(
+            "SELECT platform, substr(scraped_at, 1, 10) AS day, MAX(id) AS last_run FROM runs" + where +
+            " GROUP BY platform, day ORDER BY day, platform",
+            params,
+        ).fetchall()
+    finally:
+        conn.close()
+
+    for r in days:
+        day_start = max(start or "", f"{r['day']}T00:00:00")
+        day_end = min(end or "~", f"{r['day']}T23:59:59")
+        partition = partition_path(r["platform"], r["day"], store_dir)
+        # A partition can only lag the store, never lead it, so >= means complete.
+        if (last_run_id(partition) or 0) < r["last_run"]:
+            yield from price_store.iter_prices(r["platform"], day_start, day_end, path, batch_size, location)
+            continue
+        table = read_table(partition, HISTORY_COLUMNS)
+        mask = pc.and_(
+            pc.greater_equal(table["scraped_at"], pa.scalar(datetime.strptime(day_start, TIME_FORMAT), pa.timestamp("s"))),
+            pc.less_equal(table["scraped_at"], pa.scalar(datetime.strptime(day_end, TIME_FORMAT), pa.timestamp("s"))),
+        )
+        if location:
+            mask = pc.and_(mask, pc.equal(table["location"], location))
+        table = table.filter(mask)
+        for batch in table.to_batches(max_chunksize=batch_size):
+            columns = {
+                "location": batch.column("location").to_pylist(),
+                "scraped_at": pc.strftime(batch.column("scraped_at"), format=TIME_FORMAT).to_pylist(),
+                "name": batch.column("name").to_pylist(),
+                "current_price": batch.column("current_price").to_pylist(),
+                "original_price": batch.column("original_price").to_pylist(),
+                "discount": batch.column("discount").to_pylist(),
+                "size": batch.column("size").to_pylist(),
+            }
+            yield [
+                {"platform": r["platform"], **{key: values[i] for key, values in columns.items()}}
+                for i in range(batch.num_rows)
+            ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact price history into Arrow IPC partitions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    comp = sub.add_parser("compact", help="write partitions for days not compacted yet")
+    comp.add_argument("--platform", action="append", help="only this platform (repeatable)")
+    comp.add_argument("--full", action="store_true", help="rewrite every partition")
+    latest = sub.add_parser("latest", help="print the latest compacted snapshot of a platform")
+    latest.add_argument("platform")
+    latest.add_argument("--location", default=DEFAULT_LOCATION, help="brand@pincode tag")
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        result = compact(args.platform, full=args.full)
+        print(f"Compacted {result['partitions']} partition(s), {result['rows']} rows, into {STORE_DIR}")
+        return 0
+    for path in sorted(glob.glob(partition_pattern(args.platform)), reverse=True):
+        snapshot = latest_by_location(path).get(args.location)
+        if snapshot:
+            print(f"{os.path.basename(path)}  {snapshot['scraped_at']:%Y-%m-%d %H:%M:%S} UTC  {len(snapshot['products'])} products")
+            for p in snapshot["products"]:
+                print(f"  {p['current_price']:>6}  {p['original_price']:>6}  {p['discount']:<10}  {p['name']}")
+            return 0
+    print(f"No compacted snapshot for {args.platform} at {args.location}")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
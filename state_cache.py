@@ -0,0 +1,80 @@
+"""Reuse a platform's location/session state across scraper runs.
+
+Setting the delivery pincode is the slowest, most fragile part of every run
+(several clicks and ``networkidle`` waits per platform). After a successful
+run the context's cookies and localStorage are saved, together with the
+catalogue URL the flow ended on, keyed by platform, pincode and brand. The next
+run loads them into ``new_context(storage_state=...)`` and goes straight to
+the catalogue; if the platform shows its location prompt again the entry is
+dropped and the full setup runs.
+"""
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+import json
+import os
+import time
+
+from job_specs import DEFAULT_BRAND
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.environ.get("SCRAPER_STATE_DIR", os.path.join(APP_DIR, ".scraper_state"))
+# Entries older than this are ignored; platforms expire sessions eventually anyway.
+STATE_TTL_SECONDS = float(os.environ.get("SCRAPER_STATE_TTL_HOURS", "24")) * 3600
+# Set SCRAPER_STATE_CACHE=0 to always run the full location setup.
+CACHE_ENABLED = os.environ.get("SCRAPER_STATE_CACHE", "1") != "0"
+
+
+def state_path(platform, pincode, brand=DEFAULT_BRAND["brand"]):
+    return os.path.join(STATE_DIR, f"{platform}_{brand}_{pincode}.json")
+
+
+def load(platform, pincode, brand=DEFAULT_BRAND["brand"]):
+    """Return the cached entry for ``platform``/``pincode``/``brand`` or None if missing or stale."""
+    path = state_path(platform, pincode, brand)
+    if not CACHE_ENABLED or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except Exception:
+        return None
+    if time.time() - entry.get("saved_at", 0) > STATE_TTL_SECONDS or not entry.get("catalogue_url"):
+        return None
+    return entry
+
+
+async def save(context, platform, pincode, catalogue_url, brand=DEFAULT_BRAND["brand"]):
+    """Persist the context's cookies/localStorage plus where the catalogue lives."""
+    if not CACHE_ENABLED:
+        return
+    os.makedirs(STATE_DIR, exist_ok=True)
+    entry = {
+        "platform": platform,
+        "pincode": pincode,
+        "brand": brand,
+        "catalogue_url": catalogue_url,
+        "saved_at": time.time(),
+        "storage_state": await context.storage_state(),
+    }
+    path = state_path(platform, pincode, brand)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def invalidate(platform, pincode, brand=DEFAULT_BRAND["brand"]):
+    try:
+        os.remove(state_path(platform, pincode, brand))
+    except FileNotFoundError:
+        pass
+
+
+async def resume(page, catalogue_url, prompt_selector, card_selector, timeout=20000):
+    """Open a catalogue URL; True if products render without a location prompt."""
+    try:
+        await page.goto(catalogue_url, timeout=120000)
+        await page.wait_for_load_state("domcontentloaded")
+        await page.wait_for_selector(f"{card_selector}, {prompt_selector}", timeout=timeout)
+        return not await page.locator(prompt_selector).first.is_visible()
+    except PlaywrightTimeoutError:
+        return False
@@ -0,0 +1,34 @@
+"""Make the top-level modules importable, with their logs and stores in a scratch directory.
+
+The modules read their paths from the environment at import time, so this
+runs first; tests that need a store of their own pass ``path=`` or
+monkeypatch the module constant.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH = tempfile.mkdtemp(prefix="pricepulse-tests-")
+
+os.environ.update(
+    PRICE_DB_PATH=os.path.join(SCRATCH, "price_history.db"),
+    SNAPSHOT_STORE_DIR=os.path.join(SCRATCH, "snapshot_store"),
+    BENCHMARKS_DB_PATH=os.path.join(SCRATCH, "benchmarks.db"),
+    BENCHMARKS_JSON_PATH=os.path.join(SCRATCH, "benchmarks.json"),
+    SCRAPER_METRICS_LOG=os.path.join(SCRATCH, "scraper_metrics.jsonl"),
+    # Ingests in the tests must not POST to a webhook set in the caller's shell.
+    PRICE_WEBHOOK_URL="",
+)
+sys.path.insert(0, ROOT)
+
+
+def product(name, current_price="NA", original_price="NA", discount="NA", sizes="NA"):
+    """One scraped row as the CSVs and ``price_store.ingest`` see it."""
+    return {
+        "name": name,
+        "current_price": str(current_price),
+        "original_price": str(original_price),
+        "discount": discount,
+        "sizes": sizes,
+    }
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+
+from conftest import product
+import app as dashboard
+import benchmark_store
+import price_store
+
+ROWS = [
+    product("Pepe Jeans Men Vest Grey", 499, 699, "28% OFF", "M"),
+    product("Pepe Jeans Women Brief", 299, 299, "NA", "S"),
+    product("Pepe Jeans Boys Trunk", "NA"),
+]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """The app reading a blinkit CSV, benchmarks and price history from ``tmp_path``."""
+    for platform, spec in dashboard.PLATFORMS.items():
+        monkeypatch.setitem(spec, "pattern", os.path.join(tmp_path, os.path.basename(spec["pattern"])))
+    write_csv(tmp_path / "blinkit_data.csv", ROWS)
+    monkeypatch.setattr(dashboard, "_benchmarks", benchmark_store.BenchmarkCache(str(tmp_path / "benchmarks.db")))
+    dashboard.save_benchmarks({"Pepe Jeans Men Vest Grey": 450.0})
+    monkeypatch.setattr(price_store, "DB_PATH", str(tmp_path / "history.db"))
+    price_store.ingest("blinkit", ROWS, scraped_at="2026-01-01T10:00:00", benchmarks=dashboard.load_benchmarks())
+    dashboard.app.config["TESTING"] = True
+    return dashboard.app.test_client()
+
+
+def test_products_api_pages_the_snapshot(client):
+    response = client.get("/api/products?platform=blinkit&per_page=2&sort=price&order=desc")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data["total"], data["pages"], data["next_page"]) == (3, 2, 2)
+    assert [p["name"] for p in data["products"]] == ["Pepe Jeans Men Vest Grey", "Pepe Jeans Women Brief"]
+    assert data["products"][0]["status"] == "above"
+    assert response.headers["Cache-Control"] == "no-cache"
+    last = client.get("/api/products?platform=blinkit&per_page=2&sort=price&order=desc&page=2").get_json()
+    assert ([p["name"] for p in last["products"]], last["next_page"]) == (["Pepe Jeans Boys Trunk"], None)
+
+
+def test_products_api_answers_304_for_an_unchanged_etag(client):
+    first = client.get("/api/products?platform=blinkit&q=vest")
+    etag = first.headers["ETag"]
+    unchanged = client.get("/api/products?platform=blinkit&q=vest", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+    other_query = client.get("/api/products?platform=blinkit&q=brief", headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+    assert other_query.headers["ETag"] != etag
+
+
+def test_products_api_etag_moves_with_the_benchmarks(client):
+    etag = client.get("/api/products?platform=blinkit").headers["ETag"]
+    dashboard.save_benchmarks({"Pepe Jeans Women Brief": 250.0})
+    response = client.get("/api/products?platform=blinkit", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["products"]
+
+
+@pytest.mark.parametrize("query", ["platform=nope", "sort=name", "status=cheap", "order=up", "page=x"])
+def test_products_api_rejects_bad_arguments(client, query):
+    response = client.get(f"/api/products?{query}")
+    assert response.status_code == 400
+    assert response.get_json()["ok"] is False
+
+
+def test_export_streams_the_snapshot_as_csv(client):
+    response = client.get("/export?platform=blinkit")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert "export_with_benchmarks_blinkit.csv" in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r["name"] for r in rows] == [p["name"] for p in ROWS]
+    assert (rows[0]["benchmark_price"], rows[0]["status"], rows[0]["diff"]) == ("450.0", "above", "49.00")
+
+
+def test_export_all_platforms_adds_a_platform_column(client):
+    response = client.get("/export?platform=all&format=jsonl")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert {r["platform"] for r in lines} == {"blinkit"}
+    assert len(lines) == len(ROWS)
+
+
+def test_export_history_range_as_json_lines(client):
+    response = client.get("/export?platform=blinkit&format=jsonl&from=2026-01-01&to=2026-01-01")
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(r["scraped_at"], r["name"]) for r in lines] == [("2026-01-01T10:00:00", p["name"]) for p in ROWS]
+    assert lines[0]["status"] == "above"
+    assert client.get("/export?platform=blinkit&format=jsonl&from=2026-02-01").get_data() == b""
+
+
+def test_export_rejects_unknown_format(client):
+    response = client.get("/export?format=xlsx")
+    assert response.status_code == 400
+    assert "unknown format" in response.get_json()["error"]
+
+
+def test_changes_feed_pages_with_its_cursor(client):
+    price_store.ingest("blinkit", [product("Pepe Jeans Men Vest Grey", 449, 699, "28% OFF", "M")], scraped_at="2026-01-02T10:00:00", benchmarks={})
+    first = client.get("/changes?limit=1").get_json()
+    assert first["count"] == 1
+    rest = client.get(f"/changes?after={first['next']}").get_json()
+    assert [c["kind"] for c in first["changes"] + rest["changes"]] == ["price_down", "removed", "removed"]
+    done = client.get(f"/changes?after={rest['next']}").get_json()
+    assert (done["count"], done["next"]) == (0, rest["next"])
+    assert client.get("/changes?platform=nope").status_code == 400
+    assert client.get("/changes?limit=x").status_code == 400
+
+
+def test_changes_feed_takes_a_date_or_a_change_id(client):
+    price_store.ingest("blinkit", [product("Pepe Jeans Men Vest Grey", 449, 699, "28% OFF", "M")], scraped_at="2026-01-02T10:00:00", benchmarks={})
+    dated = client.get("/changes?since=2026-01-02").get_json()
+    assert dated["count"] == 3
+    assert client.get("/changes?since=2026-01-03T00:00").get_json()["count"] == 0
+    assert client.get(f"/changes?after={dated['changes'][0]['id']}").get_json()["count"] == 2
+    for query in ("since=20250926", "since=2026-02-30", "after=2026-01-02", "after=-1"):
+        response = client.get(f"/changes?{query}")
+        assert response.status_code == 400, query
+        assert response.get_json()["ok"] is False
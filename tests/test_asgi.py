@@ -0,0 +1,114 @@
+import asyncio
+import csv
+import os
+
+import pytest
+
+from conftest import product
+import app as dashboard
+import asgi
+import benchmark_store
+import price_store
+
+ROWS = [
+    product("Pepe Jeans Men Vest Grey", 499, 699, "28% OFF", "M"),
+    product("Pepe Jeans Women Brief", 299, 299, "NA", "S"),
+]
+
+
+@pytest.fixture(autouse=True)
+def snapshot(tmp_path, monkeypatch):
+    for platform, spec in dashboard.PLATFORMS.items():
+        monkeypatch.setitem(spec, "pattern", os.path.join(tmp_path, os.path.basename(spec["pattern"])))
+    with open(tmp_path / "blinkit_data.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(ROWS[0]))
+        writer.writeheader()
+        writer.writerows(ROWS)
+    monkeypatch.setattr(dashboard, "_benchmarks", benchmark_store.BenchmarkCache(str(tmp_path / "benchmarks.db")))
+    dashboard.save_benchmarks({"Pepe Jeans Men Vest Grey": 450.0})
+    monkeypatch.setattr(price_store, "DB_PATH", str(tmp_path / "history.db"))
+    monkeypatch.setattr(asgi, "_export_slots", None)
+
+
+def call(path, method="GET", query=b"", headers=(), body=b""):
+    """Run one HTTP request through the ASGI app; returns ``(status, headers, body)``."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "server": ("testserver", 80), "client": ("127.0.0.1", 1234),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    start = sent[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+@pytest.fixture
+def wsgi_calls(monkeypatch):
+    """Record which requests fall through to the wrapped Flask app."""
+    calls = []
+    wrapped = asgi.wsgi_application
+
+    async def recorder(scope, receive, send):
+        calls.append((scope["method"], scope["path"]))
+        await wrapped(scope, receive, send)
+
+    monkeypatch.setattr(asgi, "wsgi_application", recorder)
+    return calls
+
+
+def test_hot_routes_are_served_natively(wsgi_calls):
+    status, headers, body = call("/", query=b"platform=blinkit")
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/html")
+    assert b"Blinkit" in body
+
+    status, headers, body = call("/export", query=b"platform=blinkit")
+    assert status == 200
+    assert headers[b"content-type"] == b"text/csv"
+    assert body.decode().splitlines()[1].startswith("Pepe Jeans Men Vest Grey")
+
+    status, _, _ = call("/tasks/run-scrapers", method="POST")
+    assert status == 401
+    assert wsgi_calls == []
+
+
+def test_other_routes_fall_back_to_flask(wsgi_calls):
+    status, _, body = call("/api/products", query=b"platform=blinkit")
+    assert status == 200
+    assert b"Pepe Jeans Women Brief" in body
+    # Same path with another method is not a native route either.
+    call("/export", method="HEAD")
+    assert wsgi_calls == [("GET", "/api/products"), ("HEAD", "/export")]
+
+
+def test_native_export_matches_flask():
+    client = dashboard.app.test_client()
+    for query in ("platform=blinkit", "platform=blinkit&format=jsonl", "format=xlsx"):
+        status, headers, body = call("/export", query=query.encode())
+        expected = client.get(f"/export?{query}")
+        assert (status, headers[b"content-type"].decode().split(";")[0], body) == (
+            expected.status_code, expected.mimetype, expected.get_data()
+        )
+
+
+def test_lifespan_completes():
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(asgi.application({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import benchmark_store
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "benchmarks.db")
+
+
+def test_concurrent_updates_keep_both_keys(db):
+    benchmark_store.update({"seed": 1}, path=db)
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def save(name):
+        try:
+            barrier.wait()
+            benchmark_store.update({name: 100}, path=db)
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(name,)) for name in ("vest", "brief")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert benchmark_store.load(db) == {"seed": 1, "vest": 100, "brief": 100}
+    conn = benchmark_store.connect(db)
+    assert benchmark_store.version(conn) == 3
+    conn.close()
+
+
+def test_unchanged_values_do_not_bump_the_version(db):
+    assert benchmark_store.update({"vest": 450.0, "brief": 299}, path=db) == (1, 2)
+    assert benchmark_store.update({"vest": 450.0, "brief": 299}, path=db) == (1, 0)
+    assert benchmark_store.update({"vest": 450.0, "brief": 279}, path=db) == (2, 1)
+
+
+def test_none_deletes_a_key(db):
+    benchmark_store.update({"vest": 450, "brief": 299}, path=db)
+    assert benchmark_store.update({"vest": None}, path=db) == (2, 1)
+    assert benchmark_store.load(db) == {"brief": 299}
+    # Deleting a key that is not there is not a change.
+    assert benchmark_store.update({"vest": None}, path=db) == (2, 0)
+
+
+def test_replace_prunes_keys_missing_from_the_update(db):
+    benchmark_store.update({"vest": 450, "brief": 299, "trunk": 199}, path=db)
+    assert benchmark_store.update({"vest": 450, "socks": 99}, path=db, replace=True) == (2, 3)
+    assert benchmark_store.load(db) == {"vest": 450, "socks": 99}
+
+
+def test_cache_reloads_only_after_another_connection_writes(db, monkeypatch):
+    benchmark_store.update({"vest": 450}, path=db)
+    cache = benchmark_store.BenchmarkCache(db)
+    reads = []
+    read_all = benchmark_store.read_all
+    monkeypatch.setattr(benchmark_store, "read_all", lambda conn: reads.append(1) or read_all(conn))
+
+    assert cache.get() == {"vest": 450}
+    assert cache.get() == {"vest": 450}
+    assert (len(reads), cache.version) == (1, 1)
+
+    benchmark_store.update({"vest": 450}, path=db)  # no change, no reload
+    cache.get()
+    assert len(reads) == 1
+
+    benchmark_store.update({"brief": 299}, path=db)
+    assert cache.get() == {"vest": 450, "brief": 299}
+    assert (len(reads), cache.version) == (2, 2)
+
+
+def test_empty_string_is_stored_for_a_new_key(db):
+    assert benchmark_store.update({"vest": "", "brief": 299}, path=db) == (1, 2)
+    assert benchmark_store.load(db) == {"vest": "", "brief": 299}
+    assert benchmark_store.update({"vest": ""}, path=db) == (1, 0)
+
+
+@pytest.fixture
+def legacy_json(tmp_path, monkeypatch):
+    path = tmp_path / "benchmarks.json"
+    monkeypatch.setattr(benchmark_store, "LEGACY_JSON_PATH", str(path))
+    return path
+
+
+def test_legacy_json_is_imported_once(db, legacy_json):
+    legacy_json.write_text(json.dumps({"vest": "", "brief": ""}), encoding="utf-8")
+    assert benchmark_store.load(db) == {"vest": "", "brief": ""}
+
+    # Later connects only read the flag, even though the import left nothing but "".
+    legacy_json.write_text(json.dumps({"vest": 450}), encoding="utf-8")
+    assert benchmark_store.load(db) == {"vest": "", "brief": ""}
+    conn = benchmark_store.connect(db)
+    assert conn.execute("SELECT version, imported FROM meta").fetchone() == (1, 1)
+    conn.close()
+
+
+def test_legacy_json_does_not_overwrite_a_written_store(db, legacy_json):
+    benchmark_store.update({"vest": 399}, path=db)
+    legacy_json.write_text(json.dumps({"vest": 450, "brief": 299}), encoding="utf-8")
+    assert benchmark_store.load(db) == {"vest": 399}
+
+
+def test_store_from_before_the_import_flag_is_migrated(db, legacy_json):
+    conn = sqlite3.connect(db)
+    conn.executescript("""
+        CREATE TABLE meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL);
+        INSERT INTO meta (id, version) VALUES (1, 4);
+    """)
+    conn.close()
+    legacy_json.write_text(json.dumps({"vest": 450}), encoding="utf-8")
+    conn = benchmark_store.connect(db)
+    assert conn.execute("SELECT version, imported FROM meta").fetchone() == (4, 1)
+    assert benchmark_store.read_all(conn) == (4, {})
+    conn.close()
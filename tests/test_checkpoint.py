@@ -0,0 +1,86 @@
+import json
+import time
+
+import pytest
+
+from scraper_engine import checkpoint as checkpoint_module
+from scraper_engine.checkpoint import Checkpoint
+from scraper_engine.records import Product
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint_module, "CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(checkpoint_module, "ENABLED", True)
+    return tmp_path
+
+
+def rows(*names):
+    return {name: Product(name, "499", "699", "28% OFF", "M") for name in names}
+
+
+def test_save_and_load_round_trip():
+    Checkpoint("blinkit", "560012").save(rows("Vest", "Brief"))
+    loaded = Checkpoint("blinkit", "560012").load()
+    assert {name: p.as_dict() for name, p in loaded.items()} == {name: p.as_dict() for name, p in rows("Vest", "Brief").items()}
+    assert Checkpoint("blinkit", "110001").load() == {}
+
+
+def test_checkpoint_older_than_ttl_is_ignored(monkeypatch):
+    checkpoint = Checkpoint("zepto", "560012")
+    checkpoint.save(rows("Vest"))
+    with open(checkpoint.path, encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["saved_at"] = time.time() - checkpoint_module.TTL_SECONDS - 1
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    assert checkpoint.load() == {}
+    monkeypatch.setattr(checkpoint_module, "TTL_SECONDS", checkpoint_module.TTL_SECONDS + 60)
+    assert list(checkpoint.load()) == ["Vest"]
+
+
+def test_clear_and_disabled(monkeypatch):
+    checkpoint = Checkpoint("instamart", "560012")
+    checkpoint.save(rows("Vest"))
+    checkpoint.clear()
+    assert checkpoint.load() == {}
+    checkpoint.clear()  # already gone
+    monkeypatch.setattr(checkpoint_module, "ENABLED", False)
+    checkpoint.save(rows("Vest"))
+    assert checkpoint.load() == {}
+    assert not checkpoint.due()
+
+
+def test_unreadable_checkpoint_is_ignored(checkpoint_dir):
+    checkpoint = Checkpoint("blinkit", "560012")
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert checkpoint.load() == {}
+
+
+def saved_names(checkpoint):
+    with open(checkpoint.path, encoding="utf-8") as f:
+        return [row["name"] for row in json.load(f)["rows"]]
+
+
+def test_save_writes_when_the_rows_change_but_not_their_count():
+    checkpoint = Checkpoint("blinkit", "560012")
+    checkpoint.save(rows("Vest", "Brief"))
+    # A virtualised grid swaps rows out: same count, different products.
+    checkpoint.save(rows("Vest", "Trunk"))
+    assert saved_names(checkpoint) == ["Vest", "Trunk"]
+
+    updated = rows("Vest", "Trunk")
+    updated["Vest"] = Product("Vest", "449", "699", "35% OFF", "M")
+    checkpoint.save(updated)
+    assert checkpoint.load()["Vest"].current_price == "449"
+
+
+def test_save_skips_an_unchanged_snapshot(monkeypatch):
+    checkpoint = Checkpoint("blinkit", "560012")
+    current = rows("Vest", "Brief")
+    checkpoint.save(current)
+    writes = []
+    monkeypatch.setattr(checkpoint_module.os, "replace", lambda *args: writes.append(args))
+    checkpoint.save(dict(current))
+    assert writes == []
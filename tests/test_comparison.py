@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+
+from comparison import EXPORT_FIELDS, Comparison, to_float_array
+from conftest import product
+
+PRODUCTS = [
+    product("Vest", 499, 699, "28% OFF", "M"),
+    product("Brief", 299),
+    product("Trunk", 199),
+    product("Boxer", "NA"),
+    product("Socks", 150),
+]
+BENCHMARKS = {"Vest": "450", "Brief": 350, "Trunk": "199", "Boxer": "300", "Socks": "NA"}
+
+
+def test_to_float_array_treats_missing_markers_as_nan():
+    values = to_float_array(["499", " 12.5 ", "NA", "", None, "N/A", "nan", "abc", 7])
+    assert values[:2].tolist() == [499.0, 12.5]
+    assert np.isnan(values[2:8]).all()
+    assert values[8] == 7.0
+    assert to_float_array([]).size == 0
+
+
+def test_rows_carry_benchmark_status_and_diff():
+    rows = list(Comparison(PRODUCTS, BENCHMARKS).rows())
+    assert set(EXPORT_FIELDS) <= set(rows[0])
+    assert [(r["name"], r["status"], r["diff"]) for r in rows] == [
+        ("Vest", "above", "49.00"),
+        ("Brief", "below", "-51.00"),
+        ("Trunk", "equal", "0.00"),
+        ("Boxer", "", ""),  # no price
+        ("Socks", "", ""),  # benchmark is "NA"
+    ]
+    assert rows[0]["benchmark_price"] == "450"
+    assert rows[0]["diff_pct"] == 10.89
+    assert rows[3]["diff_pct"] == ""
+    # The snapshot's own dicts are not modified.
+    assert "status" not in PRODUCTS[0]
+
+
+def test_unbenchmarked_products_have_empty_columns():
+    row = next(Comparison([product("Vest", 499)], {}).rows())
+    assert (row["benchmark_price"], row["status"], row["diff"], row["diff_pct"]) == ("", "", "", "")
+
+
+def test_summary_aggregates():
+    summary = Comparison(PRODUCTS, BENCHMARKS).summary()
+    assert summary == {
+        "count": 5,
+        "benchmarked": 3,
+        "above": 1,
+        "below": 1,
+        "equal": 1,
+        "total_overspend": 49.0,
+        "total_savings": 51.0,
+        "avg_gap_pct": round((49 / 450 - 51 / 350) * 100 / 3, 2),
+    }
+
+
+def test_summary_without_benchmarks():
+    summary = Comparison(PRODUCTS, {}).summary()
+    assert summary["benchmarked"] == 0
+    assert summary["avg_gap_pct"] is None
+    assert not math.isnan(summary["total_overspend"])
+    assert len(Comparison([], {})) == 0
+
+
+def test_select_filters_by_name_and_status():
+    comparison = Comparison(PRODUCTS, BENCHMARKS)
+    assert comparison.select().tolist() == [0, 1, 2, 3, 4]
+    assert comparison.select("BR").tolist() == [1]
+    assert comparison.select(statuses=["above", "equal"]).tolist() == [0, 2]
+    assert comparison.select(statuses=["none"]).tolist() == [3, 4]
+    assert comparison.select("s", statuses=["none"]).tolist() == [4]
+
+
+def test_select_sorts_with_missing_values_last():
+    comparison = Comparison(PRODUCTS, BENCHMARKS)
+    assert comparison.select(sort="price").tolist() == [4, 2, 1, 0, 3]
+    assert comparison.select(sort="price", descending=True).tolist() == [0, 1, 2, 4, 3]
+    assert comparison.select(sort="diff").tolist() == [1, 2, 0, 3, 4]
+    assert comparison.select(sort="discount", descending=True).tolist()[0] == 0
+
+
+def test_rows_follow_the_selected_indices():
+    comparison = Comparison(PRODUCTS, BENCHMARKS)
+    rows = list(comparison.rows(comparison.select(sort="price", descending=True)[:2]))
+    assert [(r["name"], r["status"]) for r in rows] == [("Vest", "above"), ("Brief", "below")]
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from export_stream import ENCODERS, FORMATS
+
+FIELDS = ["name", "current_price", "status"]
+BATCHES = [
+    [{"name": "Vest", "current_price": "499", "status": "above", "extra": "dropped"}],
+    [],
+    [{"name": "Brief, pink", "current_price": "299"}, {"name": "Trunk", "current_price": None, "status": "below"}],
+]
+
+
+def test_every_encoder_has_a_format():
+    assert set(ENCODERS) == set(FORMATS)
+
+
+def test_csv_yields_one_chunk_per_batch_after_the_header():
+    chunks = list(ENCODERS["csv"](iter(BATCHES), FIELDS))
+    assert chunks[0].startswith("name,current_price,status\r\nVest,499,above\r\n")
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert rows == [
+        {"name": "Vest", "current_price": "499", "status": "above"},
+        {"name": "Brief, pink", "current_price": "299", "status": ""},
+        {"name": "Trunk", "current_price": "", "status": "below"},
+    ]
+
+
+def test_csv_of_no_rows_is_just_the_header():
+    assert "".join(ENCODERS["csv"](iter([]), FIELDS)) == "name,current_price,status\r\n"
+
+
+def test_jsonl_keeps_only_the_export_fields():
+    lines = "".join(ENCODERS["jsonl"](iter(BATCHES), FIELDS)).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"name": "Vest", "current_price": "499", "status": "above"},
+        {"name": "Brief, pink", "current_price": "299", "status": ""},
+        {"name": "Trunk", "current_price": None, "status": "below"},
+    ]
+
+
+def test_parquet_writes_one_row_group_per_batch():
+    data = b"".join(ENCODERS["parquet"](iter(BATCHES), FIELDS))
+    parquet = pq.ParquetFile(pa.BufferReader(data))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.schema.names == FIELDS
+    assert table.column("name").to_pylist() == ["Vest", "Brief, pink", "Trunk"]
+    # Every column is a string; missing values are empty.
+    assert table.column("current_price").to_pylist() == ["499", "299", ""]
@@ -0,0 +1,76 @@
+import os
+
+from file_cache import FileCache, LatestMatchCache, file_signature
+
+
+def write(path, text, mtime_ns=None):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def touch_dir(path, mtime_ns):
+    # Directory mtimes come from a coarse clock; set them so each change is seen.
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_file_signature(tmp_path):
+    path = tmp_path / "a.csv"
+    write(path, "abc", mtime_ns=1_000_000_000)
+    assert file_signature(str(path)) == (1_000_000_000, 3)
+    assert file_signature(str(tmp_path / "missing.csv")) is None
+    assert file_signature(None) is None
+
+
+def test_file_cache_reloads_only_when_mtime_or_size_changes(tmp_path):
+    path = str(tmp_path / "a.csv")
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        with open(p, encoding="utf-8") as f:
+            return f.read()
+
+    cache = FileCache(loader)
+    write(path, "one", mtime_ns=1_000_000_000)
+    assert cache.get(path) == "one"
+    assert cache.get(path) == "one"
+    assert len(calls) == 1
+    # Same size, newer mtime.
+    write(path, "two", mtime_ns=2_000_000_000)
+    assert cache.get(path) == "two"
+    # Same mtime, different size.
+    write(path, "three", mtime_ns=2_000_000_000)
+    assert cache.get(path) == "three"
+    assert len(calls) == 3
+    cache.clear()
+    cache.get(path)
+    assert len(calls) == 4
+
+
+def test_file_cache_loads_a_missing_file_until_it_appears(tmp_path):
+    path = str(tmp_path / "late.csv")
+    cache = FileCache(lambda p: os.path.exists(p))
+    assert cache.get(path) is False
+    write(path, "x")
+    assert cache.get(path) is True
+
+
+def test_latest_match_picks_the_newest_and_sees_new_files(tmp_path):
+    cache = LatestMatchCache()
+    pattern = str(tmp_path / "blinkit_*.csv")
+    old, new = str(tmp_path / "blinkit_1.csv"), str(tmp_path / "blinkit_2.csv")
+    assert cache.latest(pattern) is None
+    write(old, "a", mtime_ns=1_000_000_000)
+    touch_dir(tmp_path, 1_000_000_000)
+    assert cache.latest(pattern) == old
+    write(new, "b", mtime_ns=2_000_000_000)
+    touch_dir(tmp_path, 2_000_000_000)
+    assert cache.latest(pattern) == new
+    # Rewriting a file does not change the directory, but is still re-stat'ed.
+    write(old, "a", mtime_ns=3_000_000_000)
+    assert cache.latest(pattern) == old
+    os.remove(old)
+    touch_dir(tmp_path, 3_000_000_000)
+    assert cache.latest(pattern) == new
@@ -0,0 +1,65 @@
+import json
+
+from incremental import CatalogueTracker, previous_names, record_delta
+
+
+def test_previous_names_reads_the_last_csv(tmp_path):
+    path = tmp_path / "blinkit_data.csv"
+    path.write_text("name,current_price\nVest,499\n,1\nBrief,299\n", encoding="utf-8")
+    assert previous_names(str(path)) == ["Vest", "Brief"]
+    assert previous_names(str(tmp_path / "missing.csv")) == []
+
+
+def test_stops_once_every_known_product_is_seen_and_settled():
+    tracker = CatalogueTracker(["Vest", "Brief", "Trunk"], settle_rounds=2, enabled=True)
+    tracker.observe(["vest", "BRIEF"])
+    assert tracker.missing == 1 and not tracker.done()
+    tracker.observe(["vest", "BRIEF", "Trunk"])
+    assert tracker.missing == 0 and not tracker.done()
+    tracker.observe(["vest", "BRIEF", "Trunk"])
+    assert not tracker.done()
+    tracker.observe(["vest", "BRIEF", "Trunk"])
+    assert tracker.done()
+
+
+def test_a_new_product_restarts_the_settle_window():
+    tracker = CatalogueTracker(["Vest"], settle_rounds=1, enabled=True)
+    tracker.observe(["Vest"])
+    tracker.observe(["Vest"])
+    assert tracker.done()
+    tracker.observe(["Vest", "Boxer"])
+    assert not tracker.done()
+    tracker.observe(["Vest", "Boxer"])
+    assert tracker.done()
+
+
+def test_a_removed_product_never_stops_early():
+    tracker = CatalogueTracker(["Vest", "Discontinued"], settle_rounds=1, enabled=True)
+    for _ in range(5):
+        tracker.observe(["Vest", "Boxer"])
+    assert tracker.missing == 1
+    assert not tracker.done()
+
+
+def test_no_early_stop_without_a_previous_run_or_when_disabled():
+    first_run = CatalogueTracker([], settle_rounds=0, enabled=True)
+    first_run.observe(["Vest"])
+    assert not first_run.done()
+    disabled = CatalogueTracker(["Vest"], settle_rounds=0, enabled=False)
+    disabled.observe(["Vest"])
+    assert not disabled.done()
+
+
+def test_record_delta_logs_additions_and_removals(tmp_path):
+    log = tmp_path / "deltas.jsonl"
+    tracker = CatalogueTracker(["Vest", "Trunk"])
+    counts = record_delta("zepto", tracker, [{"name": "vest"}, {"name": "Boxer"}], early_stop=False, path=str(log))
+    assert counts == {"added": 1, "removed": 1, "early_stop": False}
+    entry = json.loads(log.read_text(encoding="utf-8"))
+    assert (entry["platform"], entry["count"], entry["added"], entry["removed"]) == ("zepto", 2, ["Boxer"], ["Trunk"])
+
+
+def test_record_delta_skips_the_log_on_a_first_run(tmp_path):
+    log = tmp_path / "deltas.jsonl"
+    assert record_delta("zepto", CatalogueTracker([]), [{"name": "Vest"}], early_stop=False, path=str(log))["added"] == 1
+    assert not log.exists()
@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+import job_specs
+
+
+def test_default_job_keeps_the_legacy_csv():
+    spec = job_specs.make_spec("zepto")
+    assert spec == {
+        "platform": "zepto",
+        "pincode": "560012",
+        "brand": "pepe",
+        "query": "pepe",
+        "label": "Pepe Jeans",
+        "location": "pepe@560012",
+        "output_file": os.path.join(job_specs.APP_DIR, "zepto_data.csv"),
+    }
+
+
+def test_other_jobs_write_per_location_snapshots():
+    spec = job_specs.make_spec("blinkit", 110001, " Jockey ")
+    assert (spec["brand"], spec["query"], spec["label"], spec["location"]) == ("jockey", "jockey", "Jockey", "jockey@110001")
+    assert spec["output_file"] == os.path.join(job_specs.SNAPSHOT_DIR, "blinkit", "jockey@110001.csv")
+
+
+@pytest.mark.parametrize("args", [("flipkart",), ("zepto", "1100"), ("zepto", "110001", "Bad Brand!")])
+def test_make_spec_rejects_invalid_jobs(args):
+    with pytest.raises(ValueError):
+        job_specs.make_spec(*args)
+
+
+def test_load_specs_without_a_file_gives_one_default_job_per_platform(tmp_path):
+    specs = job_specs.load_specs(str(tmp_path / "missing.json"))
+    assert [s["platform"] for s in specs] == list(job_specs.PLATFORMS)
+    assert [s["platform"] for s in job_specs.load_specs(str(tmp_path / "missing.json"), ["zepto"])] == ["zepto"]
+
+
+def test_load_specs_expands_the_matrix_and_deduplicates(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({
+        "matrix": {
+            "platforms": ["blinkit", "zepto"],
+            "pincodes": ["560012", "110001"],
+            "brands": [{"brand": "pepe"}, {"brand": "jockey", "label": "Jockey"}],
+        },
+        "jobs": [{"platform": "instamart", "pincode": "400001"}, {"platform": "zepto", "pincode": "110001"}],
+    }), encoding="utf-8")
+    specs = job_specs.load_specs(str(path))
+    assert len(specs) == 2 * 2 * 2 + 1
+    assert ("instamart", "pepe@400001") in {(s["platform"], s["location"]) for s in specs}
+    only_zepto = job_specs.load_specs(str(path), platforms=["zepto"])
+    assert sorted(s["location"] for s in only_zepto) == ["jockey@110001", "jockey@560012", "pepe@110001", "pepe@560012"]
+
+
+def test_load_specs_reports_a_bad_job(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({"jobs": [{"platform": "zepto", "pincode": "12"}]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        job_specs.load_specs(str(path))
+
+
+def test_parse_location():
+    assert job_specs.parse_location("pepe@110001") == ("pepe", "110001")
+    assert job_specs.parse_location("pepe@1100") is None
+    assert job_specs.parse_location(None) is None
+
+
+def test_snapshot_locations_lists_the_default_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_specs, "SNAPSHOT_DIR", str(tmp_path))
+    os.makedirs(tmp_path / "zepto")
+    for name in ("pepe@110001.csv", "jockey@560012.csv", "notes.txt"):
+        (tmp_path / "zepto" / name).write_text("", encoding="utf-8")
+    assert job_specs.snapshot_locations("zepto") == ["pepe@560012", "jockey@560012", "pepe@110001"]
+    assert job_specs.snapshot_locations("blinkit") == ["pepe@560012"]
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import time
+
+import jobs
+
+
+def test_enqueue_returns_the_active_job(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    job, created = jobs.enqueue(["blinkit"], path=db)
+    again, created_again = jobs.enqueue(["zepto"], path=db)
+    assert created and not created_again
+    assert again["id"] == job["id"]
+    assert again["state"] == "queued"
+    assert again["progress"] == {"blinkit": {"status": "queued"}}
+
+
+def test_running_job_with_live_pid_is_deduplicated(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    jobs.update(job["id"], db, state="running", pid=os.getpid())
+    again, created = jobs.enqueue(["blinkit"], path=db)
+    assert not created and again["id"] == job["id"]
+
+
+def test_job_with_dead_pid_is_stale(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    jobs.update(job["id"], db, state="running", pid=proc.pid)
+    fresh, created = jobs.enqueue(["blinkit"], path=db)
+    assert created and fresh["id"] != job["id"]
+    stale = jobs.get(job["id"], db)
+    assert stale["state"] == "failed"
+    assert stale["error"].startswith("stale")
+
+
+def test_long_running_job_with_live_pid_is_not_stale(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    # Queued and started two hours ago, well past the old one-hour limit, and still running.
+    jobs.update(job["id"], db, state="running", pid=os.getpid(), created_at="2000-01-01T00:00:00",
+                started_at=time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - 7200)))
+    same, created = jobs.enqueue(["blinkit"], path=db)
+    assert not created and same["id"] == job["id"]
+    assert jobs.get(job["id"], db)["state"] == "running"
+
+
+def test_live_job_past_the_hard_cap_is_killed(tmp_path, monkeypatch):
+    db = str(tmp_path / "jobs.db")
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        jobs.update(job["id"], db, state="running", pid=proc.pid, started_at="2000-01-01T00:00:00")
+        monkeypatch.setattr(jobs, "JOB_MAX_SECONDS", 60)
+        fresh, created = jobs.enqueue(["blinkit"], path=db)
+        assert created and fresh["id"] != job["id"]
+        assert proc.wait(timeout=10) != 0
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_queued_job_without_pid_expires_after_grace(tmp_path, monkeypatch):
+    db = str(tmp_path / "jobs.db")
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    # Within the grace period the pid-less job is still the dedup target.
+    assert jobs.enqueue(["blinkit"], path=db)[0]["id"] == job["id"]
+    jobs.update(job["id"], db, created_at="2000-01-01T00:00:00")
+    fresh, created = jobs.enqueue(["blinkit"], path=db)
+    assert created and fresh["id"] != job["id"]
+    assert jobs.get(job["id"], db)["state"] == "failed"
+
+
+def test_finished_jobs_do_not_block_a_new_run(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    jobs.update(job["id"], db, state="succeeded", exit_code=0, finished_at=jobs._now())
+    fresh, created = jobs.enqueue(["blinkit"], path=db)
+    assert created and fresh["id"] != job["id"]
+
+
+def test_run_records_progress_and_exit_code(tmp_path, monkeypatch):
+    db = str(tmp_path / "jobs.db")
+    monkeypatch.setattr(jobs, "JOB_LOG_DIR", str(tmp_path / "logs"))
+    job, _ = jobs.enqueue(["blinkit", "zepto"], path=db)
+    script = (
+        "import json\n"
+        "print('[INFO] starting')\n"
+        "print('[PROGRESS] ' + json.dumps({'platform': 'blinkit', 'status': 'ok', 'rows': 12}))\n"
+        "print('[PROGRESS] not json')\n"
+        "raise SystemExit(3)\n"
+    )
+    jobs._run(job["id"], [sys.executable, "-c", script], str(tmp_path), job["platforms"], path=db)
+    done = jobs.get(job["id"], db)
+    assert (done["state"], done["exit_code"]) == ("failed", 3)
+    assert done["progress"] == {"blinkit": {"status": "ok", "rows": 12}, "zepto": {"status": "queued"}}
+    assert done["rows"] == 12
+    assert done["seconds"] is not None
+    with open(tmp_path / "logs" / f"{job['id']}.log", encoding="utf-8") as f:
+        assert f.read().startswith("[INFO] starting\n")
+
+
+def test_run_is_killed_at_the_hard_cap(tmp_path, monkeypatch):
+    db = str(tmp_path / "jobs.db")
+    monkeypatch.setattr(jobs, "JOB_LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setattr(jobs, "JOB_MAX_SECONDS", 1)
+    job, _ = jobs.enqueue(["blinkit"], path=db)
+    started = time.monotonic()
+    jobs._run(job["id"], [sys.executable, "-c", "import time; time.sleep(30)"], str(tmp_path), job["platforms"], path=db)
+    assert time.monotonic() - started < 10
+    done = jobs.get(job["id"], db)
+    assert done["state"] == "failed"
+    assert done["error"] == "killed at the 1s limit"
@@ -0,0 +1,175 @@
+import csv
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import os
+import threading
+
+import pytest
+
+from conftest import product
+import price_store
+
+
+def changes(db, since=""):
+    return [(c["name"], c["kind"], c["old_value"], c["new_value"]) for c in price_store.change_log(since, path=db)]
+
+
+def test_product_key_and_price_parsing():
+    assert price_store.product_key("  Pepe  Jeans\tVest ") == "pepe jeans vest"
+    assert [price_store.to_int_price(v) for v in ("1,299", "₹499", "NA", "", None)] == [1299, 499, None, None, None]
+
+
+def test_ingest_stores_run_and_prices(tmp_path):
+    db = str(tmp_path / "history.db")
+    run_id = price_store.ingest(
+        "blinkit", [product("Vest Grey", 499, 699, "28% OFF", "M"), product("Brief")],
+        scraped_at="2026-01-01T10:00:00", path=db,
+    )
+    history = price_store.price_history("blinkit", "vest  grey", days=100000, path=db)
+    assert run_id == 1
+    assert history == [{"scraped_at": "2026-01-01T10:00:00", "current_price": 499, "original_price": 699, "discount": "28% OFF", "size": "M"}]
+    assert price_store.price_history("zepto", "Vest Grey", days=100000, path=db) == []
+
+
+def test_changes_since_returns_price_moves_from_the_cursor(tmp_path):
+    db = str(tmp_path / "history.db")
+    for day, price in (("01", 499), ("02", 449), ("03", 449), ("04", 479)):
+        price_store.ingest("blinkit", [product("Vest", price)], scraped_at=f"2026-01-{day}T10:00:00", path=db)
+    moves = price_store.changes_since("2026-01-02", path=db)
+    assert [(m["scraped_at"][:10], m["previous_price"], m["current_price"]) for m in moves] == [
+        ("2026-01-02", 499, 449),
+        ("2026-01-04", 449, 479),
+    ]
+    assert price_store.changes_since("2026-01-02", platform="zepto", path=db) == []
+
+
+def test_import_csv_stamps_the_file_mtime(tmp_path):
+    db = str(tmp_path / "history.db")
+    csv_path = str(tmp_path / "zepto_data.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "current_price", "original_price", "discount", "sizes"])
+        writer.writeheader()
+        writer.writerow(product("Vest", 399))
+    os.utime(csv_path, (1767261600, 1767261600))  # 2026-01-01T10:00:00Z
+    price_store.import_csv("zepto", csv_path, path=db)
+    assert price_store.price_history("zepto", "Vest", days=100000, path=db)[0]["scraped_at"] == "2026-01-01T10:00:00"
+
+
+def test_iter_prices_streams_a_date_range_in_batches(tmp_path):
+    db = str(tmp_path / "history.db")
+    for day in ("01", "02", "03"):
+        price_store.ingest("blinkit", [product("Vest", 499), product("Brief", 299)], scraped_at=f"2026-01-{day}T10:00:00", path=db)
+    price_store.ingest("zepto", [product("Vest", 449)], scraped_at="2026-01-02T09:00:00", path=db)
+    batches = list(price_store.iter_prices(start="2026-01-02", end="2026-01-02", path=db, batch_size=2))
+    assert [len(b) for b in batches] == [2, 1]
+    assert [(r["platform"], r["name"], r["current_price"]) for b in batches for r in b] == [
+        ("zepto", "Vest", 449),
+        ("blinkit", "Vest", 499),
+        ("blinkit", "Brief", 299),
+    ]
+    assert sum(len(b) for b in price_store.iter_prices("blinkit", end="2026-01-01", path=db)) == 2
+
+
+def test_first_run_logs_no_changes(tmp_path):
+    db = str(tmp_path / "history.db")
+    price_store.ingest("blinkit", [product("Vest", 499)], scraped_at="2026-01-01T10:00:00", path=db, benchmarks={})
+    assert changes(db) == []
+
+
+def test_ingest_logs_delta_against_previous_run(tmp_path):
+    db = str(tmp_path / "history.db")
+    price_store.ingest("blinkit", [product("Vest", 499), product("Brief", 299), product("Trunk", 199)],
+                       scraped_at="2026-01-01T10:00:00", path=db, benchmarks={"vest": 450})
+    price_store.ingest("blinkit", [product("Vest", 399), product("Brief", 299, discount="10% OFF"), product("Boxer", 350)],
+                       scraped_at="2026-01-02T10:00:00", path=db, benchmarks={"vest": 450})
+    price_store.ingest("zepto", [product("Vest", 1)], scraped_at="2026-01-02T11:00:00", path=db, benchmarks={})
+    assert sorted(changes(db)) == [
+        ("Boxer", "new", None, "350"),
+        ("Brief", "discount", "NA", "10% OFF"),
+        ("Trunk", "removed", "199", None),
+        ("Vest", "benchmark", "above", "below"),
+        ("Vest", "price_down", "499", "399"),
+    ]
+
+
+def test_change_log_cursor(tmp_path):
+    db = str(tmp_path / "history.db")
+    for day, price in (("01", 499), ("02", 449), ("03", 479)):
+        price_store.ingest("blinkit", [product("Vest", price)], scraped_at=f"2026-01-{day}T10:00:00", path=db, benchmarks={})
+    logged = price_store.change_log(path=db)
+    assert [c["kind"] for c in logged] == ["price_down", "price_up"]
+    after_first = price_store.change_log(after_id=logged[0]["id"], path=db)
+    assert [(c["kind"], c["new_value"]) for c in after_first] == [("price_up", "479")]
+    assert changes(db, "2026-01-03") == [("Vest", "price_up", "449", "479")]
+    assert changes(db, "2026-01-02T10:00") == [("Vest", "price_down", "499", "449"), ("Vest", "price_up", "449", "479")]
+    assert price_store.change_log("2026-01-02", after_id=logged[-1]["id"], path=db) == []
+    assert price_store.change_log(platform="zepto", path=db) == []
+    assert len(price_store.change_log(limit=1, path=db)) == 1
+
+
+def test_since_must_be_an_iso_date_or_timestamp(tmp_path):
+    db = str(tmp_path / "history.db")
+    # A compact date is not a change id any more, nor silently compared as text.
+    for since in ("20250926", "12", "2026-13-01", "2026-01-02 10:00", "yesterday"):
+        with pytest.raises(ValueError, match="ISO date"):
+            price_store.change_log(since, path=db)
+    assert price_store.parse_since("2026-01-02T10:00:00") == "2026-01-02T10:00:00"
+
+
+def test_notify_posts_the_delta_as_json():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    server.timeout = 10
+    thread = threading.Thread(target=server.handle_request, daemon=True)
+    thread.start()
+    try:
+        delivered = price_store.notify("blinkit", "pepe@560012", 7, "2026-01-01T10:00:00", [("vest", "Vest", "price_up", 449, 479)],
+                                       url=f"http://127.0.0.1:{server.server_port}/hook")
+    finally:
+        thread.join(timeout=10)
+        server.server_close()
+    assert received == [{
+        "platform": "blinkit",
+        "location": "pepe@560012",
+        "run_id": 7,
+        "scraped_at": "2026-01-01T10:00:00",
+        "changes": [{"name": "Vest", "kind": "price_up", "old_value": "449", "new_value": "479"}],
+    }]
+    assert delivered is True
+
+
+def test_notify_reports_a_bad_url_instead_of_raising():
+    assert price_store.notify("blinkit", "pepe@560012", 7, "2026-01-01T10:00:00", [], url="not a url") is False
+    assert price_store.notify("blinkit", "pepe@560012", 7, "2026-01-01T10:00:00", [], url="http://127.0.0.1:1/hook") is False
+
+
+def test_ingest_keeps_resumed_rows_out_of_the_changes(tmp_path):
+    db = str(tmp_path / "history.db")
+    price_store.ingest("zepto", [product("Vest", 499)], scraped_at="2026-01-01T10:00:00", path=db, benchmarks={})
+    price_store.ingest("zepto", [product("Vest", 549), product("Brief", 299)], scraped_at="2026-01-02T10:00:00",
+                       path=db, benchmarks={}, resumed=["Vest"])
+    assert changes(db) == [("Brief", "new", None, "299")]
+    assert [h["current_price"] for h in price_store.price_history("zepto", "Vest", days=3650, path=db)] == [499, 549]
+
+
+def test_locations_are_diffed_separately(tmp_path):
+    db = str(tmp_path / "history.db")
+    price_store.ingest("zepto", [product("Vest", 499)], scraped_at="2026-01-01T10:00:00", path=db, benchmarks={})
+    price_store.ingest("zepto", [product("Vest", 599)], scraped_at="2026-01-02T10:00:00", path=db, benchmarks={},
+                       location="pepe@110001")
+    assert changes(db) == []
+    price_store.ingest("zepto", [product("Vest", 549)], scraped_at="2026-01-03T10:00:00", path=db, benchmarks={},
+                       location="pepe@110001")
+    assert [c["location"] for c in price_store.change_log(path=db)] == ["pepe@110001"]
+    assert price_store.change_log(path=db, location="pepe@560012") == []
+    assert price_store.price_history("zepto", "Vest", days=100000, path=db, location="pepe@110001")[-1]["current_price"] == 549
@@ -0,0 +1,55 @@
+from product_matching import match_platforms, name_tokens, normalise_size
+
+
+def item(name, price=100, sizes="M"):
+    return {"name": name, "current_price": str(price), "sizes": sizes}
+
+
+def offers(groups):
+    return [{platform: p["name"] for platform, p in g["offers"].items()} for g in groups]
+
+
+def test_name_tokens_normalise_aliases_and_stopwords():
+    assert name_tokens("Pepe Jeans Men's Grey T-Shirt (Pack of 2)") == ["men", "gray", "tee", "pack", "2"]
+
+
+def test_normalise_size():
+    assert [normalise_size(s) for s in ("Size: M", "1 Medium", "XL", "2 pcs", "NA", "")] == ["m", "m", "xl", "", "", ""]
+
+
+def test_equivalent_products_are_grouped_with_the_cheapest_marked():
+    groups = match_platforms({
+        "blinkit": [item("Pepe Jeans Innerfashion Men's Vest (Grey)", 499), item("Pepe Jeans Women Brief Pink", 299)],
+        "zepto": [item("Pepe Jeans Grey Men Vest", 449)],
+        "instamart": [],
+    })
+    assert offers(groups) == [
+        {"blinkit": "Pepe Jeans Innerfashion Men's Vest (Grey)", "zepto": "Pepe Jeans Grey Men Vest"},
+        {"blinkit": "Pepe Jeans Women Brief Pink"},
+    ]
+    assert groups[0]["cheapest"] == "zepto"
+    assert groups[0]["spread"] == 50.0
+    assert groups[1]["cheapest"] == "" and groups[1]["spread"] == 0.0
+
+
+def test_different_sizes_are_not_matched():
+    groups = match_platforms({
+        "blinkit": [item("Men Vest Grey", sizes="Size M")],
+        "zepto": [item("Men Vest Grey", sizes="XL")],
+    })
+    assert len(groups) == 2
+
+
+def test_same_platform_listing_pulled_in_by_a_chain_is_kept_as_unmatched():
+    catalogues = {
+        "blinkit": [item("Men Vest Grey Cotton"), item("Men Vest Grey Round Neck")],
+        "zepto": [item("Men Vest Grey Cotton Round")],
+        "instamart": [item("Men Vest Grey Round Neck Combo")],
+    }
+    groups = match_platforms(catalogues)
+    assert offers(groups) == [
+        {"blinkit": "Men Vest Grey Cotton", "zepto": "Men Vest Grey Cotton Round", "instamart": "Men Vest Grey Round Neck Combo"},
+        {"blinkit": "Men Vest Grey Round Neck"},
+    ]
+    # Every input product is listed exactly once.
+    assert sum(len(g["offers"]) for g in groups) == sum(len(c) for c in catalogues.values())
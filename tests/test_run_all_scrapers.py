@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+
+import job_specs
+import run_all_scrapers
+from run_all_scrapers import PlatformGate, interleave
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(run_all_scrapers.random, "uniform", lambda a, b: 1.0)
+
+
+def test_gate_spaces_out_starts_on_one_platform():
+    async def main():
+        gate = PlatformGate(concurrency=2, min_interval=0.2)
+        started = time.monotonic()
+        starts = []
+
+        async def job():
+            async with gate:
+                await gate.wait_turn()
+                starts.append(time.monotonic() - started)
+
+        await asyncio.gather(job(), job(), job())
+        return starts
+
+    starts = asyncio.run(main())
+    assert starts[0] < 0.1
+    assert [round(b - a, 1) for a, b in zip(starts, starts[1:])] == [0.2, 0.2]
+
+
+def test_gap_is_measured_from_when_jobs_get_a_pool_slot():
+    async def main():
+        gate = PlatformGate(concurrency=2, min_interval=0.2)
+        pool = asyncio.Semaphore(1)
+        started = time.monotonic()
+        starts = []
+
+        async def other_platform():
+            async with pool:
+                await asyncio.sleep(0.3)
+
+        async def job():
+            async with gate, pool:
+                await gate.wait_turn()
+                starts.append(time.monotonic() - started)
+
+        blocker = asyncio.ensure_future(other_platform())
+        await asyncio.sleep(0)
+        await asyncio.gather(job(), job(), blocker)
+        return starts
+
+    starts = asyncio.run(main())
+    # Waiting behind another platform's job does not use up the gap.
+    assert round(starts[0], 1) == 0.3
+    assert round(starts[1] - starts[0], 1) == 0.2
+
+
+def test_gate_caps_concurrent_jobs():
+    async def main():
+        gate = PlatformGate(concurrency=2, min_interval=0)
+        running, peak = 0, 0
+
+        async def job():
+            nonlocal running, peak
+            async with gate:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(main()) == 2
+
+
+def test_interleave_round_robins_platforms():
+    specs = [job_specs.make_spec(p, pin) for p in ("zepto", "blinkit") for pin in ("560012", "110001", "400001")]
+    specs.append(job_specs.make_spec("instamart"))
+    order = [(s["platform"], s["pincode"]) for s in interleave(specs)]
+    assert order[:4] == [("zepto", "560012"), ("blinkit", "560012"), ("instamart", "560012"), ("zepto", "110001")]
+    assert len(order) == len(specs)
+
+
+def run_job(monkeypatch, tmp_path, scrape, timeout=5):
+    monkeypatch.setitem(run_all_scrapers.SCRAPERS, "zepto", scrape)
+    monkeypatch.setattr(run_all_scrapers, "PLATFORM_TIMEOUT", timeout)
+    spec = dict(job_specs.make_spec("zepto", "110001"), output_file=str(tmp_path / "out" / "zepto.csv"))
+    return asyncio.run(run_all_scrapers.run_job(None, spec))
+
+
+def test_run_job_reports_rows_and_progress(monkeypatch, tmp_path, capsys):
+    async def scrape(browser, output_file, pincode, brand, metrics):
+        assert (pincode, brand["brand"]) == ("110001", "pepe")
+        metrics.rounds = 3
+        return {"rows": 12}
+
+    result = run_job(monkeypatch, tmp_path, scrape)
+    assert (result["platform"], result["status"], result["rows"], result["ok"]) == ("zepto:pepe@110001", "ok", 12, True)
+    assert (tmp_path / "out").is_dir()
+    assert (result["metrics"]["status"], result["metrics"]["rows"], result["metrics"]["rounds"]) == ("ok", 12, 3)
+    assert '[PROGRESS] {"platform": "zepto:pepe@110001", "status": "ok", "rows": 12' in capsys.readouterr().out
+
+
+def test_run_job_contains_failures_and_timeouts(monkeypatch, tmp_path):
+    async def broken(*args):
+        raise RuntimeError("boom")
+
+    async def hung(*args):
+        await asyncio.sleep(10)
+
+    failed = run_job(monkeypatch, tmp_path, broken)
+    assert (failed["status"], failed["error"], failed["ok"]) == ("error", "boom", False)
+    timed_out = run_job(monkeypatch, tmp_path, hung, timeout=0.05)
+    assert timed_out["status"] == "timeout"
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+
+import scrape_metrics
+
+
+def record(platform="zepto", location="560001", **fields):
+    base = {
+        "platform": platform, "location": location, "finished_at": "2026-01-01T10:00:00", "status": "ok",
+        "error": "", "rows": 10, "seconds": 5.0, "phases": {}, "rounds": 2, "dom_round_trips": 4,
+        "responses": 3, "bytes_received": 100, "products_per_second": 2.0,
+    }
+    return {**base, **fields}
+
+
+def test_phases_accumulate():
+    metrics = scrape_metrics.RunMetrics("zepto", "560001")
+    metrics.add_phase("scroll", 1.5)
+    metrics.add_phase("scroll", 0.5)
+    with metrics.phase("extract"):
+        pass
+    with metrics.phase("extract"):
+        pass
+
+    assert metrics.phases["scroll"] == 2.0
+    assert 0 <= metrics.phases["extract"] < 1
+
+
+def test_phase_is_timed_when_the_block_raises():
+    metrics = scrape_metrics.RunMetrics("zepto", "560001")
+    try:
+        with metrics.phase("navigate"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert "navigate" in metrics.phases
+
+
+def test_record_carries_counters_and_throughput():
+    metrics = scrape_metrics.RunMetrics("blinkit", "110001")
+    metrics.started -= 4
+    metrics.add_phase("scroll", 1.23456)
+    metrics.rounds, metrics.dom_round_trips = 3, 7
+
+    out = metrics.record("ok", 20)
+
+    assert (out["platform"], out["location"], out["status"], out["rows"]) == ("blinkit", "110001", "ok", 20)
+    assert out["phases"] == {"scroll": 1.235}
+    assert (out["rounds"], out["dom_round_trips"]) == (3, 7)
+    assert 4 <= out["seconds"] < 5
+    assert 4 < out["products_per_second"] <= 5
+
+
+def test_emit_appends_and_latest_runs_keeps_the_newest_per_job(tmp_path):
+    log = str(tmp_path / "metrics.jsonl")
+    scrape_metrics.emit(record(rows=1), path=log)
+    scrape_metrics.emit(record(platform="blinkit", rows=2), path=log)
+    scrape_metrics.emit(record(rows=3), path=log)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+
+    latest = {(r["platform"], r["location"]): r["rows"] for r in scrape_metrics.latest_runs(log)}
+
+    assert latest == {("zepto", "560001"): 3, ("blinkit", "560001"): 2}
+
+
+def test_latest_runs_reads_only_the_tail(tmp_path, monkeypatch):
+    log = tmp_path / "metrics.jsonl"
+    lines = [json.dumps(record(location=str(i))) for i in range(50)]
+    log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(scrape_metrics, "TAIL_BYTES", len(lines[-1]) * 3 + 10)
+
+    locations = [r["location"] for r in scrape_metrics.latest_runs(str(log))]
+
+    assert locations == ["47", "48", "49"]
+
+
+def test_latest_runs_without_a_log(tmp_path):
+    assert scrape_metrics.latest_runs(str(tmp_path / "missing.jsonl")) == []
+
+
+def test_prometheus_text():
+    text = scrape_metrics.prometheus_text([
+        record(phases={"scroll": 1.5}),
+        record(platform="blinkit", location='a"b', status="timeout", finished_at="bad"),
+    ])
+    lines = text.splitlines()
+
+    assert "# TYPE scraper_rows gauge" in lines
+    assert 'scraper_phase_seconds{platform="zepto",location="560001",phase="scroll"} 1.5' in lines
+    assert 'scraper_rows{platform="zepto",location="560001"} 10' in lines
+    assert 'scraper_run_success{platform="zepto",location="560001"} 1' in lines
+    assert 'scraper_run_success{platform="blinkit",location="a\\"b"} 0' in lines
+    assert 'scraper_last_run_timestamp_seconds{platform="zepto",location="560001"} 1767261600' in lines
+    assert not any(line.startswith("scraper_last_run_timestamp_seconds{platform=\"blinkit\"") for line in lines)
+    assert text.endswith("\n")
+
+
+class FakeRequest:
+    def __init__(self, sizes):
+        self._sizes = sizes
+
+    async def sizes(self):
+        await asyncio.sleep(0)
+        if isinstance(self._sizes, Exception):
+            raise self._sizes
+        return self._sizes
+
+
+class FakeResponse:
+    def __init__(self, sizes):
+        self.request = FakeRequest(sizes)
+        self.headers = {}  # chunked: no Content-Length
+
+
+class FakeContext:
+    def __init__(self):
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    def emit(self, event, arg):
+        for handler in list(self.listeners.get(event, [])):
+            handler(arg)
+
+
+def sizes(headers, body):
+    return {"requestBodySize": 10, "requestHeadersSize": 300, "responseBodySize": body, "responseHeadersSize": headers}
+
+
+def test_bytes_are_the_transferred_header_and_body_sizes():
+    async def main():
+        metrics = scrape_metrics.RunMetrics("zepto", "560001")
+        context = FakeContext()
+        metrics.watch(context)
+        context.emit("response", FakeResponse(sizes(200, 5000)))
+        context.emit("response", FakeResponse(sizes(150, -1)))  # body size unknown
+        context.emit("response", FakeResponse(RuntimeError("Target page, context or browser has been closed")))
+        metrics.unwatch(context)
+        context.emit("response", FakeResponse(sizes(100, 100)))
+        await metrics.drain()
+        return metrics
+
+    metrics = asyncio.run(main())
+    assert (metrics.responses, metrics.bytes_received) == (3, 5350)
+    assert metrics.record("ok", 1)["bytes_received"] == 5350
+
+
+def test_drain_gives_up_on_a_response_that_never_finishes():
+    class Streaming:
+        class request:
+            @staticmethod
+            async def sizes():
+                await asyncio.sleep(60)
+
+    async def main():
+        metrics = scrape_metrics.RunMetrics("zepto", "560001")
+        metrics._on_response(Streaming())
+        started = time.monotonic()
+        await metrics.drain(timeout=0.05)
+        return metrics, time.monotonic() - started
+
+    metrics, waited = asyncio.run(main())
+    assert waited < 1
+    assert (metrics.responses, metrics.bytes_received) == (1, 0)
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+import job_specs
+import run_all_scrapers
+import scraper_daemon
+
+
+class FakeSession:
+    def __init__(self, runs=0, heap_mb=10.0):
+        self.runs = runs
+        self.heap_mb = heap_mb
+        self.closed = False
+
+    async def memory_mb(self):
+        return self.heap_mb
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+
+def slot_with(session):
+    slot = scraper_daemon.WarmSlot(job_specs.make_spec("zepto"))
+    slot.session = session
+    return slot
+
+
+@pytest.fixture(autouse=True)
+def recycle_limits(monkeypatch):
+    monkeypatch.setattr(scraper_daemon, "RECYCLE_RUNS", 3)
+    monkeypatch.setattr(scraper_daemon, "RECYCLE_MB", 100.0)
+
+
+def test_recycle_keeps_a_fresh_session():
+    session = FakeSession(runs=2, heap_mb=99.0)
+    slot = slot_with(session)
+    assert asyncio.run(slot.recycle_if_due()) is False
+    assert slot.session is session and not session.closed
+
+
+def test_recycle_after_enough_runs():
+    session = FakeSession(runs=3)
+    slot = slot_with(session)
+    assert asyncio.run(slot.recycle_if_due()) is True
+    assert slot.session is None and session.closed
+
+
+def test_recycle_past_the_heap_limit():
+    session = FakeSession(runs=0, heap_mb=150.0)
+    slot = slot_with(session)
+    assert asyncio.run(slot.recycle_if_due()) is True
+    assert session.closed
+
+
+def test_recycle_without_a_session():
+    assert asyncio.run(slot_with(None).recycle_if_due()) is False
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Replace the real job, summary and compaction with recorders."""
+    calls = []
+
+    async def run_job(browser, spec, launch_seconds=0.0, scrape=None):
+        calls.append(spec["platform"])
+        if spec["pincode"] == "999999" and calls.count(spec["platform"]) == 1:
+            raise RuntimeError("boom")
+        return {"platform": spec["platform"]}
+
+    monkeypatch.setattr(run_all_scrapers, "run_job", run_job)
+    monkeypatch.setattr(run_all_scrapers, "print_summary", lambda result: None)
+    monkeypatch.setattr(run_all_scrapers, "POLITENESS_SECONDS", 0.0)
+    return calls
+
+
+def daemon_for(specs, **kwargs):
+    daemon = scraper_daemon.ScraperDaemon(specs, **kwargs)
+    daemon.browser = FakeBrowser()
+    daemon.compacted = []
+
+    async def compact(platform):
+        daemon.compacted.append(platform)
+
+    daemon.compact = compact
+    return daemon
+
+
+def test_once_runs_every_job_a_single_time(runs):
+    async def main():
+        daemon = daemon_for([job_specs.make_spec("zepto"), job_specs.make_spec("blinkit")], once=True)
+        await asyncio.gather(*(daemon.run_slot(slot) for slot in daemon.slots))
+        return daemon
+
+    daemon = asyncio.run(main())
+    assert sorted(runs) == ["blinkit", "zepto"]
+    assert sorted(daemon.compacted) == ["blinkit", "zepto"]
+
+
+def test_jobs_repeat_on_a_jittered_interval_until_stopped(runs, monkeypatch):
+    waits = []
+    monkeypatch.setattr(scraper_daemon, "jittered", lambda seconds: waits.append(seconds) or 0.01)
+
+    async def main():
+        daemon = daemon_for([job_specs.make_spec("zepto")], interval=3600)
+        recycled = []
+
+        async def recycle_if_due():
+            recycled.append(1)
+            if len(recycled) == 3:
+                daemon.stop()
+            return False
+
+        daemon.slots[0].recycle_if_due = recycle_if_due
+        await asyncio.wait_for(daemon.run_slot(daemon.slots[0]), timeout=5)
+        return recycled
+
+    recycled = asyncio.run(main())
+    assert runs == ["zepto"] * 3
+    assert len(recycled) == 3
+    assert waits == [3600, 3600, 3600]
+
+
+def test_a_failed_run_is_retried_on_the_next_interval(runs, monkeypatch):
+    monkeypatch.setattr(scraper_daemon, "jittered", lambda seconds: 0.01)
+
+    async def main():
+        daemon = daemon_for([job_specs.make_spec("zepto", pincode="999999")])
+
+        async def compact(platform):
+            daemon.stop()
+
+        daemon.compact = compact
+        await asyncio.wait_for(daemon.run_slot(daemon.slots[0]), timeout=5)
+
+    asyncio.run(main())
+    assert runs == ["zepto", "zepto"]
+
+
+def test_warm_slot_parks_the_session_on_the_shared_browser(runs):
+    async def main():
+        daemon = daemon_for([job_specs.make_spec("zepto")])
+        warmed = []
+
+        async def warm(browser):
+            warmed.append(browser)
+            return True
+
+        daemon.slots[0].warm = warm
+        await daemon.warm_slot(daemon.slots[0])
+        return daemon, warmed
+
+    daemon, warmed = asyncio.run(main())
+    assert warmed == [daemon.browser]
+    assert daemon.gates["zepto"].last_start is not None
+    assert runs == []
@@ -0,0 +1,113 @@
+import asyncio
+
+from scraper_engine import PlatformAdapter
+import scraper_engine.adapter as adapter_module
+from scraper_engine.scroller import ADAPTIVE_SCROLL_JS, ScrollProgress
+
+
+class Adapter(PlatformAdapter):
+    platform = "test"
+    card_selector = ".card"
+    max_stable_rounds = 3
+    max_rounds = 10
+
+
+class FakePage:
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self.calls = []
+
+    async def evaluate(self, script, arg):
+        self.calls.append((script, arg))
+        return self.geometry
+
+
+def at_end(progress, wait="idle"):
+    progress.geometry = {"atEnd": True, "scrollHeight": 4000}
+    progress.last_wait = wait
+
+
+def test_new_rows_count_as_progress_when_the_card_count_stalls():
+    progress = ScrollProgress()
+    progress.observe(48, 48)
+    progress.observe(48, 12)  # virtualised grid: same window size, new products
+    assert (progress.rounds, progress.stable_rounds, progress.last_count) == (2, 0, 48)
+    progress.observe(48, 0)
+    progress.observe(40, 0)
+    assert (progress.stable_rounds, progress.last_count) == (2, 48)
+    progress.observe(60, 0)
+    assert (progress.stable_rounds, progress.last_count) == (0, 60)
+
+
+def test_list_end_needs_the_bottom_an_idle_wait_and_nothing_new():
+    progress = ScrollProgress()
+    progress.observe(20, 20)
+    at_end(progress)
+    assert not progress.reached_end()  # the last round still found products
+
+    progress.observe(20, 0)
+    assert progress.reached_end()
+
+    at_end(progress, wait="cards")
+    assert not progress.reached_end()
+    progress.geometry = {"atEnd": False}
+    progress.last_wait = "idle"
+    assert not progress.reached_end()
+
+
+def test_list_end_without_geometry():
+    progress = ScrollProgress()
+    progress.observe(0, 0)
+    progress.last_wait = "idle"
+    assert not progress.reached_end()
+
+
+def test_finished_falls_back_to_stable_and_max_rounds():
+    adapter = Adapter()
+    progress = ScrollProgress()
+    progress.observe(10, 10)
+    assert not adapter.finished(progress)
+    for _ in range(3):
+        progress.observe(10, 0)
+    assert adapter.finished(progress)
+
+    progress = ScrollProgress()
+    for i in range(10):
+        progress.observe(i + 1, 1)
+    assert progress.stable_rounds == 0
+    assert adapter.finished(progress)
+
+
+def test_finished_at_the_list_end():
+    adapter = Adapter()
+    progress = ScrollProgress()
+    progress.observe(10, 10)
+    progress.observe(10, 0)
+    at_end(progress)
+    assert adapter.finished(progress)
+
+
+def test_scroll_stores_the_measured_geometry():
+    adapter = Adapter()
+    progress = ScrollProgress()
+    geometry = {"step": 900, "scrollHeight": 4000, "atEnd": False}
+    page = FakePage(geometry)
+
+    assert asyncio.run(adapter.scroll(page, progress)) == 1
+    assert progress.geometry == geometry
+    assert page.calls == [(ADAPTIVE_SCROLL_JS, {"selector": ".card"})]
+
+
+def test_scroll_with_load_more_counts_the_extra_round_trip(monkeypatch):
+    clicked = []
+
+    async def click_load_more(page):
+        clicked.append(page)
+
+    monkeypatch.setattr(adapter_module, "click_load_more", click_load_more)
+    adapter = Adapter()
+    adapter.click_load_more = True
+    page = FakePage({"atEnd": False})
+
+    assert asyncio.run(adapter.scroll(page, ScrollProgress())) == 2
+    assert clicked == [page]
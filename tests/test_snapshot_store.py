@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import product
+from job_specs import DEFAULT_LOCATION
+import price_store
+import snapshot_store
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return str(tmp_path / "history.db"), str(tmp_path / "store")
+
+
+def ingest(db, platform, rows, scraped_at, **kwargs):
+    return price_store.ingest(platform, rows, scraped_at=scraped_at, path=db, benchmarks={}, **kwargs)
+
+
+def test_compact_writes_one_partition_per_platform_and_day(stores):
+    db, store = stores
+    ingest(db, "blinkit", [product("Vest", 499), product("Brief", 299)], "2026-01-01T10:00:00")
+    ingest(db, "blinkit", [product("Vest", 449)], "2026-01-01T11:00:00")
+    ingest(db, "zepto", [product("Vest", 479)], "2026-01-02T10:00:00")
+    assert snapshot_store.compact(path=db, store_dir=store) == {"partitions": 2, "rows": 4}
+    partition = snapshot_store.partition_path("blinkit", "2026-01-01", store)
+    assert snapshot_store.last_run_id(partition) == 2
+    assert snapshot_store.read_table(partition).num_rows == 3
+
+
+def test_compact_only_rewrites_days_with_new_runs(stores):
+    db, store = stores
+    ingest(db, "blinkit", [product("Vest", 499)], "2026-01-01T10:00:00")
+    ingest(db, "blinkit", [product("Vest", 449)], "2026-01-02T10:00:00")
+    snapshot_store.compact(path=db, store_dir=store)
+    assert snapshot_store.compact(path=db, store_dir=store) == {"partitions": 0, "rows": 0}
+    ingest(db, "blinkit", [product("Vest", 399), product("Brief", 299)], "2026-01-02T12:00:00")
+    assert snapshot_store.compact(path=db, store_dir=store) == {"partitions": 1, "rows": 3}
+    assert snapshot_store.compact(path=db, store_dir=store, full=True) == {"partitions": 2, "rows": 4}
+
+
+def test_latest_by_location_returns_each_locations_newest_run(stores):
+    db, store = stores
+    ingest(db, "blinkit", [product("Vest", 499, 699, "28% OFF", "M")], "2026-01-01T09:00:00")
+    ingest(db, "blinkit", [product("Vest", 449), product("Brief")], "2026-01-01T10:00:00")
+    ingest(db, "blinkit", [product("Trunk", 199)], "2026-01-01T11:00:00", location="pepe@110001")
+    snapshot_store.compact(path=db, store_dir=store)
+    latest = snapshot_store.latest_by_location(snapshot_store.partition_path("blinkit", "2026-01-01", store))
+    default = latest[DEFAULT_LOCATION]
+    assert default["scraped_at"] == datetime(2026, 1, 1, 10, 0, 0)
+    # Missing values come back as the CSVs' "NA", whatever the column type.
+    assert default["products"] == [product("Vest", 449), product("Brief")]
+    assert [p["name"] for p in latest["pepe@110001"]["products"]] == ["Trunk"]
+
+
+def test_empty_discount_and_size_come_back_as_na(stores):
+    db, store = stores
+    ingest(db, "zepto", [product("Vest", 449, 699, "", "")], "2026-01-01T10:00:00")
+    snapshot_store.compact(path=db, store_dir=store)
+    latest = snapshot_store.latest_by_location(snapshot_store.partition_path("zepto", "2026-01-01", store))
+    assert latest[DEFAULT_LOCATION]["products"] == [product("Vest", 449, 699)]
+
+
+def test_iter_history_reads_compacted_days_and_falls_back_to_sqlite(stores):
+    db, store = stores
+    ingest(db, "blinkit", [product("Vest", 499)], "2026-01-01T10:00:00")
+    snapshot_store.compact(path=db, store_dir=store)
+    ingest(db, "blinkit", [product("Vest", 449)], "2026-01-02T10:00:00")
+    rows = [r for batch in snapshot_store.iter_history("blinkit", "2026-01-01", "2026-01-02", path=db, store_dir=store) for r in batch]
+    assert [(r["scraped_at"], r["current_price"]) for r in rows] == [
+        ("2026-01-01T10:00:00", 499),
+        ("2026-01-02T10:00:00", 449),
+    ]
@@ -1,179 +1,153 @@
-from playwright.sync_api import sync_playwright, TimeoutError
-import csv
-import re
-import time
-
-def clean_price(price_str):
-    """Remove currency symbols and commas, return as number or NA."""
-    if not price_str or price_str == "NA":
-        return "NA"
-    price = re.sub(r"[^\d]", "", price_str)
-    return price if price else "NA"
-
-def scrape_zepto_pepe(output_file="zepto_data.csv"):
-    url = "https://www.zeptonow.com/"
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(
-            viewport={"width": 1280, "height": 800},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
+from playwright.async_api import TimeoutError
+import asyncio
+
+from api_capture import first, price_value, text_of
+from job_specs import DEFAULT_PINCODE
+from scraper_engine import PlatformAdapter, Product, run_standalone, scrape
+
+HOME_URL = "https://www.zeptonow.com/"
+PINCODE = DEFAULT_PINCODE
+
+# In-page extractor: card count plus every unseen card whose name starts with
+# ``prefix`` (case-insensitive), returned as plain JSON.
+EXTRACT_CARDS_JS = """
+({ seen, extract, prefix }) => {
+  const cards = document.querySelectorAll("div.c5SZXs.ccdFPa");
+  const rows = [];
+  const text = (card, sel) => {
+    const el = card.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+  };
+  if (extract) {
+    const skip = new Set(seen);
+    for (const card of cards) {
+      const name = text(card, 'div[data-slot-id="ProductName"] span');
+      if (!name || skip.has(name) || !name.toLowerCase().startsWith(prefix)) continue;
+      skip.add(name);
+      rows.push({
+        name,
+        sizes: text(card, 'div[data-slot-id="PackSize"] span'),
+        current_price: text(card, 'div[data-slot-id="Price"] p:first-child'),
+        original_price: text(card, 'div[data-slot-id="Price"] p:last-child'),
+        discount: text(card, 'div.c5aJJW span:last-child'),
+      });
+    }
+  }
+  return { count: cards.length, rows };
+}
+"""
+
+
+class ZeptoAdapter(PlatformAdapter):
+    platform = "zepto"
+    default_output = "zepto_data.csv"
+    home_url = HOME_URL
+    # Search and store-product endpoints behind the brand catalogue grid.
+    api_url_fragments = ("/api/v3/search", "/api/v1/search", "/store-products", "/user-search", "/brand")
+    # The address modal a session without a saved location falls back to.
+    location_prompt_selector = "input[placeholder='Search a new address']"
+    card_selector = "div.c5SZXs.ccdFPa"
+    extract_js = EXTRACT_CARDS_JS
+    click_load_more = True
+    context_options = {
+        "viewport": {"width": 1280, "height": 800},
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+    }
+    max_stable_rounds = 6
+    max_rounds = 120
+
+    def matches(self, name, query):
+        return name.lower().startswith(query)
+
+    def parse_api_item(self, item):
+        """Map one product entry of a Zepto search/catalogue payload to a Product.
+
+        Zepto reports prices in paise, so they are scaled to rupees to match the DOM.
+        """
+        if "discountedSellingPrice" not in item or not isinstance(item.get("product"), dict):
+            return None
+        name = text_of(first(item, "product.name", "productVariant.name"))
+        if not isinstance(name, str):
+            return None
+        percent = first(item, "discountPercent", "productVariant.discountPercent")
+        unit = first(item, "productVariant.formattedPacksize", "productVariant.packsize", "productVariant.unitOfMeasure")
+        return Product(
+            name,
+            price_value(item.get("discountedSellingPrice"), 100),
+            price_value(first(item, "mrp", "productVariant.mrp"), 100),
+            f"{percent}% Off" if percent else "NA",
+            str(unit) if unit else "NA",
         )
 
-        print("Opening Zepto homepage...")
-        page.goto(url, wait_until="networkidle")
-        time.sleep(2)
+    async def set_location(self, page, pincode):
+        """Open the homepage and pick the delivery address; True if it was confirmed."""
+        self.log("Opening Zepto homepage...")
+        await page.goto(HOME_URL, wait_until="networkidle")
+        await asyncio.sleep(2)
 
-        # Step 1: Select location
-        print("Selecting location...")
+        self.log("Selecting location...")
         try:
-            page.wait_for_selector("button[aria-label='Select Location']", timeout=60000, state="visible")
-            page.click("button[aria-label='Select Location']")
-            time.sleep(2)
-            page.wait_for_selector("input[placeholder='Search a new address']", timeout=30000, state="visible")
-            page.fill("input[placeholder='Search a new address']", "560012")
-            time.sleep(2)
-            page.click("div.ck03O3 div.c4ZmYS")
-            time.sleep(2)
-            page.click("button[data-testid='location-confirm-btn']")
-            print("Location set to 560012")
-            time.sleep(2)
+            await page.wait_for_selector("button[aria-label='Select Location']", timeout=60000, state="visible")
+            await page.click("button[aria-label='Select Location']")
+            await asyncio.sleep(2)
+            await page.wait_for_selector("input[placeholder='Search a new address']", timeout=30000, state="visible")
+            await page.fill("input[placeholder='Search a new address']", pincode)
+            await asyncio.sleep(2)
+            await page.click("div.ck03O3 div.c4ZmYS")
+            await asyncio.sleep(2)
+            await page.click("button[data-testid='location-confirm-btn']")
+            self.log(f"Location set to {pincode}")
+            await asyncio.sleep(2)
+            return True
         except TimeoutError:
-            print("Location selection failed or timed out. Proceeding anyway...")
+            self.log("Location selection failed or timed out. Proceeding anyway...")
+            return False
 
-        # Step 2: Search "pepe"
-        print("Searching for 'Pepe Jeans'...")
+    async def open_catalogue(self, page, brand):
+        """Search for the brand and follow the first product to its catalogue; True on success."""
+        label = brand["label"]
+        self.log(f"Searching for '{label}'...")
         try:
-            page.wait_for_selector("span [data-testid='searchBar']", timeout=30000)
-            page.click("span [data-testid='searchBar']")
-            time.sleep(2)
-            page.wait_for_selector("input[placeholder='Search for over 5000 products']", timeout=30000)
-            page.fill("input[placeholder='Search for over 5000 products']", "pepe")
-            time.sleep(2)
-            page.click("li[id^='pepe jeans']")
-            time.sleep(2)
-            print("Search executed")
+            await page.wait_for_selector("span [data-testid='searchBar']", timeout=30000)
+            await page.click("span [data-testid='searchBar']")
+            await asyncio.sleep(2)
+            await page.wait_for_selector("input[placeholder='Search for over 5000 products']", timeout=30000)
+            await page.fill("input[placeholder='Search for over 5000 products']", brand["query"])
+            await asyncio.sleep(2)
+            await page.click(f"li[id^='{label.lower()}']")
+            await asyncio.sleep(2)
+            self.log("Search executed")
         except TimeoutError:
-            print("Search bar interaction failed.")
+            self.log("Search bar interaction failed.")
 
-        # Step 3: Open first product and navigate to brand catalogue
-        print("Opening first Pepe Jeans product...")
+        self.log(f"Opening first {label} product...")
         try:
-            page.wait_for_selector("img[alt^='Pepe Jeans']", timeout=30000)
-            page.click("img[alt^='Pepe Jeans']")
-            time.sleep(2)
-
-            print("Navigating to Pepe Jeans catalogue page...")
-            page.wait_for_selector("p.font-medium", timeout=30000)
-            page.locator("p.font-medium", has_text="Pepe Jeans").click()
-            time.sleep(2)
-            print("Navigated to Pepe Jeans catalogue page")
+            await page.wait_for_selector(f"img[alt^='{label}']", timeout=30000)
+            await page.click(f"img[alt^='{label}']")
+            await asyncio.sleep(2)
+
+            self.log(f"Navigating to {label} catalogue page...")
+            await page.wait_for_selector("p.font-medium", timeout=30000)
+            await page.locator("p.font-medium", has_text=label).click()
+            await asyncio.sleep(2)
+            self.log(f"Navigated to {label} catalogue page")
+            return True
         except TimeoutError:
-            print("Failed to open product/brand page.")
-
-        # Step 4: Scroll and collect products
-        print("Scrolling to load all products...")
-        collected = {}
-        last_card_count = 0
-        stable_rounds = 0
-        max_stable_rounds = 6
-        total_rounds = 0
-        max_total_rounds = 120
-
-        while total_rounds < max_total_rounds:
-            total_rounds += 1
-            info = page.evaluate(
-                """
-(() => {
-  const containerCandidates = [
-    document.querySelector('div.c5SZXs.ccdFPa')?.parentElement,
-    document.querySelector("div[aria-label='product-grid']"),
-    document.querySelector("div[data-test-id='product-grid']"),
-    document.querySelector('main'),
-    document.scrollingElement || document.documentElement || document.body,
-  ].filter(Boolean);
-  const el = containerCandidates[0];
-  if (el) {
-    const delta = Math.floor((el.clientHeight || window.innerHeight || 800) * 0.9);
-    const nextTop = Math.min((el.scrollTop || 0) + delta, el.scrollHeight || 0);
-    el.scrollTop = nextTop;
-    return { sh: el.scrollHeight || 0, st: el.scrollTop || 0, ch: el.clientHeight || 0 };
-  }
-  return { sh: 0, st: 0, ch: 0 };
-})()
-                """
-            )
-            time.sleep(0.8)
-
-            for sel in [
-                "button:has-text('Show more')",
-                "button:has-text('Load more')",
-                "button:has-text('See more')",
-                "[data-test-id='load-more']",
-            ]:
-                try:
-                    btn = page.query_selector(sel)
-                    if btn:
-                        btn.click()
-                        time.sleep(0.4)
-                except Exception:
-                    pass
-
-            cards = page.query_selector_all("div.c5SZXs.ccdFPa")
-            card_count = len(cards)
-            print(f"Scroll round {total_rounds}: cards visible = {card_count}, sh={info.get('sh')}, st={info.get('st')}")
-
-            if cards:
-                try:
-                    page.evaluate("el => el.scrollIntoView({behavior: 'instant', block: 'end'})", cards[-1])
-                except Exception:
-                    pass
-
-            if card_count > last_card_count:
-                stable_rounds = 0
-                last_card_count = card_count
-            else:
-                stable_rounds += 1
-
-            if stable_rounds >= max_stable_rounds:
-                print("No new products appearing after several rounds.")
-                break
-
-        # Step 5: Collect product info
-        print("Collecting product data...")
-        cards = page.query_selector_all("div.c5SZXs.ccdFPa")
-        for card in cards:
-            try:
-                name = card.query_selector('div[data-slot-id="ProductName"] span').inner_text().strip() if card.query_selector('div[data-slot-id="ProductName"] span') else "NA"
-                if not name.startswith("Pepe"):
-                    continue
-
-                unit = card.query_selector('div[data-slot-id="PackSize"] span').inner_text().strip() if card.query_selector('div[data-slot-id="PackSize"] span') else "1 unit"
-                current_price = clean_price(card.query_selector('div[data-slot-id="Price"] p:first-child').inner_text() if card.query_selector('div[data-slot-id="Price"] p:first-child') else "NA")
-                original_price = clean_price(card.query_selector('div[data-slot-id="Price"] p:last-child').inner_text() if card.query_selector('div[data-slot-id="Price"] p:last-child') else "NA")
-                discount = card.query_selector('div.c5aJJW span:last-child').inner_text().strip() if card.query_selector('div.c5aJJW span:last-child') else "NA"
-
-                collected[name] = {
-                    "discount": discount,
-                    "name": name,
-                    "unit": unit,
-                    "current_price": current_price,
-                    "original_price": original_price
-                }
-            except Exception as e:
-                print(f"Error collecting a product: {e}")
-
-                # Step 6: Save CSV only if products were scraped
-        products = list(collected.values())
-        if products:  # <-- NEW check
-            with open(output_file, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["discount", "name", "unit", "current_price", "original_price"])
-                writer.writeheader()
-                writer.writerows(products)
-            print(f"Scraped {len(products)} unique products. Saved to {output_file}")
-        else:
-            print("No products scraped. CSV file not modified.")
+            self.log("Failed to open product/brand page.")
+            return False
+
+
+ADAPTER = ZeptoAdapter()
+
+
+async def scrape_zepto_pepe_async(browser, output_file="zepto_data.csv", pincode=PINCODE, brand=None, metrics=None):
+    """Scrape one brand at one pincode in its own context of a shared browser."""
+    return await scrape(ADAPTER, browser, output_file, pincode, brand, metrics)
+
 
+def scrape_zepto_pepe(output_file="zepto_data.csv", pincode=PINCODE, brand=None):
+    """Standalone entry point: launch a browser just for Zepto."""
+    return run_standalone(ADAPTER, output_file, pincode, brand)
 
 
 if __name__ == "__main__":